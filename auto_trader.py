@@ -10,6 +10,7 @@ import pandas as pd
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from strategy import TrendFollowingStrategy
+from candle_buffer import CandleBuffer
 from database import TradingDatabase
 
 # 로깅 설정
@@ -27,7 +28,8 @@ class BinanceAutoTrader:
     """
     Binance 자동매매 클래스
     """
-    def __init__(self, api_key, api_secret, symbol, timeframe='4h', initial_capital=None, max_trade_amount=None, test_mode=False):
+    def __init__(self, api_key, api_secret, symbol, timeframe='4h', initial_capital=None, max_trade_amount=None, test_mode=False,
+                 client=None, db=None):
         """
         초기화
         
@@ -39,6 +41,8 @@ class BinanceAutoTrader:
             initial_capital (float): 초기 자본금 (None이면 계정에서 가져옴)
             max_trade_amount (float): 거래당 최대 금액 (USDT)
             test_mode (bool): 테스트 모드 여부 (True면 실제 주문 실행 안함)
+            client: Binance 클라이언트 (None이면 API 키로 생성, 오프라인 재생 시 exchange_fixtures.ReplayClient)
+            db (TradingDatabase): 거래 기록 데이터베이스 (None이면 기본 trading_history.db)
         """
         self.api_key = api_key
         self.api_secret = api_secret
@@ -47,14 +51,14 @@ class BinanceAutoTrader:
         self.test_mode = test_mode
         
         # 데이터베이스 초기화
-        self.db = TradingDatabase()
+        self.db = db or TradingDatabase()
         
         # 테스트 모드 안내
         if self.test_mode:
             logger.warning("테스트 모드로 실행 중입니다. 실제 주문은 실행되지 않습니다.")
         
         # Binance 클라이언트 초기화
-        self.client = Client(api_key, api_secret)
+        self.client = client or Client(api_key, api_secret)
         
         # 계정 정보 가져오기
         account_info = self.client.get_account()
@@ -104,6 +108,9 @@ class BinanceAutoTrader:
         # 최소 주문 금액
         self.min_notional = self._get_min_notional()
         
+        # 최근 캔들 버퍼 (시작 시 한 번 채운 뒤 최신 캔들만 반영)
+        self.candles = CandleBuffer(self.timeframe, capacity=100)
+        
         # 마지막 체크 시간
         self.last_check_time = None
         
@@ -194,40 +201,22 @@ class BinanceAutoTrader:
         """
         최신 OHLCV 데이터 가져오기
         
+        처음에는 캔들 버퍼를 채우고, 이후에는 직전 마감 캔들과 진행 중인 캔들만 받아 버퍼에 반영한다.
+        
         Args:
-            limit (int): 가져올 캔들 수
+            limit (int): 돌려줄 캔들 수
             
         Returns:
-            pandas.DataFrame: OHLCV 데이터
+            pandas.DataFrame: OHLCV 데이터 (ema10/ema20/ema50 컬럼 포함)
         """
         try:
-            # Binance API에서 캔들 데이터 가져오기
-            klines = self.client.get_klines(
-                symbol=self.symbol,
-                interval=self.timeframe,
-                limit=limit
+            # Binance API에서 최신 캔들만 가져와 버퍼에 반영
+            fetched = self.candles.refresh(
+                lambda n: self.client.get_klines(symbol=self.symbol, interval=self.timeframe, limit=n)
             )
             
-            # 데이터프레임으로 변환
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            # 타입 변환
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df['open'] = df['open'].astype(float)
-            df['high'] = df['high'].astype(float)
-            df['low'] = df['low'].astype(float)
-            df['close'] = df['close'].astype(float)
-            df['volume'] = df['volume'].astype(float)
-            
-            # 타임스탬프를 인덱스로 설정
-            df.set_index('timestamp', inplace=True)
-            
-            logger.info(f"{limit}개의 {self.timeframe} 캔들 데이터를 가져왔습니다.")
-            return df
+            logger.info(f"{fetched}개의 {self.timeframe} 캔들 데이터를 가져왔습니다.")
+            return self.candles.frame(limit)
             
         except BinanceAPIException as e:
             logger.error(f"Binance API 오류: {e}")
@@ -495,11 +484,7 @@ class BinanceAutoTrader:
             if current_volatility > 0.05:  # 5% 이상 변동성
                 logger.warning(f"현재 시장 변동성이 높습니다 ({current_volatility:.2%}). 매매 신호에 주의하세요.")
             
-            # EMA 값 계산
-            df['ema10'] = self.strategy.calculate_ema(df, 10)
-            df['ema20'] = self.strategy.calculate_ema(df, 20)
-            df['ema50'] = self.strategy.calculate_ema(df, 50)
-            
+            # EMA 값 (캔들 버퍼가 캔들마다 이어서 계산해 둔 값)
             ema10 = df['ema10'].iloc[-1]
             ema20 = df['ema20'].iloc[-1]
             ema50 = df['ema50'].iloc[-1]
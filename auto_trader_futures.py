@@ -10,6 +10,8 @@ import pandas as pd
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from strategy import TrendFollowingStrategy
+from candle_buffer import CandleBuffer
+from kline_stream import KlineStream, FUTURES_STREAM_URL
 from database import TradingDatabase
 from dotenv import load_dotenv
 
@@ -41,7 +43,7 @@ class BinanceFuturesAutoTrader:
     Binance 선물 자동매매 클래스
     """
     def __init__(self, api_key, api_secret, symbol, timeframe='4h', initial_capital=None, 
-                 max_trade_amount=None, leverage=3, test_mode=False):
+                 max_trade_amount=None, leverage=3, test_mode=False, client=None, db=None):
         """
         초기화
         
@@ -54,6 +56,8 @@ class BinanceFuturesAutoTrader:
             max_trade_amount (float): 거래당 최대 금액 (USDT)
             leverage (int): 레버리지 (1-125배)
             test_mode (bool): 테스트 모드 여부 (True면 실제 주문 실행 안함)
+            client: Binance 클라이언트 (None이면 API 키로 생성, 오프라인 재생 시 exchange_fixtures.ReplayClient)
+            db (TradingDatabase): 거래 기록 데이터베이스 (None이면 기본 trading_history.db)
         """
         self.api_key = api_key
         self.api_secret = api_secret
@@ -63,14 +67,14 @@ class BinanceFuturesAutoTrader:
         self.test_mode = test_mode
         
         # 데이터베이스 초기화
-        self.db = TradingDatabase()
+        self.db = db or TradingDatabase()
         
         # 테스트 모드 안내
         if self.test_mode:
             logger.warning("테스트 모드로 실행 중입니다. 실제 주문은 실행되지 않습니다.")
         
         # Binance 클라이언트 초기화
-        self.client = Client(api_key, api_secret)
+        self.client = client or Client(api_key, api_secret)
         
         # 선물 계정 정보 가져오기
         try:
@@ -128,6 +132,15 @@ class BinanceFuturesAutoTrader:
         # 최소 주문 금액
         self.min_notional = self._get_min_notional()
         
+        # 최근 캔들 버퍼 (시작 시 한 번 채운 뒤 최신 캔들만 반영, 스트림 실행 중에는 스트림이 갱신)
+        self.candles = CandleBuffer(self.timeframe, capacity=100)
+        self.stream_feeding = False
+        # 스트림 중 빈 구간이 생겼을 때 REST로 다시 채우는 최소 간격 (초, 계속 실패하면 두 배씩 늘려 최대 max까지)
+        self.candle_resync_delay = 5.0
+        self.max_candle_resync_delay = 300.0
+        self._candle_resync_wait = self.candle_resync_delay
+        self._candle_resync_at = 0.0
+        
         # 마지막 체크 시간
         self.last_check_time = None
         
@@ -261,36 +274,24 @@ class BinanceFuturesAutoTrader:
         """수량을 심볼 정밀도에 맞게 포맷팅"""
         return f"{quantity:.{self.quantity_precision}f}"
     
-    def fetch_latest_data(self, limit=100):
-        """최신 OHLCV 데이터 가져오기 (선물)"""
+    def fetch_latest_data(self, limit=100, end_time=None):
+        """
+        최신 OHLCV 데이터 가져오기 (선물)
+
+        kline 스트림이 캔들 버퍼를 갱신하는 중이면 REST 요청 없이 버퍼를 사용하고,
+        아니면 직전 마감 캔들과 진행 중인 캔들만 받아 버퍼에 반영한다.
+
+        Args:
+            limit (int): 돌려줄 캔들 수
+            end_time (int): 이 시각(밀리초) 이후에 시작한 캔들 제외 (캔들 마감 직후 새로 열린 캔들 제외용)
+
+        Returns:
+            pandas.DataFrame: OHLCV 데이터 (ema10/ema20/ema50 컬럼 포함)
+        """
         try:
-            # 선물 API에서 캔들 데이터 가져오기
-            klines = self.client.futures_klines(
-                symbol=self.symbol,
-                interval=self.timeframe,
-                limit=limit
-            )
-            
-            # 데이터프레임으로 변환
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            # 타입 변환
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df['open'] = df['open'].astype(float)
-            df['high'] = df['high'].astype(float)
-            df['low'] = df['low'].astype(float)
-            df['close'] = df['close'].astype(float)
-            df['volume'] = df['volume'].astype(float)
-            
-            # 타임스탬프를 인덱스로 설정
-            df.set_index('timestamp', inplace=True)
-            
-            logger.info(f"{limit}개의 {self.timeframe} 선물 캔들 데이터를 가져왔습니다.")
-            return df
+            if not self.stream_feeding:
+                self._refresh_candles()
+            return self.candles.frame(limit, end_time)
             
         except BinanceAPIException as e:
             logger.error(f"Binance 선물 API 오류: {e}")
@@ -299,6 +300,13 @@ class BinanceFuturesAutoTrader:
             logger.error(f"선물 데이터 가져오기 오류: {e}")
             return None
     
+    def _refresh_candles(self):
+        """선물 API에서 최신 캔들만 가져와 캔들 버퍼에 반영 (처음이거나 빈 구간이 있으면 전체를 다시 채움)"""
+        fetched = self.candles.refresh(
+            lambda n: self.client.futures_klines(symbol=self.symbol, interval=self.timeframe, limit=n)
+        )
+        logger.info(f"{fetched}개의 {self.timeframe} 선물 캔들 데이터를 가져왔습니다.")
+    
     def place_futures_order(self, side, quantity, position_side='BOTH'):
         """선물 시장가 주문 실행"""
         try:
@@ -689,11 +697,16 @@ class BinanceFuturesAutoTrader:
         except Exception as e:
             logger.error(f"선물 포지션 상태 저장 중 오류: {e}")
     
-    def execute_strategy(self):
-        """선물 전략 실행 및 매매 신호 처리"""
+    def execute_strategy(self, end_time=None):
+        """
+        선물 전략 실행 및 매매 신호 처리
+
+        Args:
+            end_time (int): 마감된 캔들의 종료 시각 (밀리초, 지정하면 그 캔들을 현재 캔들로 사용)
+        """
         try:
             # 최신 데이터 가져오기
-            df = self.fetch_latest_data(limit=100)
+            df = self.fetch_latest_data(limit=100, end_time=end_time)
             if df is None or df.empty:
                 logger.error("데이터를 가져올 수 없습니다.")
                 return False
@@ -706,11 +719,7 @@ class BinanceFuturesAutoTrader:
             previous_candle = df.iloc[-2]
             current_price = float(current_candle['close'])
             
-            # EMA 값 계산
-            df['ema10'] = self.strategy.calculate_ema(df, 10)
-            df['ema20'] = self.strategy.calculate_ema(df, 20)
-            df['ema50'] = self.strategy.calculate_ema(df, 50)
-            
+            # EMA 값 (캔들 버퍼가 캔들마다 이어서 계산해 둔 값)
             ema10 = df['ema10'].iloc[-1]
             ema20 = df['ema20'].iloc[-1]
             ema50 = df['ema50'].iloc[-1]
@@ -997,6 +1006,86 @@ class BinanceFuturesAutoTrader:
             self._log_final_statistics()
             logger.info("선물 자동 매매 시스템 종료")
     
+    def run_stream(self, stream_url=FUTURES_STREAM_URL, check_interval=300):
+        """
+        kline 웹소켓 스트림으로 선물 자동 매매 시스템 실행 (이벤트 방식)
+
+        캔들이 마감되는 순간 마감된 캔들 기준으로 전략을 실행하므로 REST 폴링처럼 최대 check_interval초 늦게 반응하지 않는다.
+        캔들 진행 중에는 check_interval초마다 한 번씩 전략을 실행해 손절/익절을 확인하고 (None이면 마감 시에만 실행),
+        연결(재연결 포함)될 때마다 끊긴 동안 놓친 마감을 반영하도록 한 번 실행한다.
+        캔들 버퍼는 스트림 이벤트로 갱신하므로 kline REST 요청은 연결할 때(와 빈 구간이 생겼을 때)만 보낸다.
+
+        Args:
+            stream_url (str): 웹소켓 주소 (테스트 시 kline_stream.LocalKlineServer.url)
+            check_interval (int): 캔들 진행 중 전략 실행 주기 (초, None이면 마감 시에만 실행)
+        """
+        logger.info(f"선물 자동 매매 시스템 시작 (kline 스트림) - 심볼: {self.symbol}, 레버리지: {self.leverage}배")
+        trade_logger.info(
+            f"=== 선물 자동매매 시스템 시작 (kline 스트림) === | "
+            f"심볼: {self.symbol} | "
+            f"타임프레임: {self.timeframe} | "
+            f"레버리지: {self.leverage}x | "
+            f"초기자본: {self.initial_capital:,.2f} USDT | "
+            f"최대거래금액: {self.max_trade_amount or '무제한'} | "
+            f"모드: {'테스트' if self.test_mode else '실거래'}"
+        )
+        trade_logger.info("=" * 100)
+
+        self.stream = KlineStream(self.symbol, self.timeframe, stream_url)
+
+        def on_connect(connections):
+            logger.info(f"kline 스트림 연결 ({connections}번째) - 전략 실행")
+            # 끊긴 동안의 캔들은 REST로 반영한 뒤 스트림으로 버퍼 갱신
+            self.stream_feeding = False
+            self.execute_strategy()
+            self.stream_feeding = True
+            self.last_check_time = datetime.now()
+
+        def on_close(kline):
+            self._stream_candle(kline)
+            logger.info(f"캔들 마감 ({datetime.fromtimestamp(kline[0] / 1000)}) - 선물 매매 신호 확인 중...")
+            self.execute_strategy(end_time=kline[6])
+            self.last_check_time = datetime.now()
+
+        def on_update(kline):
+            self._stream_candle(kline)
+            current_time = datetime.now()
+            if check_interval and (self.last_check_time is None or (current_time - self.last_check_time).total_seconds() >= check_interval):
+                logger.info(f"선물 매매 신호 확인 중... ({current_time})")
+                self.execute_strategy()
+                self.last_check_time = current_time
+
+        try:
+            self.stream.run(on_close, on_update=on_update, on_connect=on_connect)
+        except KeyboardInterrupt:
+            logger.info("사용자에 의해 선물 매매 프로그램이 중단되었습니다.")
+        except Exception as e:
+            logger.error(f"선물 매매 프로그램 실행 중 오류 발생: {e}")
+        finally:
+            self.stream_feeding = False
+            self._log_final_statistics()
+            logger.info("선물 자동 매매 시스템 종료")
+
+    def _stream_candle(self, kline):
+        """
+        스트림으로 받은 캔들을 버퍼에 반영 (빈 구간이 생기면 REST로 다시 채움)
+
+        다시 채우기는 최소 간격을 두고, 채운 뒤에도 반영하지 못하면 간격을 두 배씩 늘려
+        이벤트마다 kline REST 요청을 보내지 않는다.
+        """
+        if self.candles.update(kline):
+            self._candle_resync_wait = self.candle_resync_delay
+            return
+        now = time.monotonic()
+        if now < self._candle_resync_at:
+            return
+        self._candle_resync_at = now + self._candle_resync_wait
+        self._candle_resync_wait = min(self._candle_resync_wait * 2, self.max_candle_resync_delay)
+        try:
+            self._refresh_candles()
+        except Exception as e:
+            logger.error(f"캔들 버퍼 갱신 중 오류: {e}")
+
     def _log_final_statistics(self):
         """최종 거래 통계 로그"""
         try:
@@ -1086,6 +1175,7 @@ if __name__ == "__main__":
         timeframe = config.get('timeframe', '4h')
         leverage = config.get('leverage', 3)
         test_initial_capital = config.get('test_initial_capital', 10000)
+        use_stream = config.get('use_stream', False)  # True면 kline 웹소켓 스트림으로 캔들 마감 즉시 실행
             
         if not api_key or not api_secret:
             raise ValueError("API 키가 설정되지 않았습니다. .env 파일 또는 config_futures.json에서 설정하세요.")
@@ -1106,7 +1196,10 @@ if __name__ == "__main__":
         )
         
         # 선물 자동 매매 시스템 실행
-        trader.run(check_interval=300)
+        if use_stream:
+            trader.run_stream(check_interval=300)
+        else:
+            trader.run(check_interval=300)
         
     except FileNotFoundError:
         logger.error("config_futures.json 파일을 찾을 수 없습니다. 설정 파일이 필요합니다.")
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+# 거래 기록 구조화 배열 형식
+TRADE_DTYPE = np.dtype([
+    ('type', np.int8),                   # 0: entry, 1: exit
+    ('direction', np.int8),              # 1: long, -1: short (exit는 0)
+    ('price', np.float64),
+    ('size', np.float64),
+    ('timestamp', np.int64),             # 나노초
+    ('stop_loss', np.float64),
+    ('secondary_stop_loss', np.float64),
+    ('pnl', np.float64),
+    ('exit_pct', np.float64),
+    ('reason', np.int16),                # TradeLog.reasons 인덱스 (entry는 -1)
+])
+
+TRADE_TYPES = np.array(['entry', 'exit'], dtype=object)
+
+# 거래 기록 DataFrame 컬럼 순서 (진입 기록 컬럼 다음 청산 기록 컬럼)
+TRADE_COLUMNS = ('type', 'direction', 'price', 'size', 'timestamp', 'stop_loss', 'secondary_stop_loss', 'pnl', 'exit_pct', 'reason')
+
+
+def to_nanoseconds(timestamp):
+    """datetime/Timestamp/정수(나노초)를 int64 나노초로 변환"""
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    return pd.Timestamp(timestamp).value
+
+
+def index_nanoseconds(index):
+    """
+    DatetimeIndex를 int64 나노초 배열과 원래 타임스탬프 단위로 변환
+
+    Args:
+        index (pandas.DatetimeIndex): 캔들 인덱스
+
+    Returns:
+        tuple: (int64 나노초 numpy.ndarray, 단위 문자열 또는 None)
+    """
+    unit = getattr(index, 'unit', None)
+    if unit is not None and unit != 'ns':
+        index = index.as_unit('ns')
+    return index.asi8, unit
+
+
+def _timestamp_column(values, unit):
+    """나노초 배열을 기록 당시 타임스탬프 단위의 datetime 컬럼으로 변환"""
+    timestamps = pd.to_datetime(values, unit='ns')
+    if unit is not None and hasattr(timestamps, 'as_unit'):
+        timestamps = timestamps.as_unit(unit)
+    return timestamps
+
+
+class EquityRecorder:
+    """
+    자본금 곡선 기록기
+
+    캔들마다 dict를 추가하는 대신 미리 할당한 timestamp/equity/drawdown 배열에 기록하고,
+    DataFrame은 to_frame() 호출 시에만 만든다.
+    """
+
+    def __init__(self, capacity=0):
+        self.timestamps = np.empty(capacity, dtype=np.int64)
+        self.equity = np.empty(capacity, dtype=np.float64)
+        self.drawdown = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+        self.unit = None
+
+    def __len__(self):
+        return self.size
+
+    def reserve(self, n):
+        """추가로 n개를 기록할 공간 확보"""
+        required = self.size + n
+        if required <= len(self.equity):
+            return
+        capacity = max(required, 2 * len(self.equity))
+        for name in ('timestamps', 'equity', 'drawdown'):
+            grown = np.empty(capacity, dtype=getattr(self, name).dtype)
+            grown[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, grown)
+
+    def append(self, timestamp, equity, drawdown):
+        """캔들 하나의 자본금 기록"""
+        if self.size == len(self.equity):
+            self.reserve(1)
+        if self.unit is None:
+            self.unit = getattr(timestamp, 'unit', None)
+        k = self.size
+        self.timestamps[k] = to_nanoseconds(timestamp)
+        self.equity[k] = equity
+        self.drawdown[k] = drawdown
+        self.size = k + 1
+
+    def fill(self, timestamps, equity, drawdown):
+        """
+        같은 자본금/Drawdown이 이어지는 구간을 한 번에 기록
+
+        Args:
+            timestamps (numpy.ndarray): int64 나노초 타임스탬프 배열
+            equity (float): 자본금
+            drawdown (float): Drawdown
+        """
+        n = len(timestamps)
+        self.reserve(n)
+        k = self.size
+        self.timestamps[k:k + n] = timestamps
+        self.equity[k:k + n] = equity
+        self.drawdown[k:k + n] = drawdown
+        self.size = k + n
+
+    def clear(self):
+        self.size = 0
+
+    def to_frame(self):
+        """timestamp, equity, drawdown 컬럼의 DataFrame"""
+        if self.size == 0:
+            return pd.DataFrame()
+        return pd.DataFrame({
+            'timestamp': _timestamp_column(self.timestamps[:self.size], self.unit),
+            'equity': self.equity[:self.size].copy(),
+            'drawdown': self.drawdown[:self.size].copy()
+        })
+
+
+class TradeLog:
+    """
+    거래 기록기 (구조화 배열)
+
+    진입/청산마다 dict를 추가하는 대신 TRADE_DTYPE 구조화 배열에 기록하고,
+    DataFrame은 to_frame() 호출 시에만 만든다. 청산 이유 문자열은 reasons 목록의 인덱스로 저장한다.
+    """
+
+    def __init__(self, capacity=64):
+        self.records = np.zeros(capacity, dtype=TRADE_DTYPE)
+        self.size = 0
+        self.reasons = []
+        self.unit = None
+
+    def __len__(self):
+        return self.size
+
+    def _next(self, timestamp):
+        if self.size == len(self.records):
+            grown = np.zeros(max(64, 2 * len(self.records)), dtype=TRADE_DTYPE)
+            grown[:self.size] = self.records[:self.size]
+            self.records = grown
+        if self.unit is None:
+            self.unit = getattr(timestamp, 'unit', None)
+        record = self.records[self.size]
+        self.size += 1
+        return record
+
+    def add_entry(self, direction, price, size, timestamp, stop_loss, secondary_stop_loss):
+        """진입 기록"""
+        record = self._next(timestamp)
+        record['type'] = 0
+        record['direction'] = direction
+        record['price'] = price
+        record['size'] = size
+        record['timestamp'] = to_nanoseconds(timestamp)
+        record['stop_loss'] = stop_loss
+        record['secondary_stop_loss'] = np.nan if secondary_stop_loss is None else secondary_stop_loss
+        record['pnl'] = np.nan
+        record['exit_pct'] = np.nan
+        record['reason'] = -1
+
+    def add_exit(self, price, pnl, size, exit_pct, timestamp, reason):
+        """청산 기록"""
+        if reason not in self.reasons:
+            self.reasons.append(reason)
+        record = self._next(timestamp)
+        record['type'] = 1
+        record['direction'] = 0
+        record['price'] = price
+        record['size'] = size
+        record['timestamp'] = to_nanoseconds(timestamp)
+        record['stop_loss'] = np.nan
+        record['secondary_stop_loss'] = np.nan
+        record['pnl'] = pnl
+        record['exit_pct'] = exit_pct
+        record['reason'] = self.reasons.index(reason)
+
+    def view(self):
+        """기록된 거래의 구조화 배열 뷰"""
+        return self.records[:self.size]
+
+    def clear(self):
+        self.size = 0
+        self.reasons = []
+
+    def to_frame(self, start=0):
+        """
+        거래 기록 DataFrame
+
+        컬럼 구성은 진입 기록(type, direction, price, size, timestamp, stop_loss, secondary_stop_loss)
+        다음에 청산 기록(pnl, exit_pct, reason)이 있을 때만 청산 컬럼이 붙는다.
+
+        Args:
+            start (int): 변환을 시작할 거래 기록 인덱스 (새로 추가된 기록만 변환할 때 사용)
+        """
+        if self.size <= start:
+            return pd.DataFrame()
+
+        records = self.records[start:self.size]
+        n = len(records)
+        is_entry = records['type'] == 0
+        is_exit = ~is_entry
+
+        columns = {'type': TRADE_TYPES[records['type']]}
+        if is_entry.any():
+            direction = np.full(n, np.nan, dtype=object)
+            direction[is_entry] = np.where(records['direction'][is_entry] == 1, 'long', 'short')
+            columns['direction'] = direction
+        columns['price'] = records['price'].copy()
+        columns['size'] = records['size'].copy()
+        columns['timestamp'] = _timestamp_column(records['timestamp'], self.unit)
+        if is_entry.any():
+            columns['stop_loss'] = records['stop_loss'].copy()
+            columns['secondary_stop_loss'] = records['secondary_stop_loss'].copy()
+        if is_exit.any():
+            reason = np.full(n, np.nan, dtype=object)
+            reason[is_exit] = np.array(self.reasons, dtype=object)[records['reason'][is_exit]]
+            columns['pnl'] = records['pnl'].copy()
+            columns['exit_pct'] = records['exit_pct'].copy()
+            columns['reason'] = reason
+
+        return pd.DataFrame(columns)
+
+
+class CSVSink:
+    """
+    스트리밍 백테스팅 결과를 CSV 파일에 이어 쓰는 출력 대상
+
+    TrendFollowingStrategy.backtest_stream()이 청크마다 write_equity/write_trades를 호출한다.
+    처음 쓸 때 파일을 새로 만들고 헤더를 쓰며, 이후에는 행만 추가한다.
+    """
+
+    def __init__(self, equity_path, trades_path):
+        """
+        Args:
+            equity_path (str): 자본금 곡선 CSV 파일 경로
+            trades_path (str): 거래 기록 CSV 파일 경로
+        """
+        self.equity_path = equity_path
+        self.trades_path = trades_path
+        self._started = set()
+
+    def _append(self, path, frame):
+        started = path in self._started
+        frame.to_csv(path, mode='a' if started else 'w', header=not started, index=False)
+        self._started.add(path)
+
+    def write_equity(self, frame):
+        self._append(self.equity_path, frame)
+
+    def write_trades(self, frame):
+        # 청크마다 컬럼 구성이 달라질 수 있으므로 고정된 컬럼 순서로 기록
+        self._append(self.trades_path, frame.reindex(columns=list(TRADE_COLUMNS)))
+
+    def close(self):
+        pass
+
+
+class MemorySink:
+    """스트리밍 백테스팅 결과를 메모리에 모으는 출력 대상 (작은 데이터 확인용)"""
+
+    def __init__(self):
+        self.equity_frames = []
+        self.trade_frames = []
+
+    def write_equity(self, frame):
+        self.equity_frames.append(frame)
+
+    def write_trades(self, frame):
+        self.trade_frames.append(frame)
+
+    def close(self):
+        pass
+
+    def equity_curve(self):
+        """모은 자본금 곡선 DataFrame"""
+        if not self.equity_frames:
+            return pd.DataFrame()
+        return pd.concat(self.equity_frames, ignore_index=True)
+
+    def trades(self):
+        """모은 거래 기록 DataFrame"""
+        if not self.trade_frames:
+            return pd.DataFrame()
+        trades = pd.concat(self.trade_frames, ignore_index=True)
+        return trades[[column for column in TRADE_COLUMNS if column in trades.columns]]
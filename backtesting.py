@@ -1,11 +1,20 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from strategy import TrendFollowingStrategy
+from strategy import TrendFollowingStrategy, StrategyConfig
+from shared_data import SharedOHLCV
+from result_cache import BacktestResultCache, fingerprint_data
+from indicator_cache import IndicatorCache
+from stage_profiler import format_profile
+from backtest_records import CSVSink
+from candle_store import CandleStore
+from columnar_store import load_ohlcv, iter_ohlcv_chunks, columnar_path, save_columnar, is_columnar
+from candle_validation import validate_candles, repair_candles
 import argparse
 import os
 from datetime import datetime, timedelta
 import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 
 def calculate_sharpe_ratio(returns, risk_free_rate=0.0):
     """
@@ -30,6 +39,351 @@ def calculate_profit_factor(profits, losses):
     """
     return profits / losses if losses > 0 else float('inf')
 
+def load_saved_data(data_file, start=None, end=None):
+    """
+    저장된 OHLCV 데이터 불러오기
+    
+    Args:
+        data_file: CSV 파일 또는 컬럼형(.ohlcv) 디렉토리 경로
+        start: 시작 날짜 (None이면 처음부터, 컬럼형은 이진 탐색으로 해당 구간만 읽음)
+        end: 종료 날짜 (포함, None이면 끝까지)
+    Returns:
+        timestamp 인덱스의 OHLCV DataFrame
+    """
+    return load_ohlcv(data_file, start, end)
+
+def iter_saved_data_chunks(data_file, chunk_size, start=None, end=None):
+    """
+    저장된 OHLCV 데이터를 청크 단위로 불러오기 (전체 파일을 메모리에 올리지 않음)
+    
+    Args:
+        data_file: CSV 파일 또는 컬럼형(.ohlcv) 디렉토리 경로
+        chunk_size: 청크당 캔들 수
+        start: 시작 날짜 (None이면 처음부터)
+        end: 종료 날짜 (포함, None이면 끝까지)
+    Returns:
+        timestamp 인덱스의 OHLCV DataFrame 청크 제너레이터
+    """
+    return iter_ohlcv_chunks(data_file, chunk_size, start, end)
+
+def check_data(data, timeframe, mode):
+    """
+    백테스트 전 캔들 데이터 검사 (누락/중복/순서/가격 이상값)
+    
+    Args:
+        data: timestamp 인덱스의 OHLCV DataFrame
+        timeframe: 시간프레임 (None이면 간격으로 추정)
+        mode: 'off' (검사 안 함), 'report' (결과만 출력), 'repair' (보정한 데이터 사용)
+    Returns:
+        검사(보정)한 OHLCV DataFrame
+    """
+    if mode == 'off':
+        return data
+    if mode == 'repair':
+        repaired, report = repair_candles(data, timeframe)
+        print(report.summary(data.index))
+        if not report.ok:
+            print(f"데이터를 보정했습니다: {len(data)} -> {len(repaired)} 캔들")
+        return repaired
+    report = validate_candles(data, timeframe)
+    print(report.summary(data.index))
+    if not report.ok:
+        print("보정하려면 --validate repair 옵션을 사용하세요.")
+    return data
+
+def parse_param_range(value, cast):
+    """
+    파라미터 범위 문자열을 값 목록으로 변환
+    Args:
+        value: '3,5,7' 형식의 목록 또는 '시작:끝:간격' 형식의 범위 (끝 포함)
+        cast: 값 변환 함수 (int, float)
+    Returns:
+        파라미터 값 목록
+    """
+    if ':' in value:
+        start, stop, step = (cast(v) for v in value.split(':'))
+        count = int(round((stop - start) / step)) + 1
+        return [cast(round(start + step * k, 10)) for k in range(count)]
+    return [cast(v) for v in value.split(',')]
+
+# 스윕 워커 프로세스별 공유 데이터 (워커당 한 번만 연결)
+_sweep_shared = None
+_sweep_data = None
+_sweep_indicators = None
+_sweep_cache = None
+_sweep_fingerprint = None
+
+def _init_sweep_worker(spec, cache_dir=None, data_fingerprint=None):
+    """스윕 워커 초기화: 부모 프로세스의 공유 메모리 OHLCV/지표 데이터에 복사 없이 연결합니다."""
+    global _sweep_shared, _sweep_data, _sweep_indicators, _sweep_cache, _sweep_fingerprint
+    _sweep_shared = SharedOHLCV.attach(spec)
+    _sweep_data, _sweep_indicators = _sweep_shared.frames()
+    _sweep_cache = BacktestResultCache(cache_dir) if cache_dir else None
+    _sweep_fingerprint = data_fingerprint
+
+def _run_sweep_task(task):
+    """
+    스윕 조합 하나에 대한 백테스트 실행
+    Args:
+        task: 파라미터 조합과 공통 설정 딕셔너리
+    Returns:
+        파라미터와 결과 지표 딕셔너리
+    """
+    strategy = TrendFollowingStrategy(
+        initial_capital=task['initial_capital'],
+        risk_percentage=task['risk_percentage'],
+        leverage=task['leverage'],
+        config=StrategyConfig(
+            sideways_lookback=task['sideways_lookback'],
+            sideways_threshold=task['sideways_threshold'],
+            breakout_lookback=task['breakout_lookback']
+        )
+    )
+    
+    if _sweep_cache is not None:
+        results = _sweep_cache.run(strategy, _sweep_data, engine=task['engine'], indicators=_sweep_indicators,
+                                   data_fingerprint=_sweep_fingerprint)
+    else:
+        results = strategy.backtest(_sweep_data, engine=task['engine'], indicators=_sweep_indicators)
+    
+    # 조합별 결과 그래프 저장 (화면 없이 렌더링)
+    if task['plot_dir']:
+        from result_plot import render_results
+        name = (f"sl{task['sideways_lookback']}_st{task['sideways_threshold']}_bl{task['breakout_lookback']}"
+                f"_lev{task['leverage']}_risk{task['risk_percentage']}.{task['plot_format']}")
+        render_results(results, os.path.join(task['plot_dir'], name), max_points=task['plot_points'])
+    
+    return {
+        'sideways_lookback': task['sideways_lookback'],
+        'sideways_threshold': task['sideways_threshold'],
+        'breakout_lookback': task['breakout_lookback'],
+        'leverage': task['leverage'],
+        'risk_percentage': task['risk_percentage'],
+        'total_return': results['total_return'],
+        'win_rate': results['win_rate'],
+        'profit_factor': results['profit_factor'],
+        'max_drawdown': results['max_drawdown'],
+        'total_trades': results['total_trades'],
+        'final_capital': results['final_capital']
+    }
+
+def run_sweep(argv):
+    """
+    파라미터 스윕 실행 (python backtesting.py sweep ...)
+    
+    파라미터 범위의 모든 조합을 프로세스 풀로 분산 실행하고 결과를 하나의 CSV로 저장합니다.
+    OHLCV와 지표는 부모 프로세스에서 한 번만 계산해 공유 메모리에 올리고 워커는 복사 없이 연결합니다.
+    Args:
+        argv: sweep 이후의 명령줄 인자
+    """
+    parser = argparse.ArgumentParser(prog='backtesting.py sweep', description='전략 파라미터 스윕 (병렬 백테스팅)')
+    
+    # 데이터 관련 인자 (저장된 데이터만 사용)
+    parser.add_argument('--data_file', type=str, default=None, help='OHLCV CSV 파일 또는 .ohlcv 디렉토리 (지정하지 않으면 거래소/심볼/기간으로 파일명 생성)')
+    parser.add_argument('--exchange', type=str, default='binance', help='거래소 (binance, bybit 등)')
+    parser.add_argument('--symbol', type=str, default='BTC/USDT', help='심볼 (BTC/USDT, ETH/USDT 등)')
+    parser.add_argument('--timeframe', type=str, default='4h', help='시간프레임 (1h, 4h, 1d 등)')
+    parser.add_argument('--start_date', type=str, default='2023-01-01', help='백테스팅 시작 날짜 (YYYY-MM-DD)')
+    parser.add_argument('--end_date', type=str, default='2025-05-21', help='백테스팅 종료 날짜 (YYYY-MM-DD)')
+    parser.add_argument('--data_dir', type=str, default='data', help='데이터 저장 디렉토리')
+    
+    # 파라미터 범위 ('3,5,7' 또는 '시작:끝:간격')
+    parser.add_argument('--sideways_lookback', type=str, default='5', help='횡보 구간 감지 기간 범위')
+    parser.add_argument('--sideways_threshold', type=str, default='0.1', help='횡보 구간 감지 임계값 범위')
+    parser.add_argument('--breakout_lookback', type=str, default='3', help='돌파 감지 기간 범위')
+    parser.add_argument('--leverage', type=str, default='3', help='레버리지 범위 (최대 3배)')
+    parser.add_argument('--risk_percentage', type=str, default='0.02', help='거래당 허용 리스크 비율 범위')
+    
+    # 실행 설정
+    parser.add_argument('--initial_capital', type=float, default=10000, help='초기 자본금 (USDT)')
+    parser.add_argument('--engine', type=str, default='sparse', choices=['pandas', 'array', 'sparse'], help='백테스팅 엔진')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='워커 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--output', type=str, default=None, help='결과 CSV 파일 경로')
+    parser.add_argument('--cache_dir', type=str, default=os.path.join('data', 'cache', 'results'), help='백테스트 결과 캐시 디렉토리')
+    parser.add_argument('--no_cache', action='store_true', help='백테스트 결과 캐시 사용 안 함')
+    parser.add_argument('--range_start', type=str, default=None, help='데이터 파일 중 백테스트할 구간 시작 (YYYY-MM-DD[ HH:MM])')
+    parser.add_argument('--range_end', type=str, default=None, help='데이터 파일 중 백테스트할 구간 끝 (포함)')
+    parser.add_argument('--validate', type=str, default='report', choices=['off', 'report', 'repair'], help='캔들 데이터 검사 (report: 결과 출력, repair: 보정한 데이터 사용)')
+    parser.add_argument('--plot_dir', type=str, default=None, help='조합별 결과 그래프 저장 디렉토리 (지정하지 않으면 저장 안 함)')
+    parser.add_argument('--plot_format', type=str, default='png', choices=['png', 'svg'], help='결과 그래프 형식')
+    parser.add_argument('--plot_points', type=int, default=2000, help='결과 그래프의 최대 점 개수 (LTTB 다운샘플링)')
+    
+    args = parser.parse_args(argv)
+    
+    start_date = datetime.strptime(args.start_date, "%Y-%m-%d")
+    end_date = datetime.strptime(args.end_date, "%Y-%m-%d")
+    filename_suffix = f"{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
+    data_file = args.data_file or os.path.join(
+        args.data_dir, f"{args.exchange}_{args.symbol.replace('/', '_')}_{args.timeframe}_{filename_suffix}.csv"
+    )
+    if not os.path.exists(data_file):
+        print(f"데이터 파일이 없습니다: {data_file}")
+        print("먼저 --save_data 옵션으로 백테스팅을 실행해 데이터를 저장해주세요.")
+        return
+    
+    grid = list(itertools.product(
+        parse_param_range(args.sideways_lookback, int),
+        parse_param_range(args.sideways_threshold, float),
+        parse_param_range(args.breakout_lookback, int),
+        parse_param_range(args.leverage, int),
+        parse_param_range(args.risk_percentage, float)
+    ))
+    tasks = [
+        {
+            'sideways_lookback': sideways_lookback,
+            'sideways_threshold': sideways_threshold,
+            'breakout_lookback': breakout_lookback,
+            'leverage': leverage,
+            'risk_percentage': risk_percentage,
+            'initial_capital': args.initial_capital,
+            'engine': args.engine,
+            'plot_dir': args.plot_dir,
+            'plot_format': args.plot_format,
+            'plot_points': args.plot_points
+        }
+        for sideways_lookback, sideways_threshold, breakout_lookback, leverage, risk_percentage in grid
+    ]
+    
+    workers = max(1, min(args.workers or 1, len(tasks)))
+    if args.plot_dir:
+        os.makedirs(args.plot_dir, exist_ok=True)
+    print("\n==== 파라미터 스윕 ====")
+    print(f"데이터 파일: {data_file}")
+    print(f"조합 수: {len(tasks)}개, 워커: {workers}개, 엔진: {args.engine}")
+    
+    sweep_start = time.perf_counter()
+    data = load_saved_data(data_file, args.range_start, args.range_end)
+    data = check_data(data, None if args.data_file else args.timeframe, args.validate)
+    if args.range_start or args.range_end:
+        # 구간만 백테스트하는 경우 지표 캐시는 전체 파일 기준이므로 사용하지 않음
+        indicators = TrendFollowingStrategy().compute_indicators(data)
+    else:
+        indicators = IndicatorCache().load_or_compute(data, data_file)
+    with SharedOHLCV.create(data, indicators=indicators) as shared:
+        cache_dir = None if args.no_cache else args.cache_dir
+        data_fingerprint = fingerprint_data(*shared.frames()) if cache_dir else None
+        initargs = (shared.spec, cache_dir, data_fingerprint)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker, initargs=initargs) as executor:
+            rows = []
+            for row in executor.map(_run_sweep_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+                rows.append(row)
+                if len(rows) % 10 == 0 or len(rows) == len(tasks):
+                    print(f"  - 진행: {len(rows)}/{len(tasks)}")
+    sweep_elapsed = time.perf_counter() - sweep_start
+    
+    results_df = pd.DataFrame(rows).sort_values('total_return', ascending=False).reset_index(drop=True)
+    
+    output_file = args.output or os.path.join(
+        os.path.dirname(data_file) or '.', f"sweep_{os.path.splitext(os.path.basename(data_file))[0]}.csv"
+    )
+    results_df.to_csv(output_file, index=False)
+    
+    print(f"\n스윕 완료: {sweep_elapsed:.2f}초 ({len(tasks) / sweep_elapsed:.2f} 조합/초)")
+    print(f"결과가 저장되었습니다: {output_file}")
+    print("\n===== 상위 10개 조합 =====")
+    print(results_df.head(10).to_string(index=False))
+
+def run_stream(argv):
+    """
+    청크 단위 스트리밍 백테스트 실행 (python backtesting.py stream ...)
+    
+    긴 기간의 1분봉처럼 메모리에 한 번에 올리기 어려운 데이터를 청크 단위로 백테스팅하고,
+    자본금 곡선과 매매 내역은 청크마다 CSV 파일에 이어 씁니다.
+    Args:
+        argv: stream 이후의 명령줄 인자
+    """
+    parser = argparse.ArgumentParser(prog='backtesting.py stream', description='청크 단위 스트리밍 백테스팅')
+    parser.add_argument('--data_file', type=str, default=None, help='OHLCV CSV 파일 또는 .ohlcv 디렉토리 (지정하지 않으면 거래소에서 가져오면서 백테스팅)')
+    parser.add_argument('--exchange', type=str, default='binance', help='거래소 (binance, bybit 등)')
+    parser.add_argument('--symbol', type=str, default='BTC/USDT', help='심볼 (BTC/USDT, ETH/USDT 등)')
+    parser.add_argument('--timeframe', type=str, default='4h', help='시간프레임 (1h, 4h, 1d 등)')
+    parser.add_argument('--start_date', type=str, default='2023-01-01', help='거래소에서 가져올 시작 날짜 (YYYY-MM-DD)')
+    parser.add_argument('--end_date', type=str, default='2025-05-21', help='거래소에서 가져올 종료 날짜 (YYYY-MM-DD)')
+    parser.add_argument('--fetch_workers', type=int, default=4, help='데이터 다운로드 동시 요청 수')
+    parser.add_argument('--max_requests', type=int, default=None, help='데이터 다운로드 최대 API 요청 수 (기본값: 제한 없음)')
+    parser.add_argument('--store_dir', type=str, default=os.path.join('data', 'store'), help='가져온 캔들을 함께 기록할 캔들 저장소 디렉토리')
+    parser.add_argument('--no_store', action='store_true', help='가져온 캔들을 캔들 저장소에 기록하지 않음')
+    parser.add_argument('--chunk_size', type=int, default=100000, help='청크당 캔들 수')
+    parser.add_argument('--engine', type=str, default='sparse', choices=['array', 'sparse'], help='백테스팅 엔진')
+    parser.add_argument('--initial_capital', type=float, default=10000, help='초기 자본금 (USDT)')
+    parser.add_argument('--risk_percentage', type=float, default=0.02, help='거래당 허용 리스크 비율 (0.02 = 2%%)')
+    parser.add_argument('--leverage', type=int, default=3, help='사용할 레버리지 (최대 3배)')
+    parser.add_argument('--sideways_lookback', type=int, default=5, help='횡보 구간 감지 기간')
+    parser.add_argument('--sideways_threshold', type=float, default=0.1, help='횡보 구간 감지 임계값')
+    parser.add_argument('--breakout_lookback', type=int, default=3, help='돌파 감지 기간')
+    parser.add_argument('--range_start', type=str, default=None, help='백테스트할 구간 시작 (YYYY-MM-DD[ HH:MM])')
+    parser.add_argument('--range_end', type=str, default=None, help='백테스트할 구간 끝 (포함)')
+    parser.add_argument('--output_dir', type=str, default=None, help='자본금 곡선/매매 내역 CSV 저장 디렉토리 (기본값: 데이터 파일 위치)')
+    
+    args = parser.parse_args(argv)
+    
+    if args.data_file and not os.path.exists(args.data_file):
+        print(f"데이터 파일이 없습니다: {args.data_file}")
+        return
+    
+    strategy = TrendFollowingStrategy(
+        initial_capital=args.initial_capital,
+        risk_percentage=args.risk_percentage,
+        leverage=args.leverage,
+        config=StrategyConfig(
+            sideways_lookback=args.sideways_lookback,
+            sideways_threshold=args.sideways_threshold,
+            breakout_lookback=args.breakout_lookback
+        )
+    )
+    
+    if args.data_file:
+        output_dir = args.output_dir or os.path.dirname(args.data_file) or '.'
+        stem = os.path.splitext(os.path.basename(args.data_file))[0]
+        source = f"데이터 파일: {args.data_file}"
+        chunks = iter_saved_data_chunks(args.data_file, args.chunk_size, args.range_start, args.range_end)
+    else:
+        # 거래소에서 도착한 청크부터 바로 백테스팅 (다운로드와 백테스트를 겹쳐 실행)
+        output_dir = args.output_dir or 'data'
+        start_date = datetime.strptime(args.start_date, "%Y-%m-%d")
+        end_date = datetime.strptime(args.end_date, "%Y-%m-%d")
+        stem = f"{args.exchange}_{args.symbol.replace('/', '_')}_{args.timeframe}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
+        source = f"거래소: {args.exchange} {args.symbol} {args.timeframe} ({args.start_date} ~ {args.end_date})"
+        start_time = int(start_date.timestamp() * 1000)
+        end_time = int(end_date.timestamp() * 1000)
+        chunks = strategy.fetch_data_chunks(
+            exchange_id=args.exchange,
+            symbol=args.symbol,
+            timeframe=args.timeframe,
+            since=start_time,
+            until=end_time,
+            workers=args.fetch_workers,
+            max_requests=args.max_requests,
+            chunk_size=args.chunk_size
+        )
+        if not args.no_store:
+            chunks = CandleStore(args.store_dir, args.exchange, args.symbol, args.timeframe).tee(chunks, start_time, end_time)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    sink = CSVSink(
+        equity_path=os.path.join(output_dir, f"equity_{stem}.csv"),
+        trades_path=os.path.join(output_dir, f"trades_{stem}.csv")
+    )
+    
+    print("\n==== 스트리밍 백테스팅 ====")
+    print(f"{source} (청크: {args.chunk_size}개 캔들, 엔진: {args.engine})")
+    
+    stream_start = time.perf_counter()
+    results = strategy.backtest_stream(chunks, sink=sink, engine=args.engine)
+    stream_elapsed = time.perf_counter() - stream_start
+    
+    print(f"백테스팅 소요 시간: {stream_elapsed:.2f}초 ({results['bars'] / stream_elapsed:,.0f} bars/s)")
+    print("\n===== 백테스팅 결과 =====")
+    print(f"캔들 수: {results['bars']}")
+    print(f"총 수익률: {results['total_return'] * 100:.2f}%")
+    print(f"총 거래 횟수: {results['total_trades']}")
+    print(f"승률: {results['win_rate'] * 100:.2f}%")
+    print(f"손익비: {results['profit_factor']:.2f}")
+    print(f"최대 낙폭: {results['max_drawdown'] * 100:.2f}%")
+    print(f"최종 자본금: {results['final_capital']:.2f} USDT")
+    print(f"\n자본금 곡선이 저장되었습니다: {sink.equity_path}")
+    print(f"매매 내역이 저장되었습니다: {sink.trades_path}")
+
 def get_user_input():
     """대화형으로 사용자 입력을 받습니다."""
     print("\n==== 비트코인 선물시장 트렌드 팔로잉 전략 백테스팅 ====\n")
@@ -126,10 +480,32 @@ def get_user_input():
         "sideways_lookback": 5,
         "sideways_threshold": 0.1,
         "breakout_lookback": 3,
-        "limit": 1000
+        "limit": 1000,
+        "fetch_workers": 4,
+        "max_requests": None,
+        "data_format": "csv",
+        "validate": "report",
+        "store_dir": os.path.join("data", "store"),
+        "no_store": False,
+        "engine": "pandas",
+        "cache_dir": os.path.join("data", "cache", "results"),
+        "no_cache": False,
+        "profile": False,
+        "plot_file": None,
+        "plot_points": 2000
     }
 
 def main():
+    # 파라미터 스윕 서브커맨드
+    if len(os.sys.argv) > 1 and os.sys.argv[1] == 'sweep':
+        run_sweep(os.sys.argv[2:])
+        return
+    
+    # 청크 단위 스트리밍 백테스트 서브커맨드
+    if len(os.sys.argv) > 1 and os.sys.argv[1] == 'stream':
+        run_stream(os.sys.argv[2:])
+        return
+    
     # 명령줄 인자가 있으면 argparse로 처리, 없으면 대화형으로 입력 받기
     if len(os.sys.argv) > 1:
         parser = argparse.ArgumentParser(description='비트코인 선물시장 트렌드 팔로잉 전략 백테스팅')
@@ -146,16 +522,28 @@ def main():
         parser.add_argument('--start_date', type=str, default='2023-01-01', help='백테스팅 시작 날짜 (YYYY-MM-DD)')
         parser.add_argument('--end_date', type=str, default='2025-05-21', help='백테스팅 종료 날짜 (YYYY-MM-DD)')
         parser.add_argument('--limit', type=int, default=1000, help='각 요청당 가져올 캔들 개수')
+        parser.add_argument('--fetch_workers', type=int, default=4, help='데이터 다운로드 동시 요청 수')
+        parser.add_argument('--max_requests', type=int, default=None, help='데이터 다운로드 최대 API 요청 수 (기본값: 제한 없음)')
         
         # 전략 파라미터
         parser.add_argument('--sideways_lookback', type=int, default=5, help='횡보 구간 감지 기간')
         parser.add_argument('--sideways_threshold', type=float, default=0.1, help='횡보 구간 감지 임계값 (높을수록 완화)')
         parser.add_argument('--breakout_lookback', type=int, default=3, help='돌파 감지 기간')
+        parser.add_argument('--engine', type=str, default='pandas', choices=['pandas', 'array', 'sparse'], help='백테스팅 엔진 (pandas: DataFrame 순회, array: NumPy 배열 커널, sparse: 무포지션 구간 건너뛰기)')
         
         # 기타 인자
         parser.add_argument('--use_saved_data', action='store_true', help='저장된 데이터 사용 여부')
         parser.add_argument('--save_data', action='store_true', help='데이터 저장 여부')
         parser.add_argument('--data_dir', type=str, default='data', help='데이터 저장 디렉토리')
+        parser.add_argument('--validate', type=str, default='report', choices=['off', 'report', 'repair'], help='캔들 데이터 검사 (report: 결과 출력, repair: 누락 캔들 채우기/중복 제거 등 보정한 데이터 사용)')
+        parser.add_argument('--data_format', type=str, default='csv', choices=['csv', 'npy', 'float32'], help='데이터 저장 형식 (npy: 컬럼형 .ohlcv, float32: 가격을 float32로 저장한 컬럼형)')
+        parser.add_argument('--store_dir', type=str, default=os.path.join('data', 'store'), help='로컬 캔들 저장소 디렉토리 (빠진 구간만 거래소에서 가져옴)')
+        parser.add_argument('--no_store', action='store_true', help='캔들 저장소 사용 안 함 (전체 기간을 거래소에서 가져옴)')
+        parser.add_argument('--cache_dir', type=str, default=os.path.join('data', 'cache', 'results'), help='백테스트 결과 캐시 디렉토리')
+        parser.add_argument('--no_cache', action='store_true', help='백테스트 결과 캐시 사용 안 함')
+        parser.add_argument('--profile', action='store_true', help='백테스트 단계별 실행 시간 측정 및 출력 (캐시 사용 안 함)')
+        parser.add_argument('--plot_file', type=str, default=None, help='결과 그래프 저장 경로 (.png, .svg 등, 지정하지 않으면 화면 표시 / 화면이 없으면 backtest_results.png)')
+        parser.add_argument('--plot_points', type=int, default=2000, help='결과 그래프의 최대 점 개수 (LTTB 다운샘플링)')
         
         args = parser.parse_args()
         args_dict = vars(args)
@@ -181,7 +569,12 @@ def main():
     strategy = TrendFollowingStrategy(
         initial_capital=args_dict["initial_capital"],
         risk_percentage=args_dict["risk_percentage"],
-        leverage=args_dict["leverage"]
+        leverage=args_dict["leverage"],
+        config=StrategyConfig(
+            sideways_lookback=args_dict["sideways_lookback"],
+            sideways_threshold=args_dict["sideways_threshold"],
+            breakout_lookback=args_dict["breakout_lookback"]
+        )
     )
     
     # 파일명 생성
@@ -191,51 +584,68 @@ def main():
     filename_suffix = f"{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
     data_file = os.path.join(data_dir, f"{exchange}_{symbol.replace('/', '_')}_{timeframe}_{filename_suffix}.csv")
     
+    # 컬럼형(.ohlcv) 데이터가 있으면 CSV 대신 사용
+    if args_dict["use_saved_data"] and is_columnar(columnar_path(data_file)):
+        data_file = columnar_path(data_file)
+    
     use_saved_data = args_dict["use_saved_data"]
     if use_saved_data and os.path.exists(data_file):
         print(f"저장된 데이터를 불러옵니다: {data_file}")
-        data = pd.read_csv(data_file)
-        data['timestamp'] = pd.to_datetime(data['timestamp'])
-        data.set_index('timestamp', inplace=True)
+        data = load_saved_data(data_file)
     else:
-        print(f"{exchange}에서 {symbol} {timeframe} 데이터를 가져옵니다 ({args_dict['start_date']} ~ {args_dict['end_date']})...")
-        
         # 시작 시간 계산
         start_time = int(start_date.timestamp() * 1000)
         end_time = int(end_date.timestamp() * 1000)
         
         # CCXT를 통해 데이터 가져오기
-        data = strategy.fetch_data(
-            exchange_id=exchange,
-            symbol=symbol,
-            timeframe=timeframe,
-            since=start_time,
-            until=end_time,
-            limit=args_dict["limit"]
-        )
+        def fetch(since, until):
+            print(f"{exchange}에서 {symbol} {timeframe} 데이터를 가져옵니다...")
+            return strategy.fetch_data(
+                exchange_id=exchange,
+                symbol=symbol,
+                timeframe=timeframe,
+                since=since,
+                until=until,
+                limit=args_dict["limit"],
+                workers=args_dict["fetch_workers"],
+                max_requests=args_dict["max_requests"]
+            )
+        
+        if args_dict["no_store"]:
+            data = fetch(start_time, end_time)
+        else:
+            # 로컬 캔들 저장소에 없는 구간만 가져오기
+            store = CandleStore(args_dict["store_dir"], exchange, symbol, timeframe)
+            data = store.get(start_time, end_time, fetch)
+            print(f"캔들 저장소: {store.data_path}")
         
         # 데이터 저장
         if args_dict["save_data"]:
-            print(f"데이터를 저장합니다: {data_file}")
-            data.reset_index().to_csv(data_file, index=False)
+            if args_dict["data_format"] == "csv":
+                data.reset_index().to_csv(data_file, index=False)
+            else:
+                data_file = save_columnar(data, columnar_path(data_file), float32=args_dict["data_format"] == "float32")
+            print(f"데이터를 저장했습니다: {data_file}")
     
     print(f"데이터 로드 완료: {len(data)} 캔들")
     print(f"기간: {data.index[0]} ~ {data.index[-1]}")
+    data = check_data(data, timeframe, args_dict["validate"])
     
-    # 전략 파라미터 수정
-    sideways_lookback = args_dict["sideways_lookback"]
-    sideways_threshold = args_dict["sideways_threshold"]
-    breakout_lookback = args_dict["breakout_lookback"]
+    # 백테스팅 실행
+    print(f"백테스팅을 시작합니다... (엔진: {args_dict['engine']})")
+    backtest_start = time.perf_counter()
+    cache = None if args_dict["no_cache"] else BacktestResultCache(args_dict["cache_dir"])
     
-    strategy.detect_sideways = lambda data, lookback=sideways_lookback, threshold=sideways_threshold: \
-        TrendFollowingStrategy.detect_sideways(strategy, data, lookback, threshold)
+    # 파일로 저장된 데이터셋은 지표 캐시 사용
+    indicators = IndicatorCache(strategy).load_or_compute(data, data_file) if os.path.exists(data_file) else None
     
-    strategy.identify_range_breakout = lambda data, lookback=breakout_lookback: \
-        TrendFollowingStrategy.identify_range_breakout(strategy, data, lookback)
+    results = strategy.backtest(data, engine=args_dict["engine"], indicators=indicators, cache=cache, profile=args_dict["profile"])
+    backtest_elapsed = time.perf_counter() - backtest_start
+    print(f"백테스팅 소요 시간: {backtest_elapsed:.2f}초 ({len(data) / backtest_elapsed:,.0f} bars/s)")
     
-    # 백테스팅 실행
-    print("백테스팅을 시작합니다...")
-    results = strategy.backtest(data)
+    if 'profile' in results:
+        print("\n===== 단계별 실행 시간 =====")
+        print(format_profile(results['profile']))
     
     # 결과 출력
     print("\n===== 백테스팅 결과 =====")
@@ -356,7 +766,7 @@ def main():
             print(f"- {reason}: {count}개 ({count/len(exit_trades)*100:.1f}%)")
     
     # 결과 시각화
-    strategy.plot_results(results)
+    strategy.plot_results(results, output=args_dict["plot_file"], max_points=args_dict["plot_points"])
     
     # 매매 내역 저장
     trades_file = os.path.join(data_dir, f"trades_{exchange}_{symbol.replace('/', '_')}_{timeframe}_{filename_suffix}.csv")
@@ -368,3 +778,22 @@ if __name__ == "__main__":
 
 ## 백테스팅 실행 방법
 # python backtesting.py --start_date 2023-01-01 --end_date 2025-05-21 --limit 1000 --sideways_lookback 5 --sideways_threshold 0.1 --breakout_lookback 3 --use_saved_data --save_data --data_dir data
+#
+## 컬럼형(.ohlcv) 형식으로 데이터 저장/사용 (CSV 변환은 columnar_store.py convert)
+# python backtesting.py --save_data --data_format npy
+# python backtesting.py stream --data_file data/binance_BTC_USDT_1m.ohlcv --chunk_size 100000
+# python backtesting.py stream --data_file data/binance_BTC_USDT_1m.ohlcv --range_start 2020-03-01 --range_end 2020-03-31
+# python backtesting.py stream --symbol BTC/USDT --timeframe 1m --start_date 2024-01-01 --end_date 2024-12-31 --fetch_workers 8
+#
+## 캔들 저장소 사용 (기본값: data/store, 저장소에 없는 구간만 거래소에서 가져옴)
+# python backtesting.py --start_date 2022-01-01 --end_date 2025-05-21 --store_dir data/store
+#
+## 파라미터 스윕 실행 방법 (모든 CPU 코어 사용)
+# python backtesting.py sweep --sideways_lookback 3:7:1 --sideways_threshold 0.05,0.1 --breakout_lookback 2:5:1 --risk_percentage 0.01:0.03:0.01
+#
+## 결과 그래프를 파일로 저장 (화면 없는 서버, 스윕 조합별 그래프)
+# python backtesting.py --use_saved_data --plot_file backtest_results.svg --plot_points 2000
+# python backtesting.py sweep --sideways_lookback 3:7:1 --plot_dir data/plots --plot_format png
+#
+## 스트리밍 백테스트 실행 방법 (청크 단위, 1분봉 등 대용량 데이터)
+# python backtesting.py stream --data_file data/binance_BTC_USDT_1m.csv --chunk_size 100000 --output_dir data/stream
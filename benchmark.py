@@ -0,0 +1,624 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import glob
+import json
+import time
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from strategy import TrendFollowingStrategy
+from kline_parser import KLINE_COLUMNS, klines_to_frame
+from candle_buffer import CandleBuffer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 측정 대상 (이름, 백테스팅 엔진)
+STAGES = (
+    ('calculate_ema', None),
+    ('calculate_atr', None),
+    ('detect_sideways', None),
+    ('identify_range_breakout', None),
+    ('backtest', 'pandas'),
+    ('backtest', 'array'),
+    ('backtest', 'sparse'),
+    ('calculate_results', None),
+)
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# 시작 시간을 측정할 모듈 (실시간 트레이더가 불러오는 경로)
+STARTUP_MODULES = ('strategy', 'auto_trader', 'auto_trader_futures')
+
+# kline 파싱을 측정할 응답 크기 (트레이더 기본 limit=100, API 최대 1000/1500)
+KLINE_SIZES = (100, 500, 1000, 1500)
+
+# 트레이더 시작 경로에서 불러오면 안 되는 모듈 (백테스트 시각화/데이터 수집 전용)
+HEAVY_MODULES = ('matplotlib', 'ccxt')
+
+# 새 인터프리터에서 모듈 하나를 불러오는 데 걸리는 시간, 최대 RSS, 함께 불러온 무거운 모듈 측정
+_STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+try:
+    __import__(sys.argv[1])
+    error = None
+except Exception as e:
+    error = f"{type(e).__name__}: {e}"
+seconds = time.perf_counter() - start
+try:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+except ImportError:
+    peak_rss_mb = None
+heavy = [name for name in sys.argv[2:] if name in sys.modules]
+print(json.dumps({'seconds': seconds, 'peak_rss_mb': peak_rss_mb, 'heavy_modules': heavy, 'error': error}))
+'''
+
+
+def load_dataset(path):
+    """
+    벤치마크용 OHLCV CSV 파일 불러오기
+
+    Args:
+        path (str): CSV 파일 경로
+
+    Returns:
+        pandas.DataFrame: timestamp 인덱스의 OHLCV 데이터 (OHLCV 파일이 아니면 None)
+    """
+    data = pd.read_csv(path)
+    if 'timestamp' not in data.columns or not all(column in data.columns for column in OHLCV_COLUMNS):
+        return None
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    data.set_index('timestamp', inplace=True)
+    return data[list(OHLCV_COLUMNS)]
+
+
+def scale_dataset(data, factor):
+    """
+    실제 캔들을 factor배 길이의 합성 데이터로 확장
+
+    직전 종가 대비 시가/고가/저가/종가 비율을 반복해 이어 붙여 가격 경로를 만든다.
+    반복할수록 가격이 한 방향으로 발산하지 않도록 평균 로그 수익률은 제거한다.
+
+    Args:
+        data (pandas.DataFrame): timestamp 인덱스의 OHLCV 데이터
+        factor (int): 확장 배수
+
+    Returns:
+        pandas.DataFrame: len(data) * factor개 캔들의 OHLCV 데이터
+    """
+    if factor <= 1:
+        return data
+
+    close = data['close'].to_numpy(dtype=np.float64)
+    prev_close = np.r_[close[0], close[:-1]]
+    drift = np.exp(-np.mean(np.log(close / prev_close)))
+    ratios = {
+        column: np.tile(data[column].to_numpy(dtype=np.float64) / prev_close * drift, factor)
+        for column in ('open', 'high', 'low', 'close')
+    }
+
+    scaled_close = close[0] * np.cumprod(ratios['close'])
+    scaled_prev_close = np.r_[close[0], scaled_close[:-1]]
+
+    step = pd.Series(data.index).diff().median()
+    index = pd.DatetimeIndex(data.index[0] + step * np.arange(len(data) * factor), name=data.index.name)
+
+    return pd.DataFrame({
+        'open': scaled_prev_close * ratios['open'],
+        'high': scaled_prev_close * ratios['high'],
+        'low': scaled_prev_close * ratios['low'],
+        'close': scaled_close,
+        'volume': np.tile(data['volume'].to_numpy(dtype=np.float64), factor)
+    }, index=index)
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _time_best(func, repeat, setup=None):
+    """repeat번 실행해 가장 짧은 실행 시간(초) 반환 (setup 시간은 제외)"""
+    best = float('inf')
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _window_positions(n, samples):
+    """창 단위 함수를 호출할 캔들 위치 (최대 samples개를 고르게 선택)"""
+    positions = np.arange(50, n)
+    if samples and len(positions) > samples:
+        positions = positions[np.linspace(0, len(positions) - 1, samples).astype(int)]
+    return positions.tolist()
+
+
+def run_case(case):
+    """
+    벤치마크 케이스 하나 실행 (케이스마다 별도 프로세스에서 실행해 최대 RSS를 분리)
+
+    Args:
+        case (dict): stage, engine, dataset, scale, repeat, window_samples
+
+    Returns:
+        dict: 측정 결과 (bars, seconds, bars_per_sec, base_rss_mb, peak_rss_mb)
+    """
+    # 모듈 로드까지의 RSS (케이스 실행 전)
+    base_rss = peak_rss_mb()
+
+    data = scale_dataset(load_dataset(case['dataset']), case['scale'])
+    stage = case['stage']
+    repeat = case['repeat']
+    strategy = TrendFollowingStrategy(initial_capital=10000, risk_percentage=0.02, leverage=3)
+    bars = len(data)
+
+    if stage == 'calculate_ema':
+        seconds = _time_best(lambda: strategy.calculate_ema(data, 20), repeat)
+    elif stage == 'calculate_atr':
+        seconds = _time_best(lambda: strategy.calculate_atr(data, 14), repeat)
+    elif stage == 'detect_sideways':
+        # backtest()와 같은 창 크기로 캔들마다 호출
+        positions = _window_positions(len(data), case['window_samples'])
+        bars = len(positions)
+        seconds = _time_best(lambda: [strategy.detect_sideways(data.iloc[i - 10:i], lookback=5, threshold=0.1) for i in positions], repeat)
+    elif stage == 'identify_range_breakout':
+        positions = _window_positions(len(data), case['window_samples'])
+        bars = len(positions)
+        seconds = _time_best(lambda: [strategy.identify_range_breakout(data.iloc[i - 4:i + 1], lookback=3) for i in positions], repeat)
+    elif stage == 'backtest':
+        # 매번 새 전략으로 실행 (지표 계산 포함, backtest는 data를 변경하지 않음)
+        def setup():
+            return (TrendFollowingStrategy(initial_capital=10000, risk_percentage=0.02, leverage=3),)
+        seconds = _time_best(lambda s: s.backtest(data, engine=case['engine']), repeat, setup)
+    elif stage == 'calculate_results':
+        strategy.backtest(data, engine='sparse')
+        bars = len(strategy.equity_curve)
+        seconds = _time_best(strategy.calculate_results, repeat)
+    else:
+        raise ValueError(f"알 수 없는 벤치마크 단계입니다: {stage}")
+
+    return {
+        'bars': bars,
+        'seconds': seconds,
+        'bars_per_sec': bars / seconds if seconds > 0 else float('inf'),
+        'base_rss_mb': base_rss,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def measure_startup(module, repeat=5):
+    """
+    모듈 import 시간 측정 (매번 새 인터프리터에서 실행, 가장 짧은 시간 사용)
+
+    Args:
+        module (str): 모듈 이름
+        repeat (int): 반복 횟수
+
+    Returns:
+        dict: name, seconds, peak_rss_mb, heavy_modules, error
+    """
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', _STARTUP_SCRIPT, module, *HEAVY_MODULES],
+            cwd=repo_dir, capture_output=True, text=True, check=True
+        ).stdout
+        measured = json.loads(output.strip().splitlines()[-1])
+        if best is None or measured['seconds'] < best['seconds']:
+            best = measured
+    return {'name': f"import[{module}]", **best}
+
+
+def run_startup_benchmarks(modules, repeat=5):
+    """
+    트레이더 시작 경로 import 시간 측정
+
+    Args:
+        modules (list): 측정할 모듈 목록
+        repeat (int): 모듈별 반복 횟수
+
+    Returns:
+        list: 모듈별 결과 (불러올 수 없는 모듈은 error에 이유 기록)
+    """
+    results = []
+    for module in modules:
+        result = measure_startup(module, repeat)
+        results.append(result)
+        if result['error']:
+            print(f"  {result['name']:<30} 불러올 수 없음 ({result['error']})")
+            continue
+        heavy = ', '.join(result['heavy_modules']) or '없음'
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else '-'
+        print(f"  {result['name']:<30} {result['seconds'] * 1000:>8.0f} ms  최대 RSS {rss:>7}  무거운 모듈: {heavy}")
+    return results
+
+
+def check_startup(startup, baseline=None, tolerance=0.25):
+    """
+    시작 경로에 무거운 모듈이 포함됐는지, 기준 결과보다 느려졌는지 확인
+
+    Args:
+        startup (list): 현재 시작 시간 결과
+        baseline (list): 기준 시작 시간 결과 (선택)
+        tolerance (float): 허용하는 import 시간 증가 비율
+
+    Returns:
+        list: 문제 목록 (key, 항목, 기준값, 현재값)
+    """
+    baseline_by_name = {result['name']: result for result in baseline or []}
+    problems = []
+    for result in startup:
+        if result['error']:
+            continue
+        if result['heavy_modules']:
+            problems.append((result['name'], 'heavy_modules', '', ', '.join(result['heavy_modules'])))
+        base = baseline_by_name.get(result['name'])
+        if base and not base.get('error') and result['seconds'] > base['seconds'] * (1 + tolerance):
+            problems.append((result['name'], 'seconds', base['seconds'], result['seconds']))
+    return problems
+
+
+def make_klines(n, start_ms=1672531200000, interval_ms=4 * 60 * 60 * 1000, seed=0):
+    """Binance get_klines/futures_klines 응답과 같은 형식(가격은 문자열)의 합성 kline 목록"""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.005, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.005, n))
+    volume = rng.uniform(10, 1000, n)
+    klines = []
+    for i in range(n):
+        open_time = start_ms + i * interval_ms
+        klines.append([
+            open_time, f"{open_[i]:.2f}", f"{high[i]:.2f}", f"{low[i]:.2f}", f"{close[i]:.2f}", f"{volume[i]:.5f}",
+            open_time + interval_ms - 1, f"{volume[i] * close[i]:.5f}", int(volume[i] * 10),
+            f"{volume[i] / 2:.5f}", f"{volume[i] * close[i] / 2:.5f}", "0"
+        ])
+    return klines
+
+
+def legacy_klines_to_frame(klines):
+    """이전 fetch_latest_data의 파싱 방식 (12개 object 컬럼 DataFrame 후 컬럼별 형변환), 비교 기준"""
+    df = pd.DataFrame(klines, columns=list(KLINE_COLUMNS))
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    for column in ('open', 'high', 'low', 'close', 'volume'):
+        df[column] = df[column].astype(float)
+    df.set_index('timestamp', inplace=True)
+    return df
+
+
+def run_kline_benchmarks(sizes, repeat=200):
+    """
+    트레이더 사이클당 kline 파싱 시간 측정 (이전 방식 vs kline_parser)
+
+    Args:
+        sizes (list): 응답 kline 개수 목록
+        repeat (int): 크기별 반복 횟수 (최소 시간 사용)
+
+    Returns:
+        list: 크기별 결과 (name, klines, legacy_seconds, seconds, speedup)
+    """
+    results = []
+    for n in sizes:
+        klines = make_klines(n)
+        legacy, fast = legacy_klines_to_frame(klines), klines_to_frame(klines)
+        # 트레이더가 사용하는 컬럼 값이 같은지 확인
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            if not np.array_equal(legacy[column].to_numpy(), fast[column].to_numpy()):
+                raise AssertionError(f"kline 파싱 결과가 다릅니다: {column}")
+        if not (legacy.index == fast.index).all():
+            raise AssertionError("kline 파싱 결과가 다릅니다: timestamp")
+
+        legacy_seconds = _time_best(lambda: legacy_klines_to_frame(klines), repeat)
+        seconds = _time_best(lambda: klines_to_frame(klines), repeat)
+        result = {
+            'name': f"klines[{n}]",
+            'klines': n,
+            'legacy_seconds': legacy_seconds,
+            'seconds': seconds,
+            'speedup': legacy_seconds / seconds if seconds > 0 else float('inf')
+        }
+        results.append(result)
+        print(f"  {result['name']:<30} 이전 {legacy_seconds * 1e6:>8.0f} us  ->  {seconds * 1e6:>6.0f} us  ({result['speedup']:.1f}x)")
+    return results
+
+
+def run_cycle_benchmark(repeat=200, limit=100):
+    """
+    트레이더 사이클당 캔들 준비 시간 측정 (limit개 kline 파싱 + EMA 3개 재계산 vs 캔들 버퍼에 최신 2개 반영)
+
+    Returns:
+        dict: klines_to_frame 결과와 같은 형식 (klines는 사이클당 받는 kline 수)
+    """
+    klines = make_klines(limit + repeat + 1)
+    strategy = TrendFollowingStrategy()
+
+    def legacy(k):
+        df = klines_to_frame(klines[k:k + limit])
+        for period in (10, 20, 50):
+            df[f"ema{period}"] = strategy.calculate_ema(df, period)
+        return df
+
+    buffer = CandleBuffer('4h', capacity=limit)
+    buffer.seed(klines[:limit])
+    cycle = [limit]
+
+    def buffered():
+        # 매 사이클 새 캔들 하나가 열린 상황 (직전 마감 캔들 + 진행 중 캔들)
+        k = cycle[0]
+        cycle[0] += 1
+        buffer.refresh(lambda n: klines[k + 1 - n:k + 1])
+        return buffer.frame(limit)
+
+    legacy_seconds = _time_best(lambda: legacy(0), repeat)
+    seconds = _time_best(buffered, repeat)
+    result = {
+        'name': 'cycle[candle_buffer]',
+        'klines': 2,
+        'legacy_seconds': legacy_seconds,
+        'seconds': seconds,
+        'speedup': legacy_seconds / seconds if seconds > 0 else float('inf')
+    }
+    print(f"  {result['name']:<30} 이전 {legacy_seconds * 1e6:>8.0f} us  ->  {seconds * 1e6:>6.0f} us  ({result['speedup']:.1f}x, "
+          f"사이클당 kline {limit}개 -> 2개)")
+    return result
+
+
+def check_klines(klines, baseline=None, tolerance=0.25):
+    """
+    kline 파싱이 이전 방식보다 느려졌는지, 기준 결과보다 느려졌는지 확인
+
+    Args:
+        klines (list): 현재 kline 파싱 결과
+        baseline (list): 기준 kline 파싱 결과 (선택)
+        tolerance (float): 허용하는 파싱 시간 증가 비율
+
+    Returns:
+        list: 문제 목록 (key, 항목, 기준값, 현재값)
+    """
+    baseline_by_name = {result['name']: result for result in baseline or []}
+    problems = []
+    for result in klines:
+        if result['seconds'] > result['legacy_seconds']:
+            problems.append((result['name'], 'seconds', result['legacy_seconds'], result['seconds']))
+        base = baseline_by_name.get(result['name'])
+        if base and result['seconds'] > base['seconds'] * (1 + tolerance):
+            problems.append((result['name'], 'seconds', base['seconds'], result['seconds']))
+    return problems
+
+
+def case_name(stage, engine):
+    return f"{stage}[{engine}]" if engine else stage
+
+
+def case_key(result):
+    """기준 결과와 비교할 때 사용하는 케이스 식별자"""
+    return f"{result['name']}|{result['dataset']}|x{result['scale']}"
+
+
+def run_benchmarks(datasets, scales, stages, repeat=3, window_samples=2000, max_pandas_bars=20000, isolate=True):
+    """
+    벤치마크 실행
+
+    Args:
+        datasets (list): OHLCV CSV 파일 경로 목록
+        scales (list): 데이터 확장 배수 목록
+        stages (list): (단계 이름, 엔진) 목록
+        repeat (int): 케이스별 반복 횟수 (최소 시간 사용)
+        window_samples (int): 창 단위 함수(detect_sideways 등)의 최대 호출 수
+        max_pandas_bars (int): pandas 엔진 백테스트를 실행할 최대 캔들 수
+        isolate (bool): 케이스마다 별도 프로세스에서 실행 (최대 RSS 분리)
+
+    Returns:
+        list: 케이스별 결과
+    """
+    results = []
+    context = multiprocessing.get_context('spawn')
+
+    for dataset in datasets:
+        base_bars = len(load_dataset(dataset))
+        for scale in scales:
+            for stage, engine in stages:
+                if engine == 'pandas' and base_bars * scale > max_pandas_bars:
+                    print(f"  건너뜀: {case_name(stage, engine)} {os.path.basename(dataset)} x{scale} ({base_bars * scale}개 캔들)")
+                    continue
+
+                case = {
+                    'stage': stage, 'engine': engine, 'dataset': dataset, 'scale': scale,
+                    'repeat': repeat, 'window_samples': window_samples
+                }
+                if isolate:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        measured = executor.submit(run_case, case).result()
+                else:
+                    measured = run_case(case)
+
+                result = {
+                    'name': case_name(stage, engine),
+                    'dataset': os.path.basename(dataset),
+                    'scale': scale,
+                    **measured
+                }
+                results.append(result)
+
+                rss = '-'
+                if result['peak_rss_mb'] is not None:
+                    rss = f"{result['peak_rss_mb']:.0f} MB (+{result['peak_rss_mb'] - result['base_rss_mb']:.0f} MB)"
+                print(f"  {result['name']:<26} {result['dataset']:<45} x{scale:<4} {result['bars']:>9}개 "
+                      f"{result['bars_per_sec']:>14,.0f} bars/s  최대 RSS {rss}")
+    return results
+
+
+def compare_results(results, baseline, tolerance=0.1, rss_tolerance=0.2):
+    """
+    기준 결과 대비 성능 저하 확인
+
+    Args:
+        results (list): 현재 결과
+        baseline (list): 기준 결과
+        tolerance (float): 허용하는 처리량(bars/s) 감소 비율
+        rss_tolerance (float): 허용하는 최대 RSS 증가 비율
+
+    Returns:
+        list: 성능 저하 케이스 목록 (key, 항목, 기준값, 현재값)
+    """
+    baseline_by_key = {case_key(result): result for result in baseline}
+    regressions = []
+
+    print(f"\n{'케이스':<70} {'기준 bars/s':>14} {'현재 bars/s':>14} {'변화':>8}")
+    for result in results:
+        key = case_key(result)
+        base = baseline_by_key.get(key)
+        if base is None:
+            print(f"{key:<70} {'-':>14} {result['bars_per_sec']:>14,.0f} {'new':>8}")
+            continue
+
+        ratio = result['bars_per_sec'] / base['bars_per_sec'] if base['bars_per_sec'] > 0 else float('inf')
+        flag = ''
+        if ratio < 1 - tolerance:
+            regressions.append((key, 'bars_per_sec', base['bars_per_sec'], result['bars_per_sec']))
+            flag = '  << 성능 저하'
+        if (result.get('peak_rss_mb') is not None and base.get('peak_rss_mb') is not None and
+                result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + rss_tolerance)):
+            regressions.append((key, 'peak_rss_mb', base['peak_rss_mb'], result['peak_rss_mb']))
+            flag += f"  << 메모리 증가 ({base['peak_rss_mb']:.0f} -> {result['peak_rss_mb']:.0f} MB)"
+        print(f"{key:<70} {base['bars_per_sec']:>14,.0f} {result['bars_per_sec']:>14,.0f} {ratio - 1:>+8.1%}{flag}")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='전략/백테스팅 파이프라인 벤치마크')
+    parser.add_argument('--data', type=str, default=os.path.join('data', '*.csv'), help='벤치마크할 OHLCV CSV 파일 (glob 패턴)')
+    parser.add_argument('--scales', type=str, default='1,10', help='합성 데이터 확장 배수 목록 (예: 1,10,100)')
+    parser.add_argument('--stages', type=str, default=None, help='실행할 단계 (예: calculate_ema,backtest[sparse], 기본값: 전체)')
+    parser.add_argument('--repeat', type=int, default=3, help='케이스별 반복 횟수 (최소 시간 사용)')
+    parser.add_argument('--window_samples', type=int, default=2000, help='detect_sideways/identify_range_breakout 최대 호출 수')
+    parser.add_argument('--max_pandas_bars', type=int, default=20000, help='pandas 엔진 백테스트를 실행할 최대 캔들 수')
+    parser.add_argument('--no_isolate', action='store_true', help='케이스를 현재 프로세스에서 실행 (최대 RSS가 누적됨)')
+    parser.add_argument('--output', type=str, default='benchmark_results.json', help='결과 JSON 파일 경로')
+    parser.add_argument('--baseline', type=str, default=None, help='비교할 기준 결과 JSON 파일')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='허용하는 처리량 감소 비율 (0.1 = 10%%)')
+    parser.add_argument('--rss_tolerance', type=float, default=0.2, help='허용하는 최대 RSS 증가 비율 (0.2 = 20%%)')
+    parser.add_argument('--suite', type=str, default='all', choices=['all', 'pipeline', 'startup', 'klines'],
+                        help='실행할 벤치마크 (pipeline: 지표/백테스트 처리량, startup: 트레이더 import 시간, klines: 트레이더 kline 파싱 시간)')
+    parser.add_argument('--startup_repeat', type=int, default=5, help='모듈별 import 시간 측정 횟수')
+    parser.add_argument('--startup_tolerance', type=float, default=0.25, help='허용하는 import 시간 증가 비율')
+    parser.add_argument('--kline_sizes', type=str, default=','.join(str(n) for n in KLINE_SIZES), help='측정할 kline 응답 크기 목록')
+    parser.add_argument('--kline_repeat', type=int, default=200, help='크기별 kline 파싱 측정 횟수')
+    parser.add_argument('--kline_tolerance', type=float, default=0.25, help='허용하는 kline 파싱 시간 증가 비율')
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat
+        },
+        'results': [],
+        'startup': [],
+        'klines': []
+    }
+
+    if args.suite in ('all', 'startup'):
+        print(f"트레이더 시작 시간 측정: {', '.join(STARTUP_MODULES)}")
+        report['startup'] = run_startup_benchmarks(STARTUP_MODULES, args.startup_repeat)
+
+    if args.suite in ('all', 'klines'):
+        print("트레이더 kline 파싱 시간 측정 (사이클당)")
+        report['klines'] = run_kline_benchmarks([int(n) for n in args.kline_sizes.split(',')], args.kline_repeat)
+        report['klines'].append(run_cycle_benchmark(args.kline_repeat))
+
+    if args.suite in ('all', 'pipeline'):
+        report['results'] = run_pipeline(args)
+        if report['results'] is None:
+            return 1
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n결과가 저장되었습니다: {args.output}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = []
+    if report['results'] and args.baseline:
+        regressions += compare_results(report['results'], baseline.get('results', []), args.tolerance, args.rss_tolerance)
+    regressions += check_startup(report['startup'], baseline.get('startup'), args.startup_tolerance)
+    regressions += check_klines(report['klines'], baseline.get('klines'), args.kline_tolerance)
+
+    if regressions:
+        print(f"\n성능 저하 {len(regressions)}건:")
+        for key, metric, before, after in regressions:
+            if metric == 'heavy_modules':
+                print(f"- {key}: 시작 경로에서 {after} 모듈을 불러옴")
+            else:
+                print(f"- {key}: {metric} {before:,.3f} -> {after:,.3f}")
+        return 1
+    if args.baseline:
+        print("\n성능 저하 없음")
+
+    return 0
+
+
+def run_pipeline(args):
+    """지표/백테스트 처리량 벤치마크 실행 (데이터 파일이 없으면 None)"""
+    datasets = [path for path in sorted(glob.glob(args.data)) if load_dataset(path) is not None]
+    if not datasets:
+        print(f"OHLCV 데이터 파일이 없습니다: {args.data}")
+        return None
+
+    stages = list(STAGES)
+    if args.stages:
+        selected = set(args.stages.split(','))
+        stages = [(stage, engine) for stage, engine in STAGES if case_name(stage, engine) in selected or stage in selected]
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+
+    print(f"벤치마크 실행: 데이터 {len(datasets)}개, 배수 {scales}, 단계 {len(stages)}개")
+    return run_benchmarks(
+        datasets, scales, stages,
+        repeat=args.repeat,
+        window_samples=args.window_samples,
+        max_pandas_bars=args.max_pandas_bars,
+        isolate=not args.no_isolate
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+## 벤치마크 실행 방법
+# python benchmark.py --scales 1,10 --output benchmark_baseline.json
+# python benchmark.py --scales 1,10 --baseline benchmark_baseline.json   # 성능 저하가 있으면 종료 코드 1
+# python benchmark.py --suite startup   # 트레이더 import 경로에 matplotlib/ccxt가 포함되면 종료 코드 1
+# python benchmark.py --suite klines   # 트레이더 kline 파싱 시간 (이전 방식 대비), 이전 방식보다 느리면 종료 코드 1
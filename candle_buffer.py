@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+from kline_parser import OHLCV_COLUMNS, parse_klines
+from market_data import parse_timeframe
+
+
+class CandleBuffer:
+    """
+    실시간 트레이더용 고정 크기 캔들 링 버퍼 (EMA를 캔들마다 이어서 계산)
+
+    시작할 때 REST로 capacity개를 한 번 채운 뒤에는 최신 캔들(마감된 캔들 + 진행 중인 캔들)만 반영한다.
+    진행 중인 캔들이 갱신되면 마지막 행만 덮어쓰고 EMA도 직전 값에서 한 단계만 다시 계산하므로
+    사이클마다 캔들 전체를 다시 받거나 EMA를 처음부터 계산하지 않는다.
+
+    저장 배열은 2*capacity 길이로 두고 같은 행을 두 위치에 기록해, 최근 캔들 구간이 항상 연속된 슬라이스가 되게 한다.
+    EMA는 TrendFollowingStrategy.calculate_ema(ewm(span, adjust=False))와 같은 식이고,
+    버퍼 앞부분 캔들에서 다시 시작하지 않고 시작 이후 전체 기록에 이어서 계산된다.
+    seed로 받은 kline 중간에 빈 구간(거래소 점검 등)이 있으면 calculate_ema처럼 빈 구간을 건너뛰어 이어서 계산한다.
+    """
+
+    def __init__(self, timeframe, capacity=100, ema_periods=(10, 20, 50)):
+        """
+        Args:
+            timeframe (str): 캔들 주기 (예: '4h', 빈 구간 확인용)
+            capacity (int): 보관할 캔들 수
+            ema_periods (tuple): 계산할 EMA 기간 (컬럼 이름은 ema10, ema20 ...)
+        """
+        self.timeframe_ms = parse_timeframe(timeframe) * 1000
+        self.capacity = capacity
+        self.ema_periods = tuple(ema_periods)
+        self.columns = list(OHLCV_COLUMNS) + [f"ema{period}" for period in self.ema_periods]
+        self._alphas = np.array([2.0 / (period + 1) for period in self.ema_periods])
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((2 * capacity, len(self.columns)), dtype=np.float64)
+        self._position = 0
+        self.count = 0
+
+    @property
+    def last_timestamp(self):
+        """마지막 캔들의 시작 시각 (밀리초, 비어 있으면 None)"""
+        if self.count == 0:
+            return None
+        return int(self._timestamps[self._position - 1 + self.capacity])
+
+    def _ema(self, close, previous):
+        """직전 EMA에서 한 단계 계산 (pandas ewm(adjust=False)와 같은 연산 순서)"""
+        if previous is None:
+            return np.full(len(self._alphas), close)
+        old = 1.0 - self._alphas
+        return (old * previous + self._alphas * close) / (old + self._alphas)
+
+    def _write(self, slot, timestamp, ohlcv, previous_ema):
+        row = np.empty(len(self.columns))
+        row[:5] = ohlcv
+        row[5:] = self._ema(ohlcv[3], previous_ema)
+        for index in (slot, slot + self.capacity):
+            self._timestamps[index] = timestamp
+            self._values[index] = row
+
+    def _previous_ema(self, back):
+        """마지막에서 back번째 앞 캔들의 EMA (없으면 None)"""
+        if self.count < back:
+            return None
+        return self._values[self._position - back + self.capacity, 5:].copy()
+
+    def seed(self, klines):
+        """
+        REST로 받은 kline으로 버퍼를 새로 채움 (기존 내용은 버림, 중간의 빈 구간은 허용)
+
+        Args:
+            klines (list): get_klines/futures_klines 응답 (시간순)
+
+        Returns:
+            bool: 캔들을 채웠는지 여부 (응답이 비어 있으면 False)
+        """
+        self._position = 0
+        self.count = 0
+        timestamps, values = parse_klines(klines)
+        for timestamp, ohlcv in zip(timestamps.tolist(), values):
+            self._apply(timestamp, ohlcv, allow_gap=True)
+        return self.count > 0
+
+    def update(self, kline):
+        """
+        kline 하나 반영 (같은 시작 시각이면 마지막 캔들 갱신, 다음 캔들이면 추가)
+
+        Args:
+            kline (list): REST kline 형식 항목 (스트림 이벤트는 kline_parser.parse_kline_event로 변환)
+
+        Returns:
+            bool: 반영 여부 (마지막 캔들과 사이에 빠진 캔들이 있으면 False, 다시 seed 필요)
+        """
+        timestamp = int(kline[0])
+        ohlcv = np.array([float(value) for value in kline[1:6]])
+        return self._apply(timestamp, ohlcv)
+
+    def extend(self, klines):
+        """
+        kline 여러 개를 시간순으로 반영
+
+        Returns:
+            bool: 모두 반영했는지 여부 (빈 구간이 있으면 False)
+        """
+        timestamps, values = parse_klines(klines)
+        for timestamp, ohlcv in zip(timestamps.tolist(), values):
+            if not self._apply(timestamp, ohlcv):
+                return False
+        return True
+
+    def _apply(self, timestamp, ohlcv, allow_gap=False):
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            # 이미 지난 캔들 (마감 전 갱신이 늦게 도착한 경우 등)
+            return True
+        if last is not None and timestamp == last:
+            self._write((self._position - 1) % self.capacity, timestamp, ohlcv, self._previous_ema(2))
+            return True
+        if last is not None and timestamp - last > self.timeframe_ms and not allow_gap:
+            return False
+        self._write(self._position, timestamp, ohlcv, self._previous_ema(1))
+        self._position = (self._position + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def refresh(self, fetch, tail=2):
+        """
+        REST로 최신 캔들만 가져와 반영 (비어 있거나 빈 구간이 생기면 capacity개로 다시 채움)
+
+        다시 채운 kline 안의 빈 구간은 그대로 두므로 다음 사이클부터는 다시 tail개만 가져온다.
+
+        Args:
+            fetch (callable): limit를 받아 kline 목록을 돌려주는 함수 (예: futures_klines 호출)
+            tail (int): 평소 가져올 캔들 수 (직전 마감 캔들 + 진행 중 캔들)
+
+        Returns:
+            int: 이번에 가져온 kline 수
+
+        Raises:
+            ValueError: 다시 채울 kline을 받지 못한 경우
+        """
+        if self.count == 0:
+            klines = fetch(self.capacity)
+            if not self.seed(klines):
+                raise ValueError("캔들 버퍼를 채울 kline 데이터가 없습니다.")
+            return len(klines)
+        klines = fetch(tail)
+        if self.extend(klines):
+            return len(klines)
+        seed = fetch(self.capacity)
+        if not self.seed(seed):
+            raise ValueError("캔들 버퍼를 채울 kline 데이터가 없습니다.")
+        return len(klines) + len(seed)
+
+    def frame(self, limit=None, end_time=None):
+        """
+        최근 캔들의 DataFrame (OHLCV + EMA 컬럼, 버퍼와 메모리를 공유하지 않는 복사본)
+
+        Args:
+            limit (int): 최대 캔들 수 (None이면 전체)
+            end_time (int): 이 시각(밀리초) 이후에 시작한 캔들 제외
+
+        Returns:
+            pandas.DataFrame: timestamp 인덱스의 데이터
+        """
+        end = self._position + self.capacity
+        start = end - self.count
+        timestamps = self._timestamps[start:end]
+        if end_time is not None:
+            end = start + int(np.searchsorted(timestamps, end_time, side='right'))
+            timestamps = self._timestamps[start:end]
+        if limit is not None:
+            start = max(start, end - limit)
+            timestamps = self._timestamps[start:end]
+        index = pd.DatetimeIndex(timestamps.astype('datetime64[ms]'), name='timestamp')
+        return pd.DataFrame(self._values[start:end].copy(), index=index, columns=self.columns)
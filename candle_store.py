@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from market_data import parse_timeframe, NoDataError
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def to_milliseconds(value):
+    """datetime/Timestamp/날짜 문자열/정수(밀리초)를 밀리초 타임스탬프로 변환"""
+    if isinstance(value, int):
+        return value
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def merge_ranges(ranges):
+    """
+    [시작, 끝] 구간 목록을 정렬하고 겹치거나 맞닿은 구간을 합침
+
+    Args:
+        ranges (iterable): (시작, 끝) 밀리초 구간 목록 (양 끝 포함)
+
+    Returns:
+        list: 합쳐진 [시작, 끝] 구간 목록
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def subtract_ranges(start, end, ranges):
+    """
+    [start, end] 중 ranges에 포함되지 않은 구간 목록
+
+    Args:
+        start (int): 시작 (밀리초, 포함)
+        end (int): 끝 (밀리초, 포함)
+        ranges (list): merge_ranges()로 합친 구간 목록
+
+    Returns:
+        list: 빠진 [시작, 끝] 구간 목록
+    """
+    missing = []
+    current = start
+    for range_start, range_end in ranges:
+        if range_end < current:
+            continue
+        if range_start > end:
+            break
+        if range_start > current:
+            missing.append([current, range_start - 1])
+        current = max(current, range_end + 1)
+    if current <= end:
+        missing.append([current, end])
+    return missing
+
+
+class CandleStore:
+    """
+    거래소/심볼/시간프레임별 로컬 캔들 저장소
+
+    캔들은 '<거래소>_<심볼>_<시간프레임>.csv' 하나에 시간순으로 모으고, 거래소에서 확인한 시간 구간을
+    '<...>.ranges.json'에 기록한다. 요청한 기간 중 기록되지 않은 구간만 거래소에서 가져오므로
+    기간이 겹치는 요청은 로컬에서 바로 처리된다. 새 캔들이 모두 기존 캔들 뒤에 있으면 파일 끝에 추가한다.
+    """
+
+    def __init__(self, root='data/store', exchange='binance', symbol='BTC/USDT', timeframe='4h'):
+        """
+        Args:
+            root (str): 저장소 디렉토리
+            exchange (str): 거래소 ID
+            symbol (str): 심볼 (예: 'BTC/USDT')
+            timeframe (str): 시간프레임 (예: '1h', '4h', '1d')
+        """
+        self.root = root
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.timeframe_ms = parse_timeframe(timeframe) * 1000
+
+        name = f"{exchange}_{symbol.replace('/', '_')}_{timeframe}"
+        self.data_path = os.path.join(root, f"{name}.csv")
+        self.ranges_path = os.path.join(root, f"{name}.ranges.json")
+        self.ranges = self._load_ranges()
+
+    def _load_ranges(self):
+        if not os.path.exists(self.ranges_path):
+            return []
+        with open(self.ranges_path) as f:
+            return merge_ranges(json.load(f)['ranges'])
+
+    def _save_ranges(self):
+        tmp_path = self.ranges_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'exchange': self.exchange, 'symbol': self.symbol, 'timeframe': self.timeframe,
+                       'ranges': self.ranges}, f)
+        os.replace(tmp_path, self.ranges_path)
+
+    def _read(self):
+        """저장된 전체 캔들 (timestamp 인덱스)"""
+        if not os.path.exists(self.data_path):
+            return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='timestamp'))
+        data = pd.read_csv(self.data_path)
+        data['timestamp'] = pd.to_datetime(data['timestamp'])
+        return data.set_index('timestamp')
+
+    def _last_timestamp(self):
+        """저장된 마지막 캔들 타임스탬프 (파일 끝만 읽음, 없으면 None)"""
+        if not os.path.exists(self.data_path) or os.path.getsize(self.data_path) == 0:
+            return None
+        with open(self.data_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            last_line = f.read().decode().strip().splitlines()[-1]
+        if last_line.startswith('timestamp'):
+            return None
+        return pd.Timestamp(last_line.split(',', 1)[0])
+
+    def missing_ranges(self, start, end):
+        """
+        [start, end] 중 저장소에 없는 구간 목록
+
+        Args:
+            start: 시작 시각 (밀리초 또는 datetime/문자열)
+            end: 종료 시각 (밀리초 또는 datetime/문자열, 포함)
+
+        Returns:
+            list: [시작, 끝] 밀리초 구간 목록
+        """
+        return subtract_ranges(to_milliseconds(start), to_milliseconds(end), self.ranges)
+
+    def add(self, candles, start=None, end=None):
+        """
+        캔들을 저장소에 추가하고 확인한 구간 기록
+
+        Args:
+            candles (pandas.DataFrame): timestamp 인덱스의 OHLCV 데이터
+            start: 확인한 구간 시작 (None이면 첫 캔들)
+            end: 확인한 구간 끝 (None이면 마지막 캔들, 포함)
+        """
+        candles = candles[OHLCV_COLUMNS].sort_index()
+        candles = candles[~candles.index.duplicated(keep='last')]
+        self._write(candles)
+
+        if start is None and not candles.empty:
+            start = candles.index[0]
+        if end is None and not candles.empty:
+            end = candles.index[-1]
+        if start is not None and end is not None:
+            self._cover(to_milliseconds(start), to_milliseconds(end))
+
+    def _write(self, candles):
+        """정렬/중복 제거된 캔들을 파일에 반영"""
+        if candles.empty:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        last = self._last_timestamp()
+        if last is not None and candles.index[0] > last:
+            # 기존 캔들 뒤의 새 캔들은 파일 끝에 추가
+            candles.reset_index().to_csv(self.data_path, mode='a', header=False, index=False)
+            return
+        stored = self._read()
+        merged = pd.concat([stored, candles]) if not stored.empty else candles
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        tmp_path = self.data_path + '.tmp'
+        merged.reset_index().to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.data_path)
+
+    def _cover(self, start, end, holes=()):
+        """[start, end]를 보유 구간으로 기록 (holes 구간 제외)"""
+        ranges = []
+        for range_start, range_end in merge_ranges(self.ranges + [[start, end]]):
+            ranges.extend(subtract_ranges(range_start, range_end, merge_ranges(holes)))
+        self.ranges = ranges
+        os.makedirs(self.root, exist_ok=True)
+        self._save_ranges()
+
+    def load(self, start=None, end=None):
+        """
+        저장된 캔들 중 [start, end] 구간
+
+        Returns:
+            pandas.DataFrame: timestamp 인덱스의 OHLCV 데이터
+        """
+        data = self._read()
+        if start is not None:
+            data = data[data.index >= pd.to_datetime(to_milliseconds(start), unit='ms')]
+        if end is not None:
+            data = data[data.index <= pd.to_datetime(to_milliseconds(end), unit='ms')]
+        return data
+
+    def update(self, start, end, fetch):
+        """
+        [start, end] 중 빠진 구간만 거래소에서 가져와 저장
+
+        아직 끝나지 않은 캔들 구간은 다음 요청 때 다시 가져오도록 기록하지 않는다.
+        거래소에 캔들이 없는 구간(상장 전 등)은 빈 구간으로 보유 구간에 기록해 다음 실행 때 다시 요청하지 않는다.
+
+        Args:
+            start: 시작 시각 (밀리초 또는 datetime/문자열)
+            end: 종료 시각 (밀리초 또는 datetime/문자열, 포함)
+            fetch (callable): fetch(since, until) -> timestamp 인덱스의 OHLCV DataFrame (밀리초 인자)
+
+        Returns:
+            list: 가져온 [시작, 끝] 구간 목록
+        """
+        closed_until = int(time.time() * 1000) // self.timeframe_ms * self.timeframe_ms - 1
+        missing = self.missing_ranges(start, end)
+        for gap_start, gap_end in missing:
+            print(f"저장소에 없는 구간을 가져옵니다: {pd.to_datetime(gap_start, unit='ms')} ~ {pd.to_datetime(gap_end, unit='ms')}")
+            try:
+                candles = fetch(gap_start, gap_end)
+            except NoDataError as e:
+                print("  - 거래소에 캔들이 없는 구간입니다")
+                candles = pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='timestamp'))
+                candles.attrs['incomplete'] = e.incomplete
+            incomplete = candles.attrs.get('incomplete', [])
+            if not candles.empty:
+                candles = candles[OHLCV_COLUMNS].sort_index()
+                self._write(candles[~candles.index.duplicated(keep='last')])
+
+            # 끝까지 가져오지 못한 구간은 보유 구간에서 제외
+            covered_end = min(gap_end, closed_until)
+            if covered_end >= gap_start:
+                self._cover(gap_start, covered_end, holes=[[s, e - 1] for s, e in incomplete])
+        return missing
+
+    def tee(self, chunks, start, end):
+        """
+        OHLCV 청크를 그대로 내보내면서 저장소에도 기록 (다운로드와 백테스트를 겹쳐 실행할 때 사용)
+
+        Args:
+            chunks: timestamp 인덱스의 OHLCV DataFrame 청크 반복자 (market_data.OHLCVChunkStream 등)
+            start: 청크가 다루는 구간 시작 (밀리초 또는 datetime/문자열)
+            end: 청크가 다루는 구간 끝 (포함)
+
+        Returns:
+            OHLCV DataFrame 청크 제너레이터
+        """
+        for chunk in chunks:
+            candles = chunk[OHLCV_COLUMNS].sort_index()
+            self._write(candles[~candles.index.duplicated(keep='last')])
+            yield chunk
+
+        # 반복이 끝난 뒤 보유 구간 기록 (끝까지 가져오지 못한 구간과 아직 끝나지 않은 캔들 제외)
+        start, end = to_milliseconds(start), to_milliseconds(end)
+        closed_until = int(time.time() * 1000) // self.timeframe_ms * self.timeframe_ms - 1
+        incomplete = getattr(chunks, 'incomplete', [])
+        if min(end, closed_until) >= start:
+            self._cover(start, min(end, closed_until), holes=[[s, e - 1] for s, e in incomplete])
+
+    def get(self, start, end, fetch):
+        """
+        [start, end] 구간의 캔들 (빠진 구간은 가져와 저장한 뒤 반환)
+
+        Args:
+            start: 시작 시각 (밀리초 또는 datetime/문자열)
+            end: 종료 시각 (밀리초 또는 datetime/문자열, 포함)
+            fetch (callable): fetch(since, until) -> timestamp 인덱스의 OHLCV DataFrame
+
+        Returns:
+            pandas.DataFrame: timestamp 인덱스의 OHLCV 데이터
+        """
+        self.update(start, end, fetch)
+        return self.load(start, end)
+
+    def import_csv(self, path):
+        """
+        기존 OHLCV CSV 파일(backtesting.py --save_data 형식)을 저장소로 가져오기
+
+        파일의 첫 캔들부터 마지막 캔들까지를 확인한 구간으로 기록한다.
+        """
+        data = pd.read_csv(path)
+        data['timestamp'] = pd.to_datetime(data['timestamp'])
+        self.add(data.set_index('timestamp'))
+        return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 캔들 저장소 관리')
+    parser.add_argument('command', choices=['import', 'info'], help='import: 기존 CSV 가져오기, info: 보유 구간 출력')
+    parser.add_argument('files', nargs='*', help='가져올 OHLCV CSV 파일')
+    parser.add_argument('--exchange', type=str, default='binance', help='거래소 (binance, bybit 등)')
+    parser.add_argument('--symbol', type=str, default='BTC/USDT', help='심볼 (BTC/USDT, ETH/USDT 등)')
+    parser.add_argument('--timeframe', type=str, default='4h', help='시간프레임 (1h, 4h, 1d 등)')
+    parser.add_argument('--store_dir', type=str, default=os.path.join('data', 'store'), help='캔들 저장소 디렉토리')
+    args = parser.parse_args()
+
+    store = CandleStore(args.store_dir, args.exchange, args.symbol, args.timeframe)
+    if args.command == 'import':
+        for path in args.files:
+            print(f"{path}: {store.import_csv(path)}개 캔들 가져옴")
+
+    print(f"저장소: {store.data_path}")
+    for start, end in store.ranges:
+        print(f"  - {pd.to_datetime(start, unit='ms')} ~ {pd.to_datetime(end, unit='ms')}")
+
+
+if __name__ == "__main__":
+    main()
+
+## 기존 CSV 파일을 저장소로 가져오기
+# python candle_store.py import data/binance_BTC_USDT_4h_*.csv --exchange binance --symbol BTC/USDT --timeframe 4h
+#
+## 보유 구간 확인
+# python candle_store.py info --symbol BTC/USDT --timeframe 4h
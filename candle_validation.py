@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+from backtest_records import index_nanoseconds
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+# DatetimeIndex 단위별 나노초
+UNIT_NANOSECONDS = {'s': 1_000_000_000, 'ms': 1_000_000, 'us': 1_000, 'ns': 1}
+
+
+def timeframe_nanoseconds(timeframe):
+    """시간프레임 문자열(예: '1m', '4h', '1d')을 나노초로 변환"""
+    from market_data import parse_timeframe
+    return parse_timeframe(timeframe) * 1_000_000_000
+
+
+class ValidationReport:
+    """
+    캔들 데이터 검사 결과
+
+    각 항목은 문제가 있는 행의 위치(정수 배열)이고, 누락 구간은 (직전 캔들 위치, 빠진 캔들 수) 배열이다.
+    """
+
+    def __init__(self, length, timeframe_ns):
+        self.length = length
+        self.timeframe_ns = timeframe_ns
+        self.out_of_order = np.empty(0, dtype=np.int64)    # 직전 캔들보다 이른 타임스탬프
+        self.duplicates = np.empty(0, dtype=np.int64)      # 같은 타임스탬프가 이미 있는 행
+        self.gap_positions = np.empty(0, dtype=np.int64)   # 다음 캔들과의 간격이 시간프레임보다 긴 행
+        self.gap_sizes = np.empty(0, dtype=np.int64)       # 해당 간격에서 빠진 캔들 수
+        self.misaligned = np.empty(0, dtype=np.int64)      # 시간프레임 간격에 맞지 않는 타임스탬프
+        self.invalid_values = np.empty(0, dtype=np.int64)  # NaN/0 이하 가격
+        self.high_low = np.empty(0, dtype=np.int64)        # 고가 < 저가
+        self.out_of_range = np.empty(0, dtype=np.int64)    # 시가/종가가 고가~저가 범위 밖
+        self.zero_volume = np.empty(0, dtype=np.int64)     # 거래량 0
+
+    @property
+    def missing_candles(self):
+        """누락 구간에서 빠진 캔들 수 합계"""
+        return int(self.gap_sizes.sum())
+
+    @property
+    def ok(self):
+        """엔진에 그대로 넣어도 되는지 여부 (거래량 0은 경고로만 취급)"""
+        return not (len(self.out_of_order) or len(self.duplicates) or len(self.gap_positions) or len(self.misaligned)
+                    or len(self.invalid_values) or len(self.high_low) or len(self.out_of_range))
+
+    def counts(self):
+        """항목별 문제 개수"""
+        return {
+            'out_of_order': len(self.out_of_order),
+            'duplicates': len(self.duplicates),
+            'gaps': len(self.gap_positions),
+            'missing_candles': self.missing_candles,
+            'misaligned': len(self.misaligned),
+            'invalid_values': len(self.invalid_values),
+            'high_low': len(self.high_low),
+            'out_of_range': len(self.out_of_range),
+            'zero_volume': len(self.zero_volume)
+        }
+
+    def summary(self, index=None):
+        """
+        출력용 요약 문자열
+
+        Args:
+            index (pandas.DatetimeIndex): 검사한 데이터의 인덱스 (지정하면 가장 긴 누락 구간 시각 표시)
+        """
+        if self.ok and not len(self.zero_volume):
+            return f"캔들 검사 통과: {self.length}개"
+        labels = {
+            'out_of_order': '순서 뒤바뀜', 'duplicates': '중복 타임스탬프', 'gaps': '누락 구간',
+            'missing_candles': '누락 캔들', 'misaligned': '간격 불일치', 'invalid_values': 'NaN/0 이하 가격',
+            'high_low': '고가 < 저가', 'out_of_range': '시가/종가 범위 밖', 'zero_volume': '거래량 0'
+        }
+        lines = [f"캔들 검사 결과 ({self.length}개):"]
+        for key, count in self.counts().items():
+            if count:
+                lines.append(f"  - {labels[key]}: {count}개")
+        if len(self.gap_positions) and index is not None:
+            k = int(np.argmax(self.gap_sizes))
+            position = self.gap_positions[k]
+            lines.append(f"  - 가장 긴 누락 구간: {index[position]} 이후 {self.gap_sizes[k]}개")
+        return "\n".join(lines)
+
+
+def infer_timeframe_ns(timestamps):
+    """타임스탬프 간격의 최빈값으로 시간프레임 추정 (나노초)"""
+    diffs = np.diff(np.sort(timestamps))
+    diffs = diffs[diffs > 0]
+    if len(diffs) == 0:
+        return None
+    values, counts = np.unique(diffs, return_counts=True)
+    return int(values[np.argmax(counts)])
+
+
+def validate_candles(data, timeframe=None):
+    """
+    캔들 데이터 무결성 검사 (벡터화)
+
+    Args:
+        data (pandas.DataFrame): timestamp 인덱스의 OHLCV 데이터
+        timeframe (str): 시간프레임 (예: '4h', None이면 간격 최빈값으로 추정)
+
+    Returns:
+        ValidationReport: 검사 결과
+    """
+    # 나노초 변환 비용을 피하려고 인덱스 자체 단위의 정수값으로 비교
+    index = pd.DatetimeIndex(data.index)
+    scale = UNIT_NANOSECONDS[getattr(index, 'unit', 'ns')]
+    timestamps = index.asi8
+    if timeframe:
+        timeframe_ns = timeframe_nanoseconds(timeframe)
+    else:
+        inferred = infer_timeframe_ns(timestamps)
+        timeframe_ns = inferred * scale if inferred else None
+    report = ValidationReport(len(data), timeframe_ns)
+    if len(data) == 0:
+        return report
+    step = timeframe_ns // scale if timeframe_ns else None
+
+    # 순서/중복: 직전 행보다 이른 타임스탬프, 정렬 후 같은 타임스탬프
+    diffs = np.diff(timestamps)
+    report.out_of_order = np.flatnonzero(diffs < 0) + 1
+    if len(report.out_of_order) == 0:
+        # 이미 정렬된 경우(대부분) 정렬 생략
+        sorted_diffs = diffs
+        report.duplicates = np.flatnonzero(diffs == 0) + 1
+        if len(report.duplicates) == 0:
+            steps, step_positions = diffs, None
+        else:
+            unique_positions = np.concatenate(([0], np.flatnonzero(diffs > 0) + 1))
+            steps, step_positions = np.diff(timestamps[unique_positions]), unique_positions
+    else:
+        order = np.argsort(timestamps, kind='stable')
+        sorted_ts = timestamps[order]
+        sorted_diffs = np.diff(sorted_ts)
+        report.duplicates = np.sort(order[1:][sorted_diffs == 0])
+        unique_positions = np.concatenate(([0], np.flatnonzero(sorted_diffs > 0) + 1))
+        steps, step_positions = np.diff(sorted_ts[unique_positions]), order[unique_positions]
+
+    # 누락 구간/간격 불일치 (정렬된 고유 타임스탬프 기준)
+    if step:
+        # 간격이 시간프레임과 다른 곳만 따로 확인 (전체 배열 나머지 연산 생략)
+        irregular = np.flatnonzero(steps != step)
+        irregular_steps = steps[irregular]
+        gaps = irregular[irregular_steps >= 2 * step]
+        misaligned = irregular[irregular_steps % step != 0] + 1
+        if step_positions is not None:
+            gaps_at, misaligned = step_positions[gaps], np.sort(step_positions[misaligned])
+        else:
+            gaps_at = gaps
+        report.gap_positions = gaps_at
+        report.gap_sizes = (steps[gaps] // step - 1).astype(np.int64)
+        report.misaligned = misaligned
+
+    # 가격/거래량 이상값
+    open_, high, low, close = (data[column].to_numpy(dtype=np.float64) for column in PRICE_COLUMNS)
+    invalid = ~((open_ > 0) & (high > 0) & (low > 0) & (close > 0))
+    report.invalid_values = np.flatnonzero(invalid)
+    report.high_low = np.flatnonzero(~invalid & (high < low))
+    report.out_of_range = np.flatnonzero(~invalid & (high >= low) & (
+        (open_ > high) | (open_ < low) | (close > high) | (close < low)
+    ))
+    if 'volume' in data.columns:
+        report.zero_volume = np.flatnonzero(data['volume'].to_numpy(dtype=np.float64) == 0)
+    return report
+
+
+def repair_candles(data, timeframe=None, fill_gaps=True):
+    """
+    검사에서 찾은 문제를 고친 캔들 데이터
+
+    - 시간순 정렬 후 같은 타임스탬프는 마지막 행만 유지
+    - NaN/0 이하 가격이 있는 행 제거
+    - 고가/저가를 시가/고가/저가/종가의 최대/최소로 보정
+    - fill_gaps면 누락 캔들을 직전 종가의 거래량 0 캔들로 채움 (EMA가 실제 시간 간격대로 이어지도록),
+      이때 시간프레임 간격에 맞지 않는 캔들은 제거
+
+    Args:
+        data (pandas.DataFrame): timestamp 인덱스의 OHLCV 데이터
+        timeframe (str): 시간프레임 (None이면 간격 최빈값으로 추정)
+        fill_gaps (bool): 누락 캔들 채우기 여부
+
+    Returns:
+        tuple: (보정한 DataFrame, 보정 전 ValidationReport)
+    """
+    report = validate_candles(data, timeframe)
+    if report.ok:
+        return data, report
+
+    repaired = data
+    if len(report.out_of_order) or len(report.duplicates):
+        repaired = repaired.sort_index(kind='stable')
+        repaired = repaired[~repaired.index.duplicated(keep='last')]
+
+    prices = repaired[list(PRICE_COLUMNS)].to_numpy(dtype=np.float64)
+    valid = (prices > 0).all(axis=1)
+    if not valid.all():
+        repaired = repaired[valid]
+        prices = prices[valid]
+        if len(repaired) == 0:
+            # 유효한 가격의 캔들이 없으면 채울 기준도 없음
+            return repaired, report
+
+    if len(report.high_low) or len(report.out_of_range):
+        repaired = repaired.copy()
+        repaired['high'] = prices.max(axis=1)
+        repaired['low'] = prices.min(axis=1)
+
+    if fill_gaps and report.timeframe_ns and (len(report.gap_positions) or len(report.misaligned) or not valid.all()):
+        timestamps, unit = index_nanoseconds(pd.DatetimeIndex(repaired.index))
+        offsets = timestamps - timestamps[0]
+        aligned = offsets % report.timeframe_ns == 0
+        # 간격에 맞는 캔들로 시간 격자를 만들고 빈 자리만 채움
+        grid = timestamps[0] + np.arange(offsets[-1] // report.timeframe_ns + 1) * report.timeframe_ns
+        positions = offsets[aligned] // report.timeframe_ns
+        close = repaired['close'].to_numpy(dtype=np.float64)[aligned]
+
+        filled = {}
+        present = np.zeros(len(grid), dtype=bool)
+        present[positions] = True
+        # 각 격자 위치에서 직전 실제 캔들의 순번
+        source = np.cumsum(present) - 1
+        for column in repaired.columns:
+            values = np.empty(len(grid), dtype=np.float64)
+            values[positions] = repaired[column].to_numpy(dtype=np.float64)[aligned]
+            if column in PRICE_COLUMNS:
+                values[~present] = close[source[~present]]
+            else:
+                values[~present] = 0.0
+            filled[column] = values
+        index = pd.DatetimeIndex(grid.view('datetime64[ns]'), name=repaired.index.name)
+        if unit is not None and unit != 'ns':
+            index = index.as_unit(unit)
+        repaired = pd.DataFrame(filled, index=index)
+
+    return repaired, report
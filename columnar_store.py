@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from backtest_records import index_nanoseconds
+
+# 컬럼형 OHLCV 디렉토리 확장자
+COLUMNAR_SUFFIX = '.ohlcv'
+FORMAT_VERSION = 1
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+OHLCV_COLUMNS = PRICE_COLUMNS + ('volume',)
+
+
+def is_columnar(path):
+    """컬럼형 OHLCV 디렉토리인지 확인"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, 'meta.json'))
+
+
+def columnar_path(path):
+    """CSV 파일 경로에 대응하는 컬럼형 디렉토리 경로 (예: data/x.csv -> data/x.ohlcv)"""
+    return os.path.splitext(path)[0] + COLUMNAR_SUFFIX
+
+
+def save_columnar(data, path, float32=False):
+    """
+    OHLCV DataFrame을 컬럼형 디렉토리로 저장
+
+    컬럼마다 numpy .npy 파일 하나(timestamp는 오름차순 int64 나노초)와 meta.json을 저장한다.
+    임시 디렉토리에 쓴 뒤 이름을 바꾸므로 저장 중 중단돼도 기존 데이터가 깨지지 않는다.
+
+    Args:
+        data (pandas.DataFrame): timestamp 인덱스의 OHLCV 데이터
+        path (str): 저장할 디렉토리 경로 (.ohlcv)
+        float32 (bool): 가격 컬럼(open/high/low/close)을 float32로 저장 (용량 절반, 정밀도 약 7자리)
+
+    Returns:
+        str: 저장한 디렉토리 경로
+    """
+    price_dtype = np.float32 if float32 else np.float64
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    timestamps, unit = index_nanoseconds(pd.DatetimeIndex(data.index))
+    if len(timestamps) > 1 and not (np.diff(timestamps) > 0).all():
+        raise ValueError("timestamp 인덱스는 중복 없이 오름차순이어야 합니다")
+    np.save(os.path.join(tmp_path, 'timestamp.npy'), timestamps)
+    for column in OHLCV_COLUMNS:
+        dtype = price_dtype if column in PRICE_COLUMNS else np.float64
+        np.save(os.path.join(tmp_path, f'{column}.npy'), data[column].to_numpy(dtype=dtype))
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'length': len(data),
+        'columns': list(OHLCV_COLUMNS),
+        'price_dtype': np.dtype(price_dtype).name,
+        'timestamp_unit': unit or 'ns'
+    }
+    with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_meta(path):
+    """컬럼형 디렉토리의 meta.json"""
+    with open(os.path.join(path, 'meta.json')) as f:
+        return json.load(f)
+
+
+def load_columnar(path, mmap=False):
+    """
+    컬럼형 디렉토리에서 OHLCV DataFrame 불러오기
+
+    Args:
+        path (str): 컬럼형 디렉토리 경로 (.ohlcv)
+        mmap (bool): 파일을 메모리 매핑으로 열기 (복사 없이 필요한 부분만 읽음, 읽기 전용)
+
+    Returns:
+        pandas.DataFrame: timestamp 인덱스의 OHLCV 데이터
+    """
+    meta = read_meta(path)
+    mmap_mode = 'r' if mmap else None
+    timestamps = np.load(os.path.join(path, 'timestamp.npy'), mmap_mode=mmap_mode)
+    columns = {column: np.load(os.path.join(path, f'{column}.npy'), mmap_mode=mmap_mode) for column in meta['columns']}
+    return _frame(timestamps, columns, meta.get('timestamp_unit', 'ns'))
+
+
+def _frame(timestamps, columns, unit):
+    """int64 나노초 timestamp 배열과 컬럼 배열로 DataFrame 생성 (복사 없음)"""
+    index = pd.DatetimeIndex(timestamps.view('datetime64[ns]'), copy=False, name='timestamp')
+    if unit != 'ns' and hasattr(index, 'as_unit'):
+        index = index.as_unit(unit)
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def _timestamp_ns(value):
+    """datetime/Timestamp/날짜 문자열을 int64 나노초로 변환"""
+    return pd.Timestamp(value).as_unit('ns').value if hasattr(pd.Timestamp, 'as_unit') else pd.Timestamp(value).value
+
+
+def range_slice(path, start=None, end=None):
+    """
+    [start, end] 구간에 해당하는 행 범위 (메모리 매핑한 timestamp 컬럼에서 이진 탐색)
+
+    Args:
+        path (str): 컬럼형 디렉토리 경로 (.ohlcv)
+        start: 시작 시각 (None이면 처음부터)
+        end: 종료 시각 (None이면 끝까지, 포함)
+
+    Returns:
+        slice: 행 범위
+    """
+    timestamps = np.load(os.path.join(path, 'timestamp.npy'), mmap_mode='r')
+    first = 0 if start is None else int(np.searchsorted(timestamps, _timestamp_ns(start), side='left'))
+    last = len(timestamps) if end is None else int(np.searchsorted(timestamps, _timestamp_ns(end), side='right'))
+    return slice(first, max(first, last))
+
+
+def load_range(path, start=None, end=None):
+    """
+    컬럼형 디렉토리에서 [start, end] 구간만 불러오기 (복사 없음)
+
+    각 컬럼을 메모리 매핑으로 열고 이진 탐색으로 찾은 행 범위의 뷰로 DataFrame을 만든다.
+    실제로 읽는 것은 해당 구간의 페이지뿐이므로 긴 기록 중 짧은 기간을 백테스트할 때 파일 전체를 읽지 않는다.
+
+    Args:
+        path (str): 컬럼형 디렉토리 경로 (.ohlcv)
+        start: 시작 시각 (datetime/Timestamp/날짜 문자열, None이면 처음부터)
+        end: 종료 시각 (포함, None이면 끝까지)
+
+    Returns:
+        pandas.DataFrame: timestamp 인덱스의 OHLCV 데이터 (읽기 전용 배열 뷰)
+    """
+    meta = read_meta(path)
+    rows = range_slice(path, start, end)
+    timestamps = np.load(os.path.join(path, 'timestamp.npy'), mmap_mode='r')[rows]
+    columns = {column: np.load(os.path.join(path, f'{column}.npy'), mmap_mode='r')[rows] for column in meta['columns']}
+    return _frame(timestamps, columns, meta.get('timestamp_unit', 'ns'))
+
+
+def load_ohlcv(path, start=None, end=None):
+    """
+    저장된 OHLCV 데이터 불러오기 (CSV 파일 또는 컬럼형 디렉토리)
+
+    Args:
+        path (str): CSV 파일 또는 .ohlcv 디렉토리 경로
+        start: 시작 시각 (None이면 처음부터)
+        end: 종료 시각 (포함, None이면 끝까지)
+
+    Returns:
+        pandas.DataFrame: timestamp 인덱스의 OHLCV 데이터
+    """
+    if is_columnar(path):
+        if start is None and end is None:
+            return load_columnar(path)
+        return load_range(path, start, end)
+    data = pd.read_csv(path)
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    data.set_index('timestamp', inplace=True)
+    if start is not None:
+        data = data[data.index >= pd.Timestamp(start)]
+    if end is not None:
+        data = data[data.index <= pd.Timestamp(end)]
+    return data
+
+
+def iter_ohlcv_chunks(path, chunk_size, start=None, end=None):
+    """
+    저장된 OHLCV 데이터를 청크 단위로 불러오기 (전체 파일을 메모리에 올리지 않음)
+
+    Args:
+        path (str): CSV 파일 또는 .ohlcv 디렉토리 경로
+        chunk_size (int): 청크당 캔들 수
+        start: 시작 시각 (None이면 처음부터)
+        end: 종료 시각 (포함, None이면 끝까지)
+
+    Returns:
+        timestamp 인덱스의 OHLCV DataFrame 청크 제너레이터
+    """
+    if is_columnar(path):
+        data = load_range(path, start, end)
+        for offset in range(0, len(data), chunk_size):
+            # 메모리 매핑 배열에서 필요한 구간만 복사
+            yield data.iloc[offset:offset + chunk_size].copy()
+        return
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        chunk['timestamp'] = pd.to_datetime(chunk['timestamp'])
+        chunk.set_index('timestamp', inplace=True)
+        if start is not None:
+            chunk = chunk[chunk.index >= pd.Timestamp(start)]
+        if end is not None:
+            chunk = chunk[chunk.index <= pd.Timestamp(end)]
+        if not chunk.empty:
+            yield chunk
+
+
+def convert_csv(csv_path, output=None, float32=False):
+    """
+    OHLCV CSV 파일을 컬럼형 디렉토리로 변환
+
+    Args:
+        csv_path (str): OHLCV CSV 파일 경로
+        output (str): 저장할 디렉토리 (None이면 CSV와 같은 위치의 .ohlcv)
+        float32 (bool): 가격 컬럼을 float32로 저장
+
+    Returns:
+        str: 저장한 디렉토리 경로 (OHLCV 파일이 아니면 None)
+    """
+    data = pd.read_csv(csv_path)
+    if 'timestamp' not in data.columns or not all(column in data.columns for column in OHLCV_COLUMNS):
+        return None
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    data.set_index('timestamp', inplace=True)
+    return save_columnar(data, output or columnar_path(csv_path), float32=float32)
+
+
+def disk_usage(path):
+    """파일 또는 디렉토리의 디스크 사용량 (바이트)"""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OHLCV 데이터 컬럼형 저장 형식 변환')
+    parser.add_argument('command', choices=['convert', 'to_csv'], help='convert: CSV -> .ohlcv, to_csv: .ohlcv -> CSV')
+    parser.add_argument('files', nargs='+', help='변환할 파일 (CSV 또는 .ohlcv 디렉토리)')
+    parser.add_argument('--float32', action='store_true', help='가격 컬럼을 float32로 저장')
+    args = parser.parse_args()
+
+    for path in args.files:
+        if args.command == 'convert':
+            output = convert_csv(path, float32=args.float32)
+            if output is None:
+                print(f"OHLCV 파일이 아니므로 건너뜁니다: {path}")
+                continue
+        else:
+            output = os.path.splitext(path.rstrip('/'))[0] + '.csv'
+            load_columnar(path).reset_index().to_csv(output, index=False)
+        print(f"{path} ({disk_usage(path) / 1024:,.0f}KB) -> {output} ({disk_usage(output) / 1024:,.0f}KB)")
+
+
+if __name__ == "__main__":
+    main()
+
+## CSV 파일을 컬럼형 형식으로 변환 (data/x.csv -> data/x.ohlcv)
+# python columnar_store.py convert data/binance_BTC_USDT_4h_20230101_20250521.csv
+# python columnar_store.py convert data/*.csv --float32
+#
+## 컬럼형 형식을 CSV로 되돌리기
+# python columnar_store.py to_csv data/binance_BTC_USDT_4h_20230101_20250521.ohlcv
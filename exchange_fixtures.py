@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import builtins
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import market_data
+from market_data import parse_timeframe
+
+# 응답을 기록하지 않고 그대로 호출하는 메서드 (네트워크를 쓰지 않는 계산용)
+LOCAL_METHODS = ('parse_timeframe',)
+
+FIXTURE_DIR = os.path.join('data', 'fixtures')
+
+
+class FixtureMissing(KeyError):
+    """픽스처에 기록되지 않은 호출"""
+
+
+class ReplayedError(Exception):
+    """기록할 때 발생했던 오류를 재생 (원래 오류 타입을 알 수 없을 때)"""
+
+
+def call_key(method, args, kwargs):
+    """호출을 식별하는 문자열 (메서드 이름 + 인자, 키워드 인자 순서 무관)"""
+    return json.dumps([method, list(args), kwargs], sort_keys=True, default=str)
+
+
+class RecordingClient:
+    """
+    거래소 클라이언트 호출을 감싸서 응답을 JSON Lines 파일에 기록
+
+    binance.client.Client, ccxt 거래소 인스턴스 등 어떤 객체든 감쌀 수 있다.
+    메서드 호출은 (메서드, 인자, 키워드 인자, 응답 또는 오류)로 한 줄씩 기록하고, 속성(rateLimit 등)은 그대로 돌려준다.
+    여러 스레드에서 호출해도 된다. 계정 잔고/주문 응답도 그대로 저장되므로 픽스처 파일은 공유하지 않는다.
+    """
+
+    def __init__(self, target, path, meta=None):
+        """
+        Args:
+            target: 실제 거래소 클라이언트
+            path (str): 기록할 픽스처 파일 경로 (.jsonl, 기존 파일은 덮어씀)
+            meta (dict): 파일 첫 줄에 남길 정보 (심볼, 기간 등 재생에 필요한 값)
+        """
+        self._target = target
+        self._path = path
+        self._lock = threading.Lock()
+        self.calls = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'w')
+        self._file.write(json.dumps({'meta': meta or {}}) + '\n')
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute) or name in LOCAL_METHODS:
+            return attribute
+
+        def record(*args, **kwargs):
+            entry = {'method': name, 'args': list(args), 'kwargs': kwargs}
+            start = time.perf_counter()
+            try:
+                result = attribute(*args, **kwargs)
+                entry['result'] = result
+                return result
+            except Exception as e:
+                # BinanceAPIException은 message/code 속성을 따로 가짐
+                entry['error'] = {'type': type(e).__name__, 'message': getattr(e, 'message', str(e)),
+                                  'code': getattr(e, 'code', None)}
+                raise
+            finally:
+                entry['seconds'] = time.perf_counter() - start
+                self._write(entry)
+        return record
+
+    def _write(self, entry):
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.calls += 1
+
+    def close(self):
+        """픽스처 파일 닫기"""
+        self._file.close()
+
+
+class ReplayClient:
+    """
+    RecordingClient로 기록한 픽스처를 네트워크 없이 재생하는 거래소 클라이언트 대역
+
+    binance.client.Client(get_klines, futures_klines, get_account 등)와 ccxt(fetch_ohlcv, milliseconds)의
+    호출 형태를 그대로 받는다. 같은 호출(메서드 + 인자)에는 기록된 순서대로 응답하고,
+    기록이 끝나면 마지막 응답을 반복하므로 몇 번을 실행해도 결과가 같다.
+    """
+
+    def __init__(self, path, latency=0.0, strict=True, error_types=None):
+        """
+        Args:
+            path (str): 픽스처 파일 경로 (.jsonl)
+            latency (float or dict): 호출당 인위적 지연 시간 (초, 메서드별로 다르게 하려면 {메서드: 초})
+            strict (bool): False면 인자가 다른 호출(주문 수량 등)에 같은 메서드의 기록을 순서대로 돌려 응답
+            error_types (dict): 기록된 오류를 원래 타입으로 재생할 {타입 이름: 예외 클래스} (예: BinanceAPIException)
+        """
+        self.path = path
+        self.latency = latency
+        self.strict = strict
+        self.error_types = error_types or {}
+        self.meta = {}
+        self.rateLimit = 0
+        self.calls = 0
+        self._responses = {}
+        self._by_method = {}
+        self._method_position = {}
+        self._lock = threading.Lock()
+
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if 'meta' in entry:
+                    self.meta = entry['meta']
+                    continue
+                key = call_key(entry['method'], entry['args'], entry['kwargs'])
+                self._responses.setdefault(key, deque()).append(entry)
+                self._by_method.setdefault(entry['method'], []).append(entry)
+
+    @property
+    def methods(self):
+        """기록된 메서드별 호출 수"""
+        return {method: len(entries) for method, entries in self._by_method.items()}
+
+    def parse_timeframe(self, timeframe):
+        return parse_timeframe(timeframe)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def replay(*args, **kwargs):
+            entry = self._lookup(name, args, kwargs)
+            delay = self.latency.get(name, 0.0) if isinstance(self.latency, dict) else self.latency
+            if delay:
+                time.sleep(delay)
+            if 'error' in entry:
+                raise self._replay_error(entry['error'])
+            return entry['result']
+        return replay
+
+    def _replay_error(self, error):
+        """기록된 오류를 가능하면 원래 타입의 예외로 재생 (호출하는 쪽의 except 분기가 그대로 동작하도록)"""
+        error_type = self.error_types.get(error['type']) or getattr(builtins, error['type'], None)
+        if not (isinstance(error_type, type) and issubclass(error_type, Exception)):
+            return ReplayedError(f"{error['type']}: {error['message']}")
+        # 생성자 인자(HTTP 응답 등)가 없으므로 __init__을 거치지 않고 속성만 채움
+        exception = error_type.__new__(error_type)
+        Exception.__init__(exception, error['message'])
+        exception.message = error['message']
+        exception.code = error.get('code')
+        return exception
+
+    def _lookup(self, name, args, kwargs):
+        """호출에 해당하는 기록 찾기 (같은 호출은 기록 순서대로, 마지막 기록은 반복)"""
+        key = call_key(name, args, kwargs)
+        with self._lock:
+            self.calls += 1
+            queue = self._responses.get(key)
+            if queue:
+                return queue.popleft() if len(queue) > 1 else queue[0]
+            entries = self._by_method.get(name)
+            if self.strict or not entries:
+                raise FixtureMissing(f"픽스처에 없는 호출: {name}({key})")
+            position = self._method_position.get(name, 0)
+            self._method_position[name] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+
+def record_ohlcv(path, exchange_id, symbol, timeframe, since, until, limit=1000, workers=4):
+    """
+    ccxt로 OHLCV를 내려받으면서 응답을 픽스처로 기록
+
+    Returns:
+        pandas.DataFrame: 내려받은 OHLCV 데이터
+    """
+    meta = {'kind': 'ohlcv', 'exchange': exchange_id, 'symbol': symbol, 'timeframe': timeframe,
+            'since': since, 'until': until, 'limit': limit}
+    client = RecordingClient(market_data.create_exchange(exchange_id), path, meta)
+    try:
+        return market_data.download_ohlcv(client, symbol, timeframe, since, until, limit, workers=workers)
+    finally:
+        client.close()
+        print(f"픽스처 저장: {path} (호출 {client.calls}회)")
+
+
+def bench_ohlcv(path, latency=0.05, workers=(1, 4, 8)):
+    """
+    OHLCV 픽스처를 재생해 다운로더 처리량 측정
+
+    Args:
+        path (str): record_ohlcv()로 기록한 픽스처
+        latency (float): 요청당 인위적 지연 시간 (초)
+        workers (list): 측정할 동시 요청 스레드 수
+
+    Returns:
+        list: 스레드 수별 결과 (workers, seconds, requests, candles, candles_per_sec)
+    """
+    results = []
+    for n in workers:
+        client = ReplayClient(path, latency=latency)
+        meta = client.meta
+        start = time.perf_counter()
+        df = market_data.download_ohlcv(client, meta['symbol'], meta['timeframe'], meta['since'], meta['until'],
+                                        meta['limit'], workers=n, verbose=False)
+        seconds = time.perf_counter() - start
+        results.append({'workers': n, 'seconds': seconds, 'requests': client.calls, 'candles': len(df),
+                        'candles_per_sec': len(df) / seconds if seconds > 0 else float('inf')})
+        print(f"  동시 요청 {n:>2}개: {seconds:>7.3f}초, 요청 {client.calls}회, {len(df)}개 캔들 ({results[-1]['candles_per_sec']:,.0f}개/초)")
+    return results
+
+
+def _trader_class(futures):
+    """트레이더 클래스 (binance 패키지가 필요하므로 사용할 때 불러옴)"""
+    if futures:
+        from auto_trader_futures import BinanceFuturesAutoTrader
+        return BinanceFuturesAutoTrader
+    from auto_trader import BinanceAutoTrader
+    return BinanceAutoTrader
+
+
+def _load_trader_config(futures):
+    """트레이더 설정 파일과 API 키 읽기"""
+    with open('config_futures.json' if futures else 'config.json') as f:
+        config = json.load(f)
+    api_key = os.getenv('BINANCE_API_KEY') or config.get('api_key')
+    api_secret = os.getenv('BINANCE_API_SECRET') or config.get('api_secret')
+    return config, api_key, api_secret
+
+
+def _make_trader(futures, config, api_key, api_secret, client, db):
+    """테스트 모드 트레이더 생성 (주문은 실행하지 않음)"""
+    kwargs = dict(api_key=api_key, api_secret=api_secret, symbol=config.get('symbol', 'BTCUSDT'),
+                  timeframe=config.get('timeframe', '4h'), initial_capital=config.get('test_initial_capital', 10000),
+                  max_trade_amount=config.get('max_trade_amount'), test_mode=True, client=client, db=db)
+    if futures:
+        kwargs['leverage'] = config.get('leverage', 3)
+    return _trader_class(futures)(**kwargs)
+
+
+def record_trader(path, futures=False, cycles=3, interval=0.0):
+    """
+    테스트 모드 트레이더의 매매 사이클을 실행하면서 Binance 응답을 픽스처로 기록
+
+    Args:
+        path (str): 기록할 픽스처 파일 경로
+        futures (bool): 선물 트레이더 여부
+        cycles (int): 실행할 execute_strategy 횟수
+        interval (float): 사이클 사이 대기 시간 (초)
+    """
+    from binance.client import Client
+    from database import TradingDatabase
+
+    config, api_key, api_secret = _load_trader_config(futures)
+    client = RecordingClient(Client(api_key, api_secret), path, {'kind': 'trader', 'futures': futures, 'cycles': cycles})
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            trader = _make_trader(futures, config, api_key, api_secret, client, TradingDatabase(os.path.join(tmp, 'fixture.db')))
+            for k in range(cycles):
+                if k:
+                    time.sleep(interval)
+                trader.execute_strategy()
+        finally:
+            client.close()
+    print(f"픽스처 저장: {path} (호출 {client.calls}회)")
+
+
+def bench_trader(path, cycles=100, latency=0.0):
+    """
+    트레이더 픽스처를 재생해 매매 사이클(execute_strategy) 처리량 측정
+
+    주문 수량처럼 실행마다 달라지는 인자는 같은 메서드의 기록으로 응답한다(strict=False).
+
+    Returns:
+        dict: cycles, seconds, cycle_ms, calls
+    """
+    from binance.exceptions import BinanceAPIException
+    from database import TradingDatabase
+
+    client = ReplayClient(path, latency=latency, strict=False, error_types={'BinanceAPIException': BinanceAPIException})
+    futures = client.meta.get('futures', False)
+    config, _, _ = _load_trader_config(futures)
+    with tempfile.TemporaryDirectory() as tmp:
+        trader = _make_trader(futures, config, 'replay', 'replay', client, TradingDatabase(os.path.join(tmp, 'bench.db')))
+        calls = client.calls
+        start = time.perf_counter()
+        for _ in range(cycles):
+            trader.execute_strategy()
+        seconds = time.perf_counter() - start
+    result = {'cycles': cycles, 'seconds': seconds, 'cycle_ms': seconds / cycles * 1000, 'calls': client.calls - calls}
+    print(f"  매매 사이클 {cycles}회: {seconds:.3f}초 (사이클당 {result['cycle_ms']:.2f}ms, API 호출 {result['calls']}회)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='거래소 응답 기록/재생 (오프라인 벤치마크용)')
+    parser.add_argument('command', choices=['record_ohlcv', 'bench_ohlcv', 'record_trader', 'bench_trader', 'info'],
+                        help='record_*: 실제 거래소 응답 기록, bench_*: 기록 재생 처리량 측정, info: 기록 내용 출력')
+    parser.add_argument('--fixture', type=str, default=None, help='픽스처 파일 경로 (기본값: data/fixtures/<종류>.jsonl)')
+    parser.add_argument('--exchange', type=str, default='binance', help='거래소 (binance, bybit 등)')
+    parser.add_argument('--symbol', type=str, default='BTC/USDT', help='심볼 (BTC/USDT, ETH/USDT 등)')
+    parser.add_argument('--timeframe', type=str, default='4h', help='시간프레임 (1h, 4h, 1d 등)')
+    parser.add_argument('--start_date', type=str, default='2023-01-01', help='기록할 시작 날짜 (YYYY-MM-DD)')
+    parser.add_argument('--end_date', type=str, default='2024-01-01', help='기록할 종료 날짜 (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=1000, help='요청당 캔들 수')
+    parser.add_argument('--workers', type=str, default='1,4,8', help='동시 요청 스레드 수 (bench_ohlcv는 목록)')
+    parser.add_argument('--futures', action='store_true', help='선물 트레이더 기록')
+    parser.add_argument('--cycles', type=int, default=None, help='매매 사이클 수 (기록 기본 3회, 재생 기본 100회)')
+    parser.add_argument('--interval', type=float, default=0.0, help='기록할 때 사이클 사이 대기 시간 (초)')
+    parser.add_argument('--latency', type=float, default=None, help='재생할 때 호출당 인위적 지연 시간 (초, 기본값: ohlcv 0.05, trader 0)')
+    args = parser.parse_args()
+
+    kind = 'ohlcv' if args.command.endswith('ohlcv') else 'trader'
+    path = args.fixture or os.path.join(FIXTURE_DIR, f"{kind}.jsonl")
+
+    if args.command == 'record_ohlcv':
+        since = int(datetime.strptime(args.start_date, "%Y-%m-%d").timestamp() * 1000)
+        until = int(datetime.strptime(args.end_date, "%Y-%m-%d").timestamp() * 1000)
+        record_ohlcv(path, args.exchange, args.symbol, args.timeframe, since, until, args.limit,
+                     int(args.workers.split(',')[-1]))
+    elif args.command == 'bench_ohlcv':
+        print(f"다운로더 재생: {path}")
+        bench_ohlcv(path, 0.05 if args.latency is None else args.latency, [int(n) for n in args.workers.split(',')])
+    elif args.command == 'record_trader':
+        record_trader(path, args.futures, args.cycles or 3, args.interval)
+    elif args.command == 'bench_trader':
+        print(f"트레이더 재생: {path}")
+        bench_trader(path, args.cycles or 100, args.latency or 0.0)
+    else:
+        client = ReplayClient(path)
+        print(f"픽스처: {path}")
+        print(f"  정보: {client.meta}")
+        for method, count in client.methods.items():
+            print(f"  - {method}: {count}회")
+
+
+if __name__ == "__main__":
+    main()
+
+## 거래소 응답 기록 (한 번만 네트워크 사용)
+# python exchange_fixtures.py record_ohlcv --symbol BTC/USDT --timeframe 1h --start_date 2022-01-01 --end_date 2024-01-01
+# python exchange_fixtures.py record_trader --futures --cycles 3   # config_futures.json의 API 키 사용, 테스트 모드로 실행
+#
+## 기록 재생으로 오프라인 처리량 측정
+# python exchange_fixtures.py bench_ohlcv --latency 0.05 --workers 1,4,8
+# python exchange_fixtures.py bench_trader --fixture data/fixtures/trader.jsonl --cycles 200
+# python exchange_fixtures.py info --fixture data/fixtures/ohlcv.jsonl
+#
+## 코드에서 재생 클라이언트 사용
+# strategy.fetch_data(exchange_id=ReplayClient('data/fixtures/ohlcv.jsonl', latency=0.05), ...)
+# BinanceFuturesAutoTrader(..., client=ReplayClient('data/fixtures/trader.jsonl', strict=False))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+from strategy import TrendFollowingStrategy
+
+
+def fingerprint_candles(data):
+    """
+    지표 계산에 쓰이는 캔들 값(타임스탬프, 고가, 저가, 종가)의 지문
+
+    Args:
+        data (pandas.DataFrame): OHLCV 데이터
+
+    Returns:
+        str: 16진수 지문
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(data.index).asi8).tobytes())
+    for column in ('high', 'low', 'close'):
+        digest.update(np.ascontiguousarray(data[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    데이터셋별 지표(EMA, ATR) 디스크 캐시
+
+    계산한 지표 컬럼을 데이터셋 파일 옆에 '<데이터셋>.indicators.<파라미터>.npz'로 저장한다.
+    캐시에는 계산에 사용한 캔들 지문이 함께 저장되어 같은 캔들이면 그대로 불러오고,
+    기존 캔들 뒤에 새 캔들만 추가된 경우에는 마지막 값부터 이어서 새 구간만 계산한다.
+    """
+
+    def __init__(self, strategy=None, ema_periods=(10, 20, 50), atr_period=14):
+        """
+        Args:
+            strategy (TrendFollowingStrategy): 지표 계산에 사용할 전략 (None이면 기본 전략)
+            ema_periods (tuple): EMA 기간 목록
+            atr_period (int): ATR 기간
+        """
+        self.strategy = strategy or TrendFollowingStrategy()
+        self.ema_periods = tuple(ema_periods)
+        self.atr_period = atr_period
+
+    def cache_path(self, dataset_path):
+        """데이터셋 파일에 대응하는 지표 캐시 파일 경로"""
+        param_key = f"ema{'-'.join(str(period) for period in self.ema_periods)}_atr{self.atr_period}"
+        return f"{os.path.splitext(dataset_path)[0]}.indicators.{param_key}.npz"
+
+    def load_or_compute(self, data, dataset_path):
+        """
+        캐시된 지표를 불러오거나 계산 후 저장
+
+        Args:
+            data (pandas.DataFrame): OHLCV 데이터
+            dataset_path (str): 데이터셋 파일 경로 (캐시 파일 위치 결정)
+
+        Returns:
+            pandas.DataFrame: data와 같은 인덱스의 지표 (TrendFollowingStrategy.compute_indicators 형식)
+        """
+        path = self.cache_path(dataset_path)
+        cached = self._load(path)
+
+        if cached is not None:
+            n_cached = len(cached['timestamps'])
+            if n_cached == len(data) and cached['fingerprint'] == fingerprint_candles(data):
+                return self._to_frame(cached['columns'], data.index)
+
+            # 기존 캔들 뒤에 새 캔들만 추가된 경우 새 구간만 계산
+            if 0 < n_cached < len(data) and cached['fingerprint'] == fingerprint_candles(data.iloc[:n_cached]):
+                columns = self._extend(data, cached['columns'], n_cached)
+                self._save(path, data, columns)
+                return self._to_frame(columns, data.index)
+
+        indicators = self.strategy.compute_indicators(data, self.ema_periods, self.atr_period)
+        columns = {name: indicators[name].to_numpy(dtype=np.float64) for name in indicators.columns}
+        self._save(path, data, columns)
+        return indicators
+
+    def _extend(self, data, columns, n_cached):
+        """
+        캐시된 지표를 새 캔들 구간으로 확장
+
+        EMA는 마지막 EMA 값을 시작값으로 이어서 계산하므로 전체를 다시 계산한 것과 같다.
+        ATR은 새 구간과 직전 atr_period개 캔들만으로 다시 계산한다.
+        """
+        new_data = data.iloc[n_cached:]
+        extended = {}
+
+        for period in self.ema_periods:
+            name = f'ema{period}'
+            seeded = pd.DataFrame({'close': np.r_[columns[name][-1], new_data['close'].to_numpy(dtype=np.float64)]})
+            new_values = self.strategy.calculate_ema(seeded, period).to_numpy(dtype=np.float64)[1:]
+            extended[name] = np.r_[columns[name], new_values]
+
+        tail = data.iloc[max(0, n_cached - self.atr_period):]
+        new_atr = self.strategy.calculate_atr(tail, self.atr_period).to_numpy(dtype=np.float64)[-len(new_data):]
+        extended['atr'] = np.r_[columns['atr'], new_atr]
+
+        return extended
+
+    def _load(self, path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as f:
+                return {
+                    'fingerprint': str(f['fingerprint']),
+                    'timestamps': f['timestamps'],
+                    'columns': {name[len('col_'):]: f[name] for name in f.files if name.startswith('col_')}
+                }
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save(self, path, data, columns):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            fingerprint=np.array(fingerprint_candles(data)),
+            timestamps=pd.DatetimeIndex(data.index).asi8,
+            **{f'col_{name}': values for name, values in columns.items()}
+        )
+        os.replace(tmp_path, path)
+
+    def _to_frame(self, columns, index):
+        names = [f'ema{period}' for period in self.ema_periods] + ['atr']
+        return pd.DataFrame({name: columns[name] for name in names}, index=index)
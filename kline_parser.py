@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+import numpy as np
+import pandas as pd
+
+# Binance kline 응답의 컬럼 순서 (get_klines / futures_klines 공통)
+KLINE_COLUMNS = (
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+)
+
+# 트레이더가 사용하는 컬럼 (kline의 1~5번 항목)
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def parse_klines(klines):
+    """
+    Binance kline 목록을 타입이 정해진 numpy 배열로 변환 (필요한 컬럼만, 한 번 순회)
+
+    Args:
+        klines (list): [open_time, open, high, low, close, volume, ...] 형식의 kline 목록 (가격은 문자열)
+
+    Returns:
+        tuple: (int64 밀리초 open_time 배열, float64 (n, 5) OHLCV 배열)
+    """
+    n = len(klines)
+    timestamps = np.fromiter((kline[0] for kline in klines), dtype=np.int64, count=n)
+    values = np.fromiter((float(value) for kline in klines for value in kline[1:6]), dtype=np.float64, count=n * 5)
+    return timestamps, values.reshape(n, 5)
+
+
+def klines_to_frame(klines):
+    """
+    Binance kline 목록을 timestamp 인덱스의 OHLCV DataFrame으로 변환
+
+    Args:
+        klines (list): get_klines / futures_klines 응답
+
+    Returns:
+        pandas.DataFrame: open/high/low/close/volume (float64) 컬럼의 DataFrame
+    """
+    timestamps, values = parse_klines(klines)
+    index = pd.DatetimeIndex(timestamps.astype('datetime64[ms]'), name='timestamp')
+    return pd.DataFrame(values, index=index, columns=list(OHLCV_COLUMNS), copy=False)
+
+
+def parse_kline_event(message):
+    """
+    kline 스트림 메시지를 REST kline 형식의 행으로 변환
+
+    단일 스트림({"e": "kline", "k": {...}})과 결합 스트림({"stream": ..., "data": {...}}) 메시지를 모두 받는다.
+
+    Args:
+        message (str or dict): 웹소켓 메시지
+
+    Returns:
+        tuple: (get_klines/futures_klines와 같은 12개 항목 kline, 캔들 마감 여부), kline 이벤트가 아니면 None
+    """
+    event = json.loads(message) if isinstance(message, (str, bytes)) else message
+    event = event.get('data', event)
+    if event.get('e') != 'kline':
+        return None
+    k = event['k']
+    kline = [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q'], k.get('B', '0')]
+    return kline, bool(k['x'])
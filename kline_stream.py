@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import threading
+import time
+
+from kline_parser import parse_kline_event
+from market_data import parse_timeframe
+
+logger = logging.getLogger(__name__)
+
+# Binance USDⓈ-M 선물 웹소켓 주소 (스트림 이름을 뒤에 붙임)
+FUTURES_STREAM_URL = 'wss://fstream.binance.com/ws'
+
+
+def stream_name(symbol, interval):
+    """kline 스트림 이름 (예: btcusdt@kline_4h)"""
+    return f"{symbol.lower()}@kline_{interval}"
+
+
+class KlineStream:
+    """
+    Binance kline 웹소켓 스트림 구독
+
+    캔들이 갱신될 때마다 on_update, 캔들이 마감되는 순간 on_close를 호출한다.
+    연결이 끊기면(서버는 24시간마다 연결을 끊음) 지수 백오프로 다시 연결하고 on_connect를 호출한다.
+    콜백은 별도 스레드에서 순서대로 실행되므로 REST 호출처럼 오래 걸려도 하트비트 응답이 밀리지 않는다.
+    콜백에서 난 오류는 기록만 하고 구독을 이어간다.
+    """
+
+    def __init__(self, symbol, interval, url=FUTURES_STREAM_URL, reconnect_delay=1.0, max_reconnect_delay=60.0,
+                 heartbeat=30.0):
+        """
+        Args:
+            symbol (str): 거래 심볼 (예: 'BTCUSDT')
+            interval (str): 캔들 주기 (예: '4h')
+            url (str): 웹소켓 주소 (스트림 이름 제외, 로컬 대역은 LocalKlineServer.url)
+            reconnect_delay (float): 첫 재연결 대기 시간 (초)
+            max_reconnect_delay (float): 최대 재연결 대기 시간 (초)
+            heartbeat (float): 핑 간격 (초, 응답이 없으면 끊긴 것으로 보고 재연결)
+        """
+        self.symbol = symbol
+        self.interval = interval
+        self.url = f"{url.rstrip('/')}/{stream_name(symbol, interval)}"
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.heartbeat = heartbeat
+        self.connections = 0
+        self.messages = 0
+        self.closed_candles = 0
+        self.callback_errors = 0
+        self._stop = threading.Event()
+
+    def stop(self):
+        """구독 종료 (콜백 안에서 호출해도 됨)"""
+        self._stop.set()
+
+    def run(self, on_close, on_update=None, on_connect=None):
+        """
+        스트림 구독 (stop()을 호출할 때까지 반환하지 않음)
+
+        Args:
+            on_close (callable): 캔들 마감 시 호출 (kline: REST kline 형식 12개 항목 목록)
+            on_update (callable): 진행 중인 캔들 갱신 시 호출 (kline)
+            on_connect (callable): 연결(재연결 포함)될 때마다 호출 (connections: 연결 횟수)
+        """
+        asyncio.run(self._run(on_close, on_update, on_connect))
+
+    async def _run(self, on_close, on_update, on_connect):
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        delay = self.reconnect_delay
+        async with aiohttp.ClientSession() as session:
+            while not self._stop.is_set():
+                try:
+                    async with session.ws_connect(self.url, heartbeat=self.heartbeat) as ws:
+                        delay = self.reconnect_delay
+                        self.connections += 1
+                        logger.info(f"kline 스트림 연결: {self.url}")
+                        if on_connect:
+                            await self._call(loop, on_connect, self.connections)
+                        while not self._stop.is_set():
+                            try:
+                                message = await ws.receive(timeout=1.0)
+                            except asyncio.TimeoutError:
+                                continue
+                            if message.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                                aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                                break
+                            if message.type != aiohttp.WSMsgType.TEXT:
+                                continue
+                            self.messages += 1
+                            event = parse_kline_event(message.data)
+                            if event is None:
+                                continue
+                            kline, closed = event
+                            if closed:
+                                self.closed_candles += 1
+                                await self._call(loop, on_close, kline)
+                            elif on_update:
+                                await self._call(loop, on_update, kline)
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    logger.warning(f"kline 스트림 연결 오류: {e}")
+                if self._stop.is_set():
+                    break
+                logger.warning(f"kline 스트림 연결 끊김, {delay:g}초 후 재연결")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+
+    async def _call(self, loop, callback, *args):
+        """콜백을 별도 스레드에서 실행 (오류는 기록하고 다음 이벤트를 계속 처리)"""
+        try:
+            await loop.run_in_executor(None, callback, *args)
+        except Exception as e:
+            self.callback_errors += 1
+            logger.error(f"kline 스트림 콜백 오류 ({getattr(callback, '__name__', callback)}): {e}")
+
+
+class LocalKlineServer:
+    """
+    테스트용 로컬 kline 웹소켓 서버 (Binance 선물 kline 스트림 대역)
+
+    주어진 kline을 순서대로 캔들마다 진행 중 갱신 updates개, 마감 이벤트 1개씩 tick초 간격으로 보낸다.
+    재연결해도 보낸 위치부터 이어서 보내므로 끊김/재연결 처리도 확인할 수 있다.
+    """
+
+    def __init__(self, klines, symbol='BTCUSDT', interval='4h', tick=0.01, updates=3, disconnect_after=None,
+                 host='127.0.0.1', port=0):
+        """
+        Args:
+            klines (list): REST kline 형식 목록 (get_klines/futures_klines 응답과 같은 형식)
+            symbol (str): 이벤트에 넣을 심볼
+            interval (str): 이벤트에 넣을 캔들 주기
+            tick (float): 이벤트 사이 간격 (초)
+            updates (int): 캔들당 진행 중 갱신 이벤트 수
+            disconnect_after (int): 이 수만큼 캔들을 마감한 뒤 연결을 한 번 끊음 (None이면 끊지 않음)
+            host (str): 바인딩 주소
+            port (int): 포트 (0이면 빈 포트 사용)
+        """
+        self.klines = klines
+        self.symbol = symbol
+        self.interval = interval
+        self.tick = tick
+        self.updates = updates
+        self.disconnect_after = disconnect_after
+        self.host = host
+        self.position = 0
+        self.connections = 0
+        self.sent_at = {}
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind((host, port))
+        self.port = self._socket.getsockname()[1]
+        self._loop = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """KlineStream에 넘길 주소"""
+        return f"ws://{self.host}:{self.port}/ws"
+
+    def start(self):
+        """백그라운드 스레드에서 서버 시작"""
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._serve, args=(started,), daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        """서버 종료"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def _serve(self, started):
+        from aiohttp import web
+
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get('/ws/{stream}', self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(runner.setup())
+        self._loop.run_until_complete(web.SockSite(runner, self._socket).start())
+        started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(runner.cleanup())
+            self._loop.close()
+
+    def _event(self, kline, close, high, low, closed):
+        """futures kline 이벤트 메시지"""
+        return json.dumps({
+            'e': 'kline', 'E': int(time.time() * 1000), 's': self.symbol,
+            'k': {
+                't': kline[0], 'T': kline[6], 's': self.symbol, 'i': self.interval,
+                'o': kline[1], 'c': close, 'h': high, 'l': low, 'v': kline[5], 'n': kline[8],
+                'x': closed, 'q': kline[7], 'V': kline[9], 'Q': kline[10], 'B': '0'
+            }
+        })
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        closed_here = 0
+        while self.position < len(self.klines) and not ws.closed:
+            kline = self.klines[self.position]
+            open_, high, low, close = (float(value) for value in kline[1:5])
+            # 시가에서 종가로 움직이는 진행 중 갱신
+            for j in range(1, self.updates + 1):
+                partial = open_ + (close - open_) * j / (self.updates + 1)
+                await ws.send_str(self._event(kline, str(partial), str(max(open_, partial)), str(min(open_, partial)), False))
+                await asyncio.sleep(self.tick)
+            self.sent_at[kline[0]] = time.perf_counter()
+            await ws.send_str(self._event(kline, kline[4], kline[2], kline[3], True))
+            self.position += 1
+            closed_here += 1
+            await asyncio.sleep(self.tick)
+            if self.disconnect_after and self.connections == 1 and closed_here >= self.disconnect_after:
+                break
+        await ws.close()
+        return ws
+
+
+def klines_from_csv(path, limit=None):
+    """OHLCV CSV 파일을 REST kline 형식 목록으로 변환 (로컬 서버 재생용)"""
+    import pandas as pd
+    from backtest_records import index_nanoseconds
+
+    data = pd.read_csv(path)
+    if limit:
+        data = data.tail(limit)
+    timestamps, _ = index_nanoseconds(pd.DatetimeIndex(pd.to_datetime(data['timestamp'])))
+    timestamps = timestamps // 1_000_000
+    step = int(timestamps[1] - timestamps[0]) if len(timestamps) > 1 else 60_000
+    klines = []
+    for timestamp, row in zip(timestamps, data.itertuples(index=False)):
+        timestamp = int(timestamp)
+        klines.append([timestamp, str(row.open), str(row.high), str(row.low), str(row.close), str(row.volume),
+                       timestamp + step - 1, str(row.volume * row.close), 0, '0', '0', '0'])
+    return klines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='kline 웹소켓 스트림 확인 (로컬 대역 서버 또는 Binance 선물)')
+    parser.add_argument('--data_file', type=str, default='data/binance_BTC_USDT_4h_20230101_20250521.csv',
+                        help='로컬 서버가 재생할 OHLCV CSV 파일')
+    parser.add_argument('--candles', type=int, default=20, help='재생할 캔들 수')
+    parser.add_argument('--tick', type=float, default=0.01, help='로컬 서버 이벤트 간격 (초)')
+    parser.add_argument('--disconnect_after', type=int, default=None, help='이 수만큼 마감 후 연결을 한 번 끊어 재연결 확인')
+    parser.add_argument('--live', action='store_true', help='로컬 서버 대신 Binance 선물 스트림 구독 (캔들 하나가 마감될 때까지 대기)')
+    parser.add_argument('--symbol', type=str, default='BTCUSDT', help='거래 심볼')
+    parser.add_argument('--interval', type=str, default='4h', help='캔들 주기')
+    parser.add_argument('--poll_interval', type=int, default=300, help='비교할 REST 폴링 주기 (초)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = None
+    if args.live:
+        stream = KlineStream(args.symbol, args.interval)
+        target = 1
+    else:
+        server = LocalKlineServer(klines_from_csv(args.data_file, args.candles), args.symbol, args.interval,
+                                  tick=args.tick, disconnect_after=args.disconnect_after).start()
+        stream = KlineStream(args.symbol, args.interval, server.url, reconnect_delay=0.1)
+        target = args.candles
+
+    delays = []
+
+    def on_close(kline):
+        if server is not None:
+            delays.append(time.perf_counter() - server.sent_at[kline[0]])
+        print(f"  캔들 마감: {kline[0]} 종가 {kline[4]}")
+        if stream.closed_candles >= target:
+            stream.stop()
+
+    start = time.perf_counter()
+    stream.run(on_close)
+    seconds = time.perf_counter() - start
+    if server is not None:
+        server.stop()
+
+    print(f"\n마감 캔들 {stream.closed_candles}개, 메시지 {stream.messages}개, 연결 {stream.connections}회 ({seconds:.2f}초)")
+    if delays:
+        print(f"마감 이벤트 -> 콜백 지연: 평균 {sum(delays) / len(delays) * 1000:.2f}ms, 최대 {max(delays) * 1000:.2f}ms")
+    timeframe_seconds = parse_timeframe(args.interval)
+    polls = timeframe_seconds / args.poll_interval
+    print(f"비교: {args.poll_interval}초 REST 폴링은 마감 후 평균 {args.poll_interval / 2:.0f}초 (최대 {args.poll_interval}초) 뒤 반응, "
+          f"캔들당 kline 요청 약 {max(polls, 1):.0f}회")
+
+
+if __name__ == "__main__":
+    main()
+
+## 로컬 대역 서버로 캔들 마감 이벤트 처리 확인 (네트워크 불필요)
+# python kline_stream.py --candles 50 --tick 0.005
+# python kline_stream.py --candles 20 --disconnect_after 5   # 연결 끊김 후 재연결, 이어서 수신
+#
+## Binance 선물 스트림에서 1분봉 마감 하나 받기
+# python kline_stream.py --live --symbol BTCUSDT --interval 1m
+#
+## 선물 트레이더를 스트림 방식으로 실행: config_futures.json에 "use_stream": true 추가 후
+# python auto_trader_futures.py
@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# 시간프레임 단위별 초
+TIMEFRAME_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_timeframe(timeframe):
+    """시간프레임 문자열(예: '1m', '4h', '1d')을 초 단위로 변환"""
+    return int(timeframe[:-1]) * TIMEFRAME_SECONDS[timeframe[-1]]
+
+
+class NoDataError(Exception):
+    """요청한 기간에 거래소가 돌려준 캔들이 없음 (상장 전/마지막 캔들 이후 구간 등)"""
+
+    def __init__(self, message, incomplete=()):
+        super().__init__(message)
+        # 오류로 끝까지 가져오지 못한 구간 (데이터가 없는 것인지 확인하지 못한 구간)
+        self.incomplete = list(incomplete)
+
+
+class RequestBudget:
+    """
+    여러 스레드가 공유하는 API 요청 예산
+
+    요청 시작 간격을 min_interval초 이상으로 유지하고, 전체 요청 수를 max_requests회로 제한한다.
+    """
+
+    def __init__(self, max_requests=None, min_interval=0.0):
+        """
+        Args:
+            max_requests (int): 최대 요청 수 (None이면 제한 없음)
+            min_interval (float): 요청 시작 사이의 최소 간격 (초)
+        """
+        self.max_requests = max_requests
+        self.min_interval = min_interval
+        self.used = 0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        요청 하나를 예산에서 차감하고 시작 가능 시간까지 대기
+
+        Returns:
+            bool: 요청 가능 여부 (예산을 다 쓰면 False)
+        """
+        with self._lock:
+            if self.max_requests is not None and self.used >= self.max_requests:
+                return False
+            self.used += 1
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+        return True
+
+
+def create_exchange(exchange_id):
+    """ccxt 거래소 인스턴스 생성 (요청 간격은 RequestBudget이 관리, 거래소 객체를 넘기면 그대로 사용)"""
+    if not isinstance(exchange_id, str):
+        # exchange_fixtures.ReplayClient, 테스트용 거래소 대역 등 이미 만든 거래소 객체
+        return exchange_id
+    import ccxt
+    exchange_class = getattr(ccxt, exchange_id)
+    return exchange_class({
+        'enableRateLimit': False,
+    })
+
+
+def _fetch_window(exchange, symbol, timeframe, window_start, window_end, limit, budget, retries):
+    """
+    [window_start, window_end) 구간의 캔들을 가져옴
+
+    거래소가 limit보다 적게 돌려주면 마지막 캔들 이후부터 같은 구간을 이어서 요청한다.
+
+    Returns:
+        tuple: (캔들 목록, 구간을 끝까지 가져왔는지 여부)
+    """
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    rows = []
+    current_since = window_start
+    failures = 0
+    while current_since < window_end:
+        if not budget.acquire():
+            return rows, False
+        try:
+            ohlcv = exchange.fetch_ohlcv(symbol, timeframe, current_since, limit)
+        except Exception as e:
+            failures += 1
+            if failures > retries:
+                print(f"데이터 가져오기 오류 ({datetime.fromtimestamp(current_since/1000)} 부터): {e}")
+                return rows, False
+            # 오류 발생 시 잠시 대기 후 재시도
+            time.sleep(min(5.0, 0.5 * 2 ** (failures - 1)))
+            continue
+
+        ohlcv = [candle for candle in ohlcv if current_since <= candle[0] < window_end]
+        if not ohlcv:
+            break
+        rows.extend(ohlcv)
+        current_since = ohlcv[-1][0] + timeframe_ms
+    return rows, True
+
+
+class OHLCVChunkStream:
+    """
+    기간을 요청 단위 구간으로 나눠 여러 스레드로 가져오면서 도착한 순서대로 청크를 내보내는 반복자
+
+    구간은 시간순으로 내보내고, 동시에 진행하는 구간은 prefetch개로 제한하므로 기간이 길어도 메모리 사용량이 일정하다.
+    반복이 끝나면 incomplete에 끝까지 가져오지 못한 구간, budget.used에 사용한 요청 수가 남는다.
+
+    청크는 TrendFollowingStrategy.backtest_stream()이나 CandleStore.add()에 그대로 넘길 수 있다.
+    """
+
+    def __init__(self, exchange, symbol='BTC/USDT', timeframe='4h', since=None, until=None, limit=1000,
+                 workers=4, max_requests=None, min_interval=None, retries=3, chunk_size=None, prefetch=None,
+                 arrays=False, verbose=True):
+        """
+        Args:
+            exchange: ccxt 거래소 인스턴스 (또는 ReplayClient 등 fetch_ohlcv/parse_timeframe/milliseconds를 가진 객체)
+            symbol (str): 심볼 (예: 'BTC/USDT')
+            timeframe (str): 시간프레임 (예: '1h', '4h', '1d')
+            since (int): 시작 타임스탬프 (밀리초)
+            until (int): 종료 타임스탬프 (밀리초, 포함)
+            limit (int): 각 요청당 가져올 캔들 개수
+            workers (int): 동시 요청 스레드 수
+            max_requests (int): 전체 요청 수 제한 (None이면 제한 없음)
+            min_interval (float): 요청 시작 사이의 최소 간격 (초, None이면 거래소 rateLimit 사용)
+            retries (int): 구간별 오류 재시도 횟수
+            chunk_size (int): 청크당 최소 캔들 수 (None이면 구간마다 내보냄)
+            prefetch (int): 미리 요청해 둘 구간 수 (None이면 workers * 2)
+            arrays (bool): DataFrame 대신 (int64 밀리초 timestamp 배열, float64 OHLCV 2차원 배열) 튜플로 내보냄
+            verbose (bool): 진행 상황 출력 여부
+        """
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.limit = limit
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch or self.workers * 2
+        self.arrays = arrays
+        self.verbose = verbose
+
+        self.timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+        # 기본 시작 시간 설정 (없는 경우 현재 시간부터 limit*timeframe 이전)
+        self.since = exchange.milliseconds() - limit * self.timeframe_ms if since is None else since
+        self.until = exchange.milliseconds() if until is None else until
+
+        if min_interval is None:
+            min_interval = getattr(exchange, 'rateLimit', 0) / 1000
+        self.budget = RequestBudget(max_requests, min_interval)
+
+        # 요청 하나로 가져올 수 있는 구간 단위로 분할 (종료 시각의 캔들 포함)
+        window = limit * self.timeframe_ms
+        self.windows = [(start, min(start + window, self.until + 1)) for start in range(self.since, self.until + 1, window)]
+        self.incomplete = []
+        self.candles = 0
+
+    def __iter__(self):
+        if self.verbose:
+            print(f"지정된 기간: {datetime.fromtimestamp(self.since/1000)} ~ {datetime.fromtimestamp(self.until/1000)}")
+            print(f"예상 캔들 수: 약 {int((self.until - self.since) / self.timeframe_ms)}개")
+            print(f"요청 계획: {len(self.windows)}개 구간, 동시 요청 {self.workers}개 (각 요청당 최대 {self.limit}개 캔들)")
+
+        pending = []
+        last_timestamp = None
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            windows = iter(self.windows)
+            futures = []
+            for start, end in windows:
+                futures.append((executor.submit(_fetch_window, self.exchange, self.symbol, self.timeframe, start, end,
+                                                self.limit, self.budget, self.retries), start, end))
+                if len(futures) >= self.prefetch:
+                    break
+
+            k = 0
+            while futures:
+                future, start, end = futures.pop(0)
+                # 내보낸 구간 수만큼 다음 구간 요청
+                for next_start, next_end in windows:
+                    futures.append((executor.submit(_fetch_window, self.exchange, self.symbol, self.timeframe, next_start,
+                                                    next_end, self.limit, self.budget, self.retries), next_start, next_end))
+                    break
+
+                rows, complete = future.result()
+                if not complete:
+                    self.incomplete.append((start, end))
+                # 구간 경계/재요청으로 생긴 중복 제거
+                if last_timestamp is not None:
+                    rows = [row for row in rows if row[0] > last_timestamp]
+                if rows:
+                    last_timestamp = rows[-1][0]
+                    pending.extend(rows)
+
+                k += 1
+                if self.verbose and (k % 10 == 0 or k == len(self.windows)):
+                    print(f"  - 진행: {k}/{len(self.windows)} 구간 (누적: {self.candles + len(pending)}개 캔들, 요청: {self.budget.used}회)")
+
+                if pending and (self.chunk_size is None or len(pending) >= self.chunk_size):
+                    yield self._chunk(pending)
+                    pending = []
+
+        if pending:
+            yield self._chunk(pending)
+
+        if self.incomplete:
+            first = datetime.fromtimestamp(self.incomplete[0][0] / 1000)
+            print(f"경고: {len(self.incomplete)}개 구간을 끝까지 가져오지 못했습니다 (첫 구간: {first} 부터, 요청 {self.budget.used}회 사용)")
+
+    def _chunk(self, rows):
+        """캔들 목록을 시간순 정렬/중복 제거한 청크로 변환"""
+        values = np.asarray(rows, dtype=np.float64)
+        timestamps = values[:, 0].astype(np.int64)
+        if len(timestamps) > 1 and not (np.diff(timestamps) > 0).all():
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, values = timestamps[order], values[order]
+            # 같은 타임스탬프는 마지막 캔들 유지
+            keep = np.append(timestamps[1:] != timestamps[:-1], True)
+            timestamps, values = timestamps[keep], values[keep]
+        self.candles += len(timestamps)
+
+        if self.arrays:
+            return timestamps, np.ascontiguousarray(values[:, 1:])
+        index = pd.DatetimeIndex(pd.to_datetime(timestamps, unit='ms'), name='timestamp')
+        return pd.DataFrame(values[:, 1:], index=index, columns=OHLCV_COLUMNS[1:])
+
+
+def download_ohlcv(exchange, symbol='BTC/USDT', timeframe='4h', since=None, until=None, limit=1000,
+                   workers=4, max_requests=None, min_interval=None, retries=3, verbose=True):
+    """
+    기간을 요청 단위 구간으로 나눠 여러 스레드로 동시에 OHLCV 데이터 가져오기
+
+    Args:
+        exchange: ccxt 거래소 인스턴스 (또는 ReplayClient 등 fetch_ohlcv/parse_timeframe/milliseconds를 가진 객체)
+        symbol (str): 심볼 (예: 'BTC/USDT')
+        timeframe (str): 시간프레임 (예: '1h', '4h', '1d')
+        since (int): 시작 타임스탬프 (밀리초)
+        until (int): 종료 타임스탬프 (밀리초, 포함)
+        limit (int): 각 요청당 가져올 캔들 개수
+        workers (int): 동시 요청 스레드 수
+        max_requests (int): 전체 요청 수 제한 (None이면 제한 없음)
+        min_interval (float): 요청 시작 사이의 최소 간격 (초, None이면 거래소 rateLimit 사용)
+        retries (int): 구간별 오류 재시도 횟수
+        verbose (bool): 진행 상황 출력 여부
+
+    Returns:
+        pandas.DataFrame: timestamp 인덱스의 OHLCV 데이터 (시간순 정렬, 중복 제거)
+    """
+    stream = OHLCVChunkStream(exchange, symbol, timeframe, since, until, limit, workers=workers,
+                              max_requests=max_requests, min_interval=min_interval, retries=retries, verbose=verbose)
+    chunks = list(stream)
+    if not chunks:
+        raise NoDataError("데이터를 가져올 수 없습니다.", stream.incomplete)
+
+    df = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+    # 끝까지 가져오지 못한 구간 (CandleStore가 보유 구간에서 제외)
+    df.attrs['incomplete'] = stream.incomplete
+    return df
+
+
+def fetch_ohlcv(exchange_id='binance', symbol='BTC/USDT', timeframe='4h', since=None, until=None, limit=1000,
+                workers=4, max_requests=None):
+    """
+    거래소에서 OHLCV 데이터 가져오기
+
+    Args:
+        exchange_id (str): 거래소 ID (예: 'binance', 'bybit')
+        symbol (str): 심볼 (예: 'BTC/USDT')
+        timeframe (str): 시간프레임 (예: '1h', '4h', '1d')
+        since (int): 시작 타임스탬프 (밀리초)
+        until (int): 종료 타임스탬프 (밀리초)
+        limit (int): 각 요청당 가져올 캔들 개수
+        workers (int): 동시 요청 스레드 수
+        max_requests (int): 전체 요청 수 제한 (None이면 제한 없음)
+
+    Returns:
+        pandas.DataFrame: OHLCV 데이터
+    """
+    exchange = create_exchange(exchange_id)
+    df = download_ohlcv(exchange, symbol, timeframe, since, until, limit, workers=workers, max_requests=max_requests)
+
+    # 결과 요약
+    if not df.empty:
+        print(f"\n데이터 가져오기 완료:")
+        print(f"가져온 총 캔들 수: {len(df)}개")
+        print(f"기간: {df.index[0]} ~ {df.index[-1]}")
+        print(f"시간프레임: {timeframe}")
+    else:
+        print("가져온 데이터가 없습니다.")
+
+    return df
+
+
+def fetch_ohlcv_chunks(exchange_id='binance', symbol='BTC/USDT', timeframe='4h', since=None, until=None, limit=1000,
+                       workers=4, max_requests=None, chunk_size=None, arrays=False):
+    """
+    거래소에서 OHLCV 데이터를 청크 단위로 가져오기 (도착한 구간부터 바로 처리 가능)
+
+    Args:
+        exchange_id (str): 거래소 ID (예: 'binance', 'bybit')
+        symbol (str): 심볼 (예: 'BTC/USDT')
+        timeframe (str): 시간프레임 (예: '1h', '4h', '1d')
+        since (int): 시작 타임스탬프 (밀리초)
+        until (int): 종료 타임스탬프 (밀리초)
+        limit (int): 각 요청당 가져올 캔들 개수
+        workers (int): 동시 요청 스레드 수
+        max_requests (int): 전체 요청 수 제한 (None이면 제한 없음)
+        chunk_size (int): 청크당 최소 캔들 수 (None이면 요청 구간마다)
+        arrays (bool): DataFrame 대신 (timestamp 배열, OHLCV 배열) 튜플로 내보냄
+
+    Returns:
+        OHLCVChunkStream: 시간순 OHLCV 청크 반복자
+    """
+    return OHLCVChunkStream(create_exchange(exchange_id), symbol, timeframe, since, until, limit, workers=workers,
+                            max_requests=max_requests, chunk_size=chunk_size, arrays=arrays)
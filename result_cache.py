@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import ast
+import json
+import pickle
+import hashlib
+import inspect
+import numpy as np
+import pandas as pd
+
+
+def fingerprint_data(data, indicators=None):
+    """
+    캔들 데이터 지문 계산
+
+    인덱스(타임스탬프)와 OHLCV 컬럼의 원시 바이트를 해시한다. 미리 계산한 지표를
+    함께 넘기면 지표 값도 지문에 포함한다.
+
+    Args:
+        data (pandas.DataFrame): OHLCV 데이터
+        indicators (pandas.DataFrame): 미리 계산한 지표 (선택)
+
+    Returns:
+        str: 16진수 지문
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(data.index).asi8).tobytes())
+    for column in ('open', 'high', 'low', 'close', 'volume'):
+        digest.update(column.encode())
+        digest.update(np.ascontiguousarray(data[column].to_numpy(dtype=np.float64)).tobytes())
+    if indicators is not None:
+        for column in ('ema10', 'ema20', 'ema50', 'atr'):
+            digest.update(column.encode())
+            digest.update(np.ascontiguousarray(indicators[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def _local_imports(path, directory):
+    """모듈 최상위에서 불러오는 같은 디렉토리 모듈의 소스 파일 경로 (함수 안에서 불러오는 모듈은 제외)"""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.append(node.module)
+    paths = []
+    for name in names:
+        candidate = os.path.join(directory, *name.split('.')) + '.py'
+        if os.path.isfile(candidate):
+            paths.append(candidate)
+    return paths
+
+
+def engine_source_files(strategy_class):
+    """
+    전략 클래스 모듈과 그 모듈이 (간접적으로) 불러오는 로컬 모듈(같은 디렉토리)의 소스 파일 목록
+
+    import 문을 읽어 찾으므로 상수만 불러오는 모듈(from x import CONSTANT)도 포함한다.
+
+    Args:
+        strategy_class (type): 전략 클래스
+
+    Returns:
+        list: 정렬된 소스 파일 경로 목록
+    """
+    module_path = os.path.abspath(inspect.getfile(strategy_class))
+    directory = os.path.dirname(module_path)
+    files = set()
+    pending = [module_path]
+    while pending:
+        path = pending.pop()
+        if path in files:
+            continue
+        files.add(path)
+        pending.extend(_local_imports(path, directory))
+    return sorted(files)
+
+
+class BacktestResultCache:
+    """
+    백테스트 결과 디스크 캐시
+
+    입력 캔들 지문 + 전략 파라미터 + 전략 코드 버전으로 키를 만들고, 결과(trades,
+    equity_curve, 요약 지표)와 실행 후 전략 상태를 함께 저장한다. 캐시 크기가
+    max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제한다 (LRU).
+    """
+
+    # 키에 포함하는 전략 파라미터
+    PARAMETER_NAMES = (
+        'initial_capital', 'risk_percentage', 'leverage', 'adjustment_period',
+        'sideways_lookback', 'sideways_threshold', 'breakout_lookback'
+    )
+
+    def __init__(self, cache_dir='data/cache/results', max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str): 캐시 디렉토리
+            max_bytes (int): 캐시 최대 크기 (바이트)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._code_versions = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def code_version(self, strategy):
+        """
+        전략 코드 버전 (코드가 바뀌면 캐시 무효화)
+
+        전략 클래스가 정의된 소스 파일과, 그 모듈이 불러오는 같은 디렉토리의 모듈
+        (backtest_records 등 엔진이 사용하는 모듈) 소스를 함께 해시한다.
+        """
+        strategy_class = type(strategy)
+        if strategy_class not in self._code_versions:
+            digest = hashlib.blake2b(digest_size=10)
+            for path in engine_source_files(strategy_class):
+                digest.update(os.path.basename(path).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            self._code_versions[strategy_class] = f"{strategy_class.__qualname__}:{digest.hexdigest()}"
+        return self._code_versions[strategy_class]
+
+    def make_key(self, strategy, data_fingerprint):
+        """
+        캐시 키 생성
+
+        Args:
+            strategy (TrendFollowingStrategy): 실행 전 전략 객체
+            data_fingerprint (str): fingerprint_data() 결과
+
+        Returns:
+            str: 캐시 키
+        """
+        key_source = json.dumps({
+            'data': data_fingerprint,
+            'code': self.code_version(strategy),
+            'params': {name: getattr(strategy, name) for name in self.PARAMETER_NAMES}
+        }, sort_keys=True)
+        return hashlib.blake2b(key_source.encode(), digest_size=20).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        캐시 조회
+
+        Returns:
+            dict: 저장된 항목 ({'results': ..., 'state': ...}) 또는 None
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        # LRU: 사용 시각 갱신
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, entry):
+        """캐시 저장 (임시 파일에 쓴 뒤 교체) 후 크기 제한 적용"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        """캐시 크기가 max_bytes 이하가 될 때까지 가장 오래 사용하지 않은 항목 삭제"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pkl'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def run(self, strategy, data, engine='pandas', indicators=None, data_fingerprint=None):
+        """
+        캐시를 거쳐 백테스트 실행
+
+        캐시에 있으면 저장된 결과를 반환하고 전략 상태를 실행 직후 상태로 복원한다.
+        이전 실행 상태가 남아있는 전략은 결과가 달라질 수 있으므로 캐시를 사용하지 않는다.
+
+        Args:
+            strategy (TrendFollowingStrategy): 전략 객체
+            data (pandas.DataFrame): OHLCV 데이터
+            engine (str): 백테스팅 엔진
+            indicators (pandas.DataFrame): 미리 계산한 지표 (선택)
+            data_fingerprint (str): 미리 계산한 데이터 지문 (None이면 계산)
+
+        Returns:
+            dict: 백테스팅 결과
+        """
+        if not self._is_fresh(strategy):
+            return strategy.backtest(data, engine=engine, indicators=indicators)
+
+        if data_fingerprint is None:
+            data_fingerprint = fingerprint_data(data, indicators)
+        key = self.make_key(strategy, data_fingerprint)
+
+        entry = self.get(key)
+        if entry is not None:
+            strategy.__dict__.update(entry['state'])
+            return entry['results']
+
+        results = strategy.backtest(data, engine=engine, indicators=indicators)
+
+        # 인스턴스에 덮어쓴 메서드 등 호출 가능한 속성은 저장하지 않음
+        state = {name: value for name, value in vars(strategy).items() if not callable(value)}
+        self.put(key, {'results': results, 'state': state})
+        return results
+
+    def _is_fresh(self, strategy):
+        """아직 백테스트를 실행하지 않은 전략인지 확인"""
+        return (
+            not strategy.trades and
+            not strategy.equity_curve and
+            strategy.position == 0 and
+            strategy.capital == strategy.initial_capital and
+            strategy.last_adjustment_time is None
+        )
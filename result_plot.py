@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+# 한글 폰트 설정을 위한 폰트 매니저 추가
+import matplotlib.font_manager as fm
+
+# 기본 출력 점 개수 (자본금 곡선/Drawdown 각각)
+DEFAULT_MAX_POINTS = 2000
+
+# 한글 폰트 후보 (설치된 첫 번째 폰트 사용)
+KOREAN_FONTS = ('AppleGothic', 'Malgun Gothic', 'NanumGothic', 'NanumBarunGothic', 'Noto Sans CJK KR', 'Noto Sans KR', 'UnDotum')
+
+# 한글 폰트의 마이너스 기호 깨짐 방지 (그리는 동안만 적용)
+RC_PARAMS = {'axes.unicode_minus': False}
+
+# 그래프 레이블 (한글 폰트가 없으면 영문 사용)
+LABELS = {
+    'ko': {'equity_title': '자본금 곡선', 'time': '시간', 'equity': '자본금 (USDT)', 'drawdown_title': 'Drawdown', 'drawdown': 'Drawdown (%)'},
+    'en': {'equity_title': 'Equity Curve', 'time': 'Time', 'equity': 'Equity (USDT)', 'drawdown_title': 'Drawdown', 'drawdown': 'Drawdown (%)'}
+}
+
+
+def lttb_indices(x, y, max_points):
+    """
+    LTTB(Largest-Triangle-Three-Buckets) 다운샘플링으로 남길 점의 인덱스 계산
+
+    첫 점과 마지막 점을 유지하고, 나머지 점을 max_points - 2개 구간으로 나눠 각 구간에서
+    직전 선택 점, 다음 구간 평균점과 만드는 삼각형 넓이가 가장 큰 점을 고른다.
+    급등/급락 같은 모양이 유지된다.
+
+    Args:
+        x (numpy.ndarray): x 값 (시간순)
+        y (numpy.ndarray): y 값
+        max_points (int): 남길 점 개수
+
+    Returns:
+        numpy.ndarray: 선택된 점의 인덱스 (오름차순)
+    """
+    n = len(x)
+    if max_points is None or max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    x = x - x[0]  # 큰 타임스탬프 값의 정밀도 손실 방지
+    y = np.asarray(y, dtype=np.float64)
+
+    # 구간 경계: 구간 i는 [edges[i], edges[i+1]), 마지막 경계는 마지막 점
+    every = (n - 2) / (max_points - 2)
+    edges = (np.arange(max_points - 1) * every).astype(np.int64) + 1
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample(timestamps, values, max_points):
+    """
+    시계열을 LTTB로 다운샘플링
+
+    Args:
+        timestamps (pandas.Series): datetime 시계열
+        values (pandas.Series): 값
+        max_points (int): 남길 점 개수 (None이면 다운샘플링 안 함)
+
+    Returns:
+        tuple: (timestamps, values) numpy 배열
+    """
+    x = timestamps.to_numpy()
+    y = values.to_numpy(dtype=np.float64)
+    indices = lttb_indices(x.astype('datetime64[ns]').astype(np.int64), y, max_points)
+    return x[indices], y[indices]
+
+
+def korean_font():
+    """설치된 한글 폰트 이름 (없으면 None)"""
+    installed = {font.name for font in fm.fontManager.ttflist}
+    for name in KOREAN_FONTS:
+        if name in installed:
+            return name
+    return None
+
+
+def has_display():
+    """그래프 창을 띄울 수 있는 환경인지 확인 (Linux에서 DISPLAY/WAYLAND_DISPLAY가 없으면 headless)"""
+    if sys.platform in ('darwin', 'win32'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def _draw(figure, results, max_points):
+    """자본금 곡선과 Drawdown을 figure에 그림"""
+    font = korean_font()
+    labels = LABELS['ko' if font else 'en']
+    font_kwargs = {'family': font} if font else {}
+
+    equity_curve = results['equity_curve']
+    equity_x, equity_y = downsample(equity_curve['timestamp'], equity_curve['equity'], max_points)
+    drawdown_x, drawdown_y = downsample(equity_curve['timestamp'], equity_curve['drawdown'] * 100, max_points)
+
+    # 자본금 곡선
+    ax = figure.add_subplot(2, 1, 1)
+    ax.plot(equity_x, equity_y)
+    ax.set_title(labels['equity_title'], fontsize=16, **font_kwargs)
+    ax.set_xlabel(labels['time'], **font_kwargs)
+    ax.set_ylabel(labels['equity'], **font_kwargs)
+    ax.grid(True)
+
+    # Drawdown 곡선
+    ax = figure.add_subplot(2, 1, 2)
+    ax.fill_between(drawdown_x, drawdown_y)
+    ax.set_title(labels['drawdown_title'], fontsize=16, **font_kwargs)
+    ax.set_xlabel(labels['time'], **font_kwargs)
+    ax.set_ylabel(labels['drawdown'], **font_kwargs)
+    ax.grid(True)
+
+    figure.tight_layout()
+
+
+def render_results(results, output, max_points=DEFAULT_MAX_POINTS, dpi=100):
+    """
+    백테스팅 결과를 이미지 파일로 저장 (화면 없이 동작)
+
+    pyplot을 거치지 않고 Agg 캔버스에 직접 그리므로 headless 서버나 스윕 워커 프로세스에서도 사용할 수 있다.
+
+    Args:
+        results (dict): 백테스팅 결과
+        output (str): 저장할 파일 경로 (확장자로 형식 결정: .png, .svg, .pdf 등)
+        max_points (int): 자본금 곡선/Drawdown 각각의 최대 점 개수 (None이면 전체)
+        dpi (int): 해상도
+
+    Returns:
+        str: 저장한 파일 경로 (결과가 없으면 None)
+    """
+    if results['equity_curve'].empty:
+        return None
+
+    figure = Figure(figsize=(15, 10))
+    FigureCanvasAgg(figure)
+    with matplotlib.rc_context(RC_PARAMS):
+        _draw(figure, results, max_points)
+        figure.savefig(output, dpi=dpi)
+    return output
+
+
+def plot_results(results, output=None, max_points=DEFAULT_MAX_POINTS):
+    """
+    백테스팅 결과 시각화
+
+    output을 지정하거나 화면이 없는 환경이면 이미지 파일로 저장하고, 그렇지 않으면 창으로 표시한다.
+
+    Args:
+        results (dict): 백테스팅 결과
+        output (str): 저장할 파일 경로 (None이면 화면 표시, headless면 backtest_results.png)
+        max_points (int): 자본금 곡선/Drawdown 각각의 최대 점 개수 (None이면 전체)
+    """
+    if results['equity_curve'].empty:
+        print("결과가 없습니다.")
+        return
+
+    if output is None and not has_display():
+        output = 'backtest_results.png'
+
+    if output is not None:
+        render_results(results, output, max_points)
+        print(f"결과 그래프가 저장되었습니다: {output}")
+    else:
+        # 화면 표시는 pyplot 필요 (사용할 때만 불러옴)
+        import matplotlib.pyplot as plt
+        with matplotlib.rc_context(RC_PARAMS):
+            figure = plt.figure(figsize=(15, 10))
+            _draw(figure, results, max_points)
+            plt.show()
+
+    # 결과 통계 출력
+    print(f"총 수익률: {results['total_return'] * 100:.2f}%")
+    print(f"총 거래 횟수: {results['total_trades']}")
+    print(f"승률: {results['win_rate'] * 100:.2f}%")
+    print(f"손익비: {results['profit_factor']:.2f}")
+    print(f"최대 낙폭: {results['max_drawdown'] * 100:.2f}%")
+    print(f"최종 자본금: {results['final_capital']:.2f} USDT")
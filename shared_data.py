@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+from strategy import TrendFollowingStrategy
+
+# 공유 메모리에 올리는 컬럼 (타임스탬프는 int64 나노초로 별도 저장)
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+INDICATOR_COLUMNS = ('ema10', 'ema20', 'ema50', 'atr')
+
+
+class SharedOHLCV:
+    """
+    멀티프로세스 백테스트용 공유 메모리 OHLCV 데이터
+
+    부모 프로세스에서 create()로 OHLCV 컬럼과 미리 계산한 EMA10/20/50, ATR 배열을
+    하나의 공유 메모리 블록에 올리고, 워커는 spec을 받아 attach()로 복사 없이 연결한다.
+    코어 수와 관계없이 데이터는 한 벌만 메모리에 존재한다.
+
+    메모리 배치: [timestamp(int64) | open | high | low | close | volume | ema10 | ema20 | ema50 | atr]
+    각 컬럼은 length개의 8바이트 값이 연속으로 저장된다.
+    """
+
+    def __init__(self, shm, length, owner=False):
+        """
+        Args:
+            shm (SharedMemory): 공유 메모리 블록
+            length (int): 캔들 수
+            owner (bool): 블록 생성자 여부 (True면 unlink() 책임)
+        """
+        self.shm = shm
+        self.length = length
+        self.owner = owner
+
+        self.timestamps = np.ndarray((length,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self.arrays = {}
+        for k, column in enumerate(OHLCV_COLUMNS + INDICATOR_COLUMNS):
+            self.arrays[column] = np.ndarray((length,), dtype=np.float64, buffer=shm.buf, offset=(k + 1) * length * 8)
+
+        # 워커에서는 읽기 전용으로 사용
+        if not owner:
+            self.timestamps.flags.writeable = False
+            for array in self.arrays.values():
+                array.flags.writeable = False
+
+    @classmethod
+    def create(cls, data, strategy=None, indicators=None):
+        """
+        DataFrame을 공유 메모리 블록으로 복사하고 지표를 계산해 함께 저장
+
+        Args:
+            data (pandas.DataFrame): timestamp 인덱스의 OHLCV 데이터
+            strategy (TrendFollowingStrategy): 지표 계산에 사용할 전략 (None이면 기본 전략)
+            indicators (pandas.DataFrame): 미리 계산한 지표 (None이면 계산)
+
+        Returns:
+            SharedOHLCV: 생성한 공유 데이터 (생성자가 close()/unlink() 호출)
+        """
+        if indicators is None:
+            strategy = strategy or TrendFollowingStrategy()
+            indicators = strategy.compute_indicators(data)
+
+        length = len(data)
+        n_columns = 1 + len(OHLCV_COLUMNS) + len(INDICATOR_COLUMNS)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, n_columns * length * 8))
+
+        shared = cls(shm, length, owner=True)
+        shared.timestamps[:] = pd.DatetimeIndex(data.index).asi8
+        for column in OHLCV_COLUMNS:
+            shared.arrays[column][:] = data[column].to_numpy(dtype=np.float64)
+        for column in INDICATOR_COLUMNS:
+            shared.arrays[column][:] = indicators[column].to_numpy(dtype=np.float64)
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        워커 프로세스에서 기존 공유 메모리 블록에 연결 (복사 없음)
+
+        Args:
+            spec (dict): 부모 프로세스의 SharedOHLCV.spec
+
+        Returns:
+            SharedOHLCV: 읽기 전용 공유 데이터
+        """
+        try:
+            # Python 3.13+: 워커가 블록을 추적하지 않도록 설정
+            shm = shared_memory.SharedMemory(name=spec['name'], track=False)
+        except TypeError:
+            # 프로세스 풀 워커는 부모의 resource_tracker를 공유하므로 블록 삭제는 부모가 담당
+            shm = shared_memory.SharedMemory(name=spec['name'])
+        return cls(shm, spec['length'], owner=False)
+
+    @property
+    def spec(self):
+        """워커에 전달할 공유 메모리 정보 (pickle 가능)"""
+        return {'name': self.shm.name, 'length': self.length}
+
+    def frames(self):
+        """
+        공유 배열 위에 만든 DataFrame 반환 (복사 없음)
+
+        Returns:
+            tuple: (OHLCV DataFrame, 지표 DataFrame) -
+                TrendFollowingStrategy.backtest(data, indicators=indicators)에 그대로 전달 가능
+        """
+        index = pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'), copy=False, name='timestamp')
+        data = pd.DataFrame({column: self.arrays[column] for column in OHLCV_COLUMNS}, index=index, copy=False)
+        indicators = pd.DataFrame({column: self.arrays[column] for column in INDICATOR_COLUMNS}, index=index, copy=False)
+        return data, indicators
+
+    def close(self):
+        """현재 프로세스의 공유 메모리 연결 해제"""
+        self.timestamps = None
+        self.arrays = {}
+        self.shm.close()
+
+    def unlink(self):
+        """공유 메모리 블록 삭제 (생성한 프로세스에서만 호출)"""
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        self.unlink()
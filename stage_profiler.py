@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+
+_MISSING = object()
+
+
+class StageProfiler:
+    """
+    백테스트 단계별 누적 실행 시간/호출 횟수 측정기
+
+    instrument()로 객체의 메서드를 시간 측정 래퍼로 바꿔 끼우고 restore()로 되돌린다.
+    측정하지 않을 때는 원래 메서드가 그대로 호출되므로 추가 비용이 없다.
+    메서드가 아닌 구간(진입 조건 평가 등)은 add()로 직접 기록한다.
+    """
+
+    def __init__(self):
+        self.stats = {}  # 단계 이름 -> [호출 횟수, 누적 시간(초)]
+        self._originals = []
+
+    def add(self, stage, seconds, calls=1):
+        """단계 실행 시간 기록"""
+        stats = self.stats.setdefault(stage, [0, 0.0])
+        stats[0] += calls
+        stats[1] += seconds
+
+    def wrap(self, stage, func):
+        """func 호출 시간을 stage로 기록하는 래퍼 반환"""
+        stats = self.stats.setdefault(stage, [0, 0.0])
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats[0] += 1
+                stats[1] += perf_counter() - start
+
+        return timed
+
+    def instrument(self, obj, names):
+        """
+        객체의 메서드를 시간 측정 래퍼로 교체
+
+        Args:
+            obj: 측정할 객체 (TrendFollowingStrategy 등)
+            names (iterable): 측정할 메서드 이름 목록
+        """
+        for name in names:
+            self._originals.append((obj, name, obj.__dict__.get(name, _MISSING)))
+            setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    def restore(self):
+        """instrument()로 교체한 메서드 복원"""
+        for obj, name, original in reversed(self._originals):
+            if original is _MISSING:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, original)
+        self._originals = []
+
+    def report(self, total_seconds=None):
+        """
+        단계별 측정 결과
+
+        Args:
+            total_seconds (float): 전체 실행 시간 (지정하면 단계별 비율 계산)
+
+        Returns:
+            dict: 단계 이름 -> {'calls', 'seconds', 'per_call_us', 'pct'} (호출되지 않은 단계 제외)
+        """
+        report = {}
+        for stage, (calls, seconds) in self.stats.items():
+            if calls == 0:
+                continue
+            report[stage] = {
+                'calls': calls,
+                'seconds': seconds,
+                'per_call_us': seconds / calls * 1e6,
+                'pct': seconds / total_seconds * 100 if total_seconds else None
+            }
+        return report
+
+
+def format_profile(profile):
+    """
+    단계별 측정 결과를 표 형식 문자열로 변환
+
+    Args:
+        profile (dict): 백테스팅 결과의 'profile' 항목
+
+    Returns:
+        str: 출력용 문자열
+    """
+    lines = [f"{'단계':<36} {'호출 수':>10} {'누적 시간(초)':>14} {'호출당(us)':>12} {'비율':>8}"]
+    stages = sorted(profile['stages'].items(), key=lambda item: item[1]['seconds'], reverse=True)
+    for stage, stats in stages:
+        pct = f"{stats['pct']:.1f}%" if stats['pct'] is not None else '-'
+        lines.append(f"{stage:<36} {stats['calls']:>10,} {stats['seconds']:>14.4f} {stats['per_call_us']:>12.2f} {pct:>8}")
+    lines.append(f"{'전체':<36} {'':>10} {profile['total_seconds']:>14.4f}")
+    return "\n".join(lines)
@@ -1,15 +1,42 @@
+# 트레이더가 가볍게 불러올 수 있도록 matplotlib(result_plot)과 ccxt(market_data)는 사용할 때 불러옴
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import ccxt
 import os
 from datetime import datetime, timedelta
-# 한글 폰트 설정을 위한 폰트 매니저 추가
-import matplotlib.font_manager as fm
 import time
+from dataclasses import dataclass
+
+from backtest_records import EquityRecorder, TradeLog, index_nanoseconds, to_nanoseconds
+from stage_profiler import StageProfiler
+
+@dataclass(frozen=True)
+class StrategyConfig:
+    """
+    진입 신호/파라미터 조정 설정
+    
+    전략 메서드를 바꿔 끼우는 대신 TrendFollowingStrategy(config=...)로 전달한다. 
+    변경할 수 없는 객체이므로 여러 전략 인스턴스가 같은 설정을 공유할 수 있다.
+    
+    Attributes:
+        sideways_lookback (int): 횡보 구간 감지 기간
+        sideways_threshold (float): 횡보 구간 감지 임계값 (파라미터 조정이 없는 캔들에서 사용)
+        breakout_lookback (int): 돌파 감지 기간 (파라미터 조정이 없는 캔들에서 사용)
+        adjustment_period (int): 파라미터 조정 주기 (캔들 수)
+    """
+    sideways_lookback: int = 5
+    sideways_threshold: float = 0.1
+    breakout_lookback: int = 3
+    adjustment_period: int = 20
 
 class TrendFollowingStrategy:
-    def __init__(self, initial_capital=10000, risk_percentage=0.01, leverage=3):
+    # backtest(profile=True)에서 실행 시간을 측정하는 메서드
+    PROFILED_STAGES = (
+        'adjust_parameters_based_on_market', 'check_stop_loss', 'check_take_profit',
+        'detect_sideways', 'identify_range_breakout', 'update_equity',
+        'compute_indicators', 'precompute_regime', 'precompute_signals', 'calculate_results'
+    )
+    
+    def __init__(self, initial_capital=10000, risk_percentage=0.01, leverage=3, config=None):
         """
         비트코인 선물시장 트렌드 팔로잉 전략 구현
         
@@ -17,7 +44,11 @@ class TrendFollowingStrategy:
             initial_capital (float): 초기 자본금 (USDT)
             risk_percentage (float): 거래당 허용 리스크 비율 (0.01 = 1%)
             leverage (int): 사용할 레버리지 (최대 3배)
+            config (StrategyConfig): 진입 신호/파라미터 조정 설정 (None이면 기본값)
         """
+        config = config or StrategyConfig()
+        self.config = config
+        
         self.initial_capital = initial_capital
         self.capital = initial_capital
         self.risk_percentage = risk_percentage
@@ -36,12 +67,11 @@ class TrendFollowingStrategy:
         self.last_candle_was_up = False  # 직전 캔들 상승 여부
         self.sl_triggered = False  # 1차 손절 발생 여부
         
-        # 거래 기록
-        self.trades = []
+        # 거래 기록 (구조화 배열, DataFrame은 calculate_results에서 생성)
+        self.trades = TradeLog()
         
-        # 백테스팅 결과 저장
-        self.equity_curve = []
-        self.drawdowns = []
+        # 백테스팅 결과 저장 (캔들별 자본금/Drawdown 배열)
+        self.equity_curve = EquityRecorder()
         self.current_drawdown = 0
         self.max_drawdown = 0
         self.peak_capital = initial_capital
@@ -49,7 +79,15 @@ class TrendFollowingStrategy:
         # 동적 파라미터 조정을 위한 변수
         self.market_volatility = 0
         self.last_adjustment_time = None
-        self.adjustment_period = 20  # 파라미터 조정 주기 (캔들 수)
+        self.adjustment_period = config.adjustment_period  # 파라미터 조정 주기 (캔들 수)
+        
+        # 진입 신호 파라미터 (파라미터 조정이 없는 캔들에서 사용하는 기본값)
+        self.sideways_lookback = config.sideways_lookback    # 횡보 구간 감지 기간
+        self.sideways_threshold = config.sideways_threshold  # 횡보 구간 감지 임계값
+        self.breakout_lookback = config.breakout_lookback    # 돌파 감지 기간
+        
+        # 단계별 실행 시간 측정기 (backtest(profile=True) 실행 중에만 설정)
+        self._profiler = None
         
     def calculate_ema(self, data, period):
         """지수이동평균(EMA) 계산"""
@@ -66,6 +104,22 @@ class TrendFollowingStrategy:
         
         return true_range.rolling(period).mean()
     
+    def compute_indicators(self, data, ema_periods=(10, 20, 50), atr_period=14):
+        """
+        백테스트에 사용하는 지표 계산
+        
+        Args:
+            data (pandas.DataFrame): OHLCV 데이터
+            ema_periods (tuple): EMA 기간 목록 (컬럼명: ema{기간})
+            atr_period (int): ATR 기간
+            
+        Returns:
+            pandas.DataFrame: data와 같은 인덱스의 ema10, ema20, ema50, atr 컬럼
+        """
+        indicators = pd.DataFrame({f'ema{period}': self.calculate_ema(data, period) for period in ema_periods}, index=data.index)
+        indicators['atr'] = self.calculate_atr(data, atr_period)  # 변동성 측정용
+        return indicators
+    
     def adjust_parameters_based_on_market(self, data, current_idx):
         """
         시장 상황에 따라 파라미터 동적 조정
@@ -88,24 +142,9 @@ class TrendFollowingStrategy:
                 self.market_volatility = atr.iloc[-1] / recent_data['close'].iloc[-1]
             
             # 변동성에 따라 파라미터 조정
-            sideways_threshold = 0.02  # 기본값
-            breakout_lookback = 10     # 기본값
-            
-            # 변동성이 높을 때 (빠르게 대응)
-            if self.market_volatility > 0.03:
-                sideways_threshold = 0.08  # 횡보 감지 임계값 증가
-                breakout_lookback = 3      # 더 짧은 기간으로 돌파 감지
-                risk_percentage = min(0.015, self.risk_percentage * 1.2)  # 리스크 소폭 증가
-            # 변동성이 중간일 때
-            elif self.market_volatility > 0.015:
-                sideways_threshold = 0.05
-                breakout_lookback = 5
-                risk_percentage = self.risk_percentage  # 기본 리스크 유지
-            # 변동성이 낮을 때 (보수적으로 대응)
-            else:
-                sideways_threshold = 0.03
-                breakout_lookback = 8
-                risk_percentage = max(0.007, self.risk_percentage * 0.8)  # 리스크 감소
+            sideways_threshold, breakout_lookback, risk_percentage = self._volatility_regime(
+                self.market_volatility, self.risk_percentage
+            )
             
             return {
                 'sideways_threshold': sideways_threshold,
@@ -115,6 +154,110 @@ class TrendFollowingStrategy:
         
         return None
     
+    def _volatility_regime(self, market_volatility, risk_percentage):
+        """
+        변동성 수준에 따른 파라미터 결정
+        
+        Args:
+            market_volatility (float): 시장 변동성 (ATR / 종가)
+            risk_percentage (float): 현재 거래당 리스크 비율
+            
+        Returns:
+            tuple: (sideways_threshold, breakout_lookback, risk_percentage)
+        """
+        # 변동성이 높을 때 (빠르게 대응)
+        if market_volatility > 0.03:
+            # 횡보 감지 임계값 증가, 더 짧은 기간으로 돌파 감지, 리스크 소폭 증가
+            return 0.08, 3, min(0.015, risk_percentage * 1.2)
+        # 변동성이 중간일 때
+        elif market_volatility > 0.015:
+            # 기본 리스크 유지
+            return 0.05, 5, risk_percentage
+        # 변동성이 낮을 때 (보수적으로 대응)
+        else:
+            # 리스크 감소
+            return 0.03, 8, max(0.007, risk_percentage * 0.8)
+    
+    def precompute_regime(self, data, start=50, indicators=None, offset=0):
+        """
+        변동성 구간 스케줄 사전 계산
+        
+        backtest 루프가 start번째 캔들부터 매 캔들 adjust_parameters_based_on_market을 
+        호출했을 때와 같은 조정 주기로 캔들별 파라미터 배열을 만든다. 변동성은 전체 
+        시계열의 ATR로 한 번만 계산하며, 전략 상태(risk_percentage 등)는 변경하지 않는다.
+        
+        Args:
+            data (pandas.DataFrame): OHLCV 데이터 (atr 컬럼이 있으면 재사용)
+            start (int): 첫 캔들 인덱스
+            indicators (pandas.DataFrame): atr 컬럼을 가진 지표 데이터 (None이면 data에서 찾음)
+            offset (int): data 첫 캔들의 전체 시계열 기준 인덱스 (스트리밍 백테스팅용, 
+                last_adjustment_time은 전체 시계열 기준 인덱스로 해석)
+            
+        Returns:
+            dict: 캔들별 파라미터 배열
+                - adjustment_bar: 파라미터 조정이 일어나는 캔들 여부
+                - market_volatility: 해당 캔들 시점의 시장 변동성
+                - sideways_threshold: 횡보 구간 감지 임계값
+                - breakout_lookback: 돌파 감지 기간
+                - risk_percentage: 거래당 리스크 비율
+        """
+        n = len(data)
+        close = data['close'].to_numpy(dtype=np.float64)
+        if indicators is None:
+            indicators = data
+        atr = indicators['atr'] if 'atr' in indicators.columns else self.calculate_atr(data)
+        volatility = atr.to_numpy(dtype=np.float64) / close
+        
+        # 조정이 없는 캔들은 기본 파라미터 사용
+        sideways_threshold = np.full(n, self.sideways_threshold, dtype=np.float64)
+        breakout_lookback = np.full(n, self.breakout_lookback, dtype=np.int64)
+        
+        # 조정 주기: adjust_parameters_based_on_market과 동일
+        if self.last_adjustment_time is None:
+            first = start
+        else:
+            first = max(start, self.last_adjustment_time + self.adjustment_period - offset)
+        adjustment_indices = np.arange(first, n, self.adjustment_period)
+        
+        adjusted_volatility = np.empty(len(adjustment_indices), dtype=np.float64)
+        adjusted_risk = np.empty(len(adjustment_indices), dtype=np.float64)
+        current_volatility = self.market_volatility
+        current_risk = self.risk_percentage
+        for k, idx in enumerate(adjustment_indices.tolist()):
+            if min(idx + offset, 30) + 1 > 14:  # ATR 계산에 필요한 최소 데이터
+                current_volatility = volatility[idx]
+                
+                # 구간 경계에 걸친 값은 반올림 오차로 구간이 바뀌지 않도록 원래 방식으로 다시 계산
+                lower = self._volatility_regime(current_volatility * (1 - 1e-9), current_risk)
+                upper = self._volatility_regime(current_volatility * (1 + 1e-9), current_risk)
+                if lower[:2] != upper[:2]:
+                    recent_data = data.iloc[max(0, idx-30):idx+1]
+                    current_volatility = self.calculate_atr(recent_data).iloc[-1] / recent_data['close'].iloc[-1]
+            
+            sideways_threshold[idx], breakout_lookback[idx], current_risk = self._volatility_regime(
+                current_volatility, current_risk
+            )
+            adjusted_volatility[k] = current_volatility
+            adjusted_risk[k] = current_risk
+        
+        # 마지막 조정 값을 다음 조정 전까지 유지
+        adjustment_bar = np.zeros(n, dtype=bool)
+        adjustment_bar[adjustment_indices] = True
+        last_adjustment = np.cumsum(adjustment_bar) - 1
+        adjusted = last_adjustment >= 0
+        market_volatility = np.full(n, self.market_volatility, dtype=np.float64)
+        market_volatility[adjusted] = adjusted_volatility[last_adjustment[adjusted]]
+        risk_percentage = np.full(n, self.risk_percentage, dtype=np.float64)
+        risk_percentage[adjusted] = adjusted_risk[last_adjustment[adjusted]]
+        
+        return {
+            'adjustment_bar': adjustment_bar,
+            'market_volatility': market_volatility,
+            'sideways_threshold': sideways_threshold,
+            'breakout_lookback': breakout_lookback,
+            'risk_percentage': risk_percentage
+        }
+    
     def detect_sideways(self, data, lookback=5, threshold=0.02):
         """
         횡보 구간 식별
@@ -225,6 +368,83 @@ class TrendFollowingStrategy:
         
         return False
     
+    def precompute_signals(self, data, sideways_lookback=5, sideways_thresholds=(0.1,), breakout_lookbacks=(3,), indicators=None):
+        """
+        진입 신호 사전 계산 (전체 시계열 벡터화)
+        
+        캔들 i의 값은 backtest 루프가 i번째 캔들에서 호출하는 check_ema_alignment, 
+        check_adjustment, detect_sideways, identify_range_breakout의 결과와 같다. 
+        횡보/돌파 구간의 고가·저가는 롤링 최대/최소로 한 번에 계산한다.
+        
+        Args:
+            data (pandas.DataFrame): 지표(ema10, ema20, ema50)가 계산된 OHLCV 데이터
+            sideways_lookback (int): 횡보 구간 감지 기간
+            sideways_thresholds (iterable): 횡보 마스크를 만들 임계값 목록
+            breakout_lookbacks (iterable): 돌파 배열을 만들 돌파 감지 기간 목록
+            indicators (pandas.DataFrame): ema10, ema20, ema50 컬럼을 가진 지표 데이터 (None이면 data에서 찾음)
+            
+        Returns:
+            dict: 신호 배열
+                - ema_alignment: EMA 정배열(1)/역배열(-1)/불명확(0)
+                - adjustment_long, adjustment_short: 상승/하락 트렌드 조정 구간 여부
+                - sideways_range: 직전 sideways_lookback개 캔들의 (고가-저가)/저가
+                - sideways: {임계값: 횡보 구간 여부}
+                - breakout: {돌파 기간: 1 (상방 돌파), -1 (하방 돌파), 0 (돌파 없음)}
+                - range_high, range_low: {돌파 기간: 직전 돌파 기간+1개 캔들의 고가/저가 (2차 손절가)}
+        """
+        if indicators is None:
+            indicators = data
+        
+        high = data['high']
+        low = data['low']
+        close = data['close'].to_numpy(dtype=np.float64)
+        ema10 = indicators['ema10'].to_numpy(dtype=np.float64)
+        ema20 = indicators['ema20'].to_numpy(dtype=np.float64)
+        ema50 = indicators['ema50'].to_numpy(dtype=np.float64)
+        
+        # check_ema_alignment와 같은 순서로 조건 평가
+        ema_alignment = np.select(
+            [(ema10 > ema20) & (ema20 > ema50), (ema10 < ema20) & (ema20 < ema50), ema10 > ema20, ema10 < ema20],
+            [1, -1, 1, -1],
+            default=0
+        ).astype(np.int8)
+        
+        # check_adjustment: 10일 또는 20일 EMA 이탈 여부
+        adjustment_long = (close < ema10) | (close < ema20)
+        adjustment_short = (close > ema10) | (close > ema20)
+        
+        # detect_sideways: 현재 캔들 직전 lookback개 캔들의 고가-저가 범위
+        highest = high.rolling(sideways_lookback).max().shift(1).to_numpy(dtype=np.float64)
+        lowest = low.rolling(sideways_lookback).min().shift(1).to_numpy(dtype=np.float64)
+        sideways_range = (highest - lowest) / lowest
+        sideways = {threshold: sideways_range < threshold for threshold in sideways_thresholds}
+        
+        breakout = {}
+        range_high = {}
+        range_low = {}
+        for lookback in breakout_lookbacks:
+            # identify_range_breakout: 현재 캔들 직전 lookback개 캔들의 범위를 종가가 벗어났는지 확인
+            breakout_high = high.rolling(lookback).max().shift(1).to_numpy(dtype=np.float64)
+            breakout_low = low.rolling(lookback).min().shift(1).to_numpy(dtype=np.float64)
+            signal = np.where(close > breakout_high, 1, np.where(close < breakout_low, -1, 0)).astype(np.int8)
+            signal[:lookback + 1] = 0  # 데이터가 lookback + 2개 미만이면 돌파 없음
+            breakout[lookback] = signal
+            
+            # 2차 손절가: 돌파 캔들 직전 lookback+1개 캔들의 고가/저가
+            range_high[lookback] = high.rolling(lookback + 1, min_periods=1).max().shift(1).to_numpy(dtype=np.float64)
+            range_low[lookback] = low.rolling(lookback + 1, min_periods=1).min().shift(1).to_numpy(dtype=np.float64)
+        
+        return {
+            'ema_alignment': ema_alignment,
+            'adjustment_long': adjustment_long,
+            'adjustment_short': adjustment_short,
+            'sideways_range': sideways_range,
+            'sideways': sideways,
+            'breakout': breakout,
+            'range_high': range_high,
+            'range_low': range_low
+        }
+    
     def calculate_position_size(self, entry_price, stop_loss_price):
         """
         포지션 사이즈 계산 (리스크 기반)
@@ -277,14 +497,7 @@ class TrendFollowingStrategy:
             self.max_drawdown = max(self.max_drawdown, self.current_drawdown)
         
         # 자본금 곡선에 기록
-        self.equity_curve.append({
-            'timestamp': timestamp,
-            'equity': current_equity,
-            'drawdown': self.current_drawdown
-        })
-        
-        # Drawdown 기록
-        self.drawdowns.append(self.current_drawdown)
+        self.equity_curve.append(timestamp, current_equity, self.current_drawdown)
     
     def enter_position(self, direction, price, timestamp, stop_loss_price, secondary_stop_loss=None):
         """
@@ -318,15 +531,7 @@ class TrendFollowingStrategy:
         self.sl_triggered = False
         
         # 거래 기록 추가
-        self.trades.append({
-            'type': 'entry',
-            'direction': 'long' if direction == 1 else 'short',
-            'price': price,
-            'size': size,
-            'timestamp': timestamp,
-            'stop_loss': stop_loss_price,
-            'secondary_stop_loss': secondary_stop_loss
-        })
+        self.trades.add_entry(direction, price, size, timestamp, stop_loss_price, secondary_stop_loss)
     
     def exit_position(self, price, timestamp, reason="", partial_pct=1.0):
         """
@@ -354,15 +559,7 @@ class TrendFollowingStrategy:
         self.capital += pnl
         
         # 거래 기록 추가
-        self.trades.append({
-            'type': 'exit',
-            'price': price,
-            'pnl': pnl,
-            'size': actual_exit_size,
-            'exit_pct': exit_pct,
-            'timestamp': timestamp,
-            'reason': reason
-        })
+        self.trades.add_exit(price, pnl, actual_exit_size, exit_pct, timestamp, reason)
         
         # 남은 포지션 비율 업데이트
         self.remaining_position_pct -= exit_pct
@@ -483,23 +680,49 @@ class TrendFollowingStrategy:
         
         return False
     
-    def backtest(self, data):
+    def backtest(self, data, engine='pandas', indicators=None, cache=None, profile=False):
         """
         백테스팅 실행
         
         Args:
             data (pandas.DataFrame): OHLCV 데이터 (timestamp, open, high, low, close, volume)
+            engine (str): 백테스팅 엔진
+                - 'pandas': DataFrame 행 단위 순회
+                - 'array': NumPy 배열 커널
+                - 'sparse': 배열 커널 + 포지션이 없고 진입 후보가 아닌 캔들 건너뛰기
+            indicators (pandas.DataFrame): 미리 계산한 지표 (compute_indicators() 형식, None이면 계산). 
+                data와 indicators는 읽기만 하므로 여러 백테스트가 복사 없이 같은 입력을 공유할 수 있다.
+            cache (BacktestResultCache): 결과 캐시 (같은 데이터/파라미터/코드 버전이면 저장된 결과 반환)
+            profile (bool): 단계별 실행 시간 측정 여부. True면 결과에 'profile' 항목이 추가되고 캐시는 사용하지 않는다.
             
         Returns:
             dict: 백테스팅 결과
         """
-        # EMA 계산
-        data['ema10'] = self.calculate_ema(data, 10)
-        data['ema20'] = self.calculate_ema(data, 20)
-        data['ema50'] = self.calculate_ema(data, 50)
+        if engine not in ('pandas', 'array', 'sparse'):
+            raise ValueError(f"지원하지 않는 백테스팅 엔진입니다: {engine}")
+        
+        if profile:
+            return self._backtest_profiled(data, engine, indicators)
+        
+        if cache is not None:
+            return cache.run(self, data, engine=engine, indicators=indicators)
+        
+        if indicators is None:
+            # EMA, ATR 계산 (data와 별도의 DataFrame)
+            indicators = self.compute_indicators(data)
+        
+        if engine in ('array', 'sparse'):
+            return self._backtest_array(data, indicators, sparse=(engine == 'sparse'))
         
-        # ATR 계산 (변동성 측정용)
-        data['atr'] = self.calculate_atr(data)
+        # EMA 값은 캔들 위치로 지표 배열에서 읽음
+        ema10_values = indicators['ema10'].to_numpy(dtype=np.float64)
+        ema20_values = indicators['ema20'].to_numpy(dtype=np.float64)
+        ema50_values = indicators['ema50'].to_numpy(dtype=np.float64)
+        
+        # 자본금 곡선 배열 미리 할당
+        self.equity_curve.reserve(max(0, len(data) - 50))
+        
+        profiler = self._profiler
         
         # 처음 50일은 스킵 (EMA 안정화)
         for i in range(50, len(data)):
@@ -517,13 +740,13 @@ class TrendFollowingStrategy:
                 breakout_lookback = adjusted_params['breakout_lookback']
                 self.risk_percentage = adjusted_params['risk_percentage']
             else:
-                sideways_threshold = 0.1  # 기본값 더 완화
-                breakout_lookback = 3     # 기본값 더 완화
+                sideways_threshold = self.sideways_threshold  # 기본값 더 완화
+                breakout_lookback = self.breakout_lookback    # 기본값 더 완화
             
             # EMA 값
-            ema10 = row['ema10']
-            ema20 = row['ema20']
-            ema50 = row['ema50']
+            ema10 = ema10_values[i]
+            ema20 = ema20_values[i]
+            ema50 = ema50_values[i]
             
             # 손절 확인
             if self.check_stop_loss(current_price, timestamp):
@@ -538,6 +761,9 @@ class TrendFollowingStrategy:
             
             # 포지션이 없는 경우 진입 조건 확인
             if self.position == 0:
+                if profiler is not None:
+                    entry_start = time.perf_counter()
+                
                 # 돌파 확인
                 range_data = data.iloc[max(0, i-breakout_lookback-1):i]
                 breakout = self.identify_range_breakout(data.iloc[max(0, i-breakout_lookback-1):i+1], lookback=breakout_lookback)
@@ -545,7 +771,7 @@ class TrendFollowingStrategy:
                 # 롱 포지션 진입 조건 (원본 전략 적용)
                 if (ema_alignment == 1 and  # 10일, 20일, 50일 EMA 정배열
                     self.check_adjustment(current_price, ema10, ema20, ema50, 1) and  # 조정 구간 확인 (10일 또는 20일 EMA 이탈)
-                    self.detect_sideways(data.iloc[max(0, i-10):i], lookback=5, threshold=sideways_threshold) and  # 횡보 구간 확인
+                    self.detect_sideways(data.iloc[max(0, i-max(10, self.sideways_lookback)):i], lookback=self.sideways_lookback, threshold=sideways_threshold) and  # 횡보 구간 확인
                     breakout == 1):  # 횡보 구간 상단 돌파
                     
                     # 1차 손절가 설정 (돌파 캔들의 저점)
@@ -561,7 +787,7 @@ class TrendFollowingStrategy:
                 # 숏 포지션 진입 조건 (원본 전략 적용)
                 elif (ema_alignment == -1 and  # 10일, 20일, 50일 EMA 역배열
                      self.check_adjustment(current_price, ema10, ema20, ema50, -1) and  # 조정 구간 확인 (10일 또는 20일 EMA 상향 돌파)
-                     self.detect_sideways(data.iloc[max(0, i-10):i], lookback=5, threshold=sideways_threshold) and  # 횡보 구간 확인
+                     self.detect_sideways(data.iloc[max(0, i-max(10, self.sideways_lookback)):i], lookback=self.sideways_lookback, threshold=sideways_threshold) and  # 횡보 구간 확인
                      breakout == -1):  # 횡보 구간 하단 돌파
                     
                     # 1차 손절가 설정 (돌파 캔들의 고점)
@@ -573,6 +799,9 @@ class TrendFollowingStrategy:
                     
                     # 진입
                     self.enter_position(-1, current_price, timestamp, stop_loss_price, secondary_stop_loss)
+                
+                if profiler is not None:
+                    profiler.add('entry_evaluation', time.perf_counter() - entry_start)
             
             # 자본금 업데이트
             self.update_equity(current_price, timestamp)
@@ -580,6 +809,347 @@ class TrendFollowingStrategy:
         # 백테스팅 결과 계산
         return self.calculate_results()
     
+    def backtest_stream(self, chunks, sink=None, engine='sparse', warmup=None):
+        """
+        청크 단위 스트리밍 백테스팅
+        
+        전체 시계열을 한 번에 메모리에 올리지 않고 시간순 OHLCV 청크를 하나씩 처리한다. 
+        청크 경계에서는 직전 warmup개 캔들을 앞에 이어 붙여 신호/변동성 계산에 사용하고, 
+        EMA는 직전 값에서 이어서 계산하며, 포지션과 파라미터 조정 상태는 전략 객체에 그대로 유지된다. 
+        청크마다 새로 기록된 자본금 곡선과 거래 기록을 sink로 내보낸 뒤 자본금 곡선 배열을 비우므로 
+        메모리 사용량은 청크 크기에 비례한다 (요약 지표 계산을 위해 거래 기록만 유지).
+        
+        Args:
+            chunks (iterable): timestamp 인덱스의 OHLCV DataFrame 청크 (시간순)
+            sink: write_equity(frame), write_trades(frame) 메서드를 가진 출력 대상 
+                (backtest_records.CSVSink, MemorySink 등, None이면 버림)
+            engine (str): 백테스팅 엔진 ('array' 또는 'sparse')
+            warmup (int): 청크 앞에 이어 붙일 직전 캔들 수 (None이면 필요한 최소값)
+            
+        Returns:
+            dict: 백테스팅 결과 (자본금 곡선은 sink로 출력되어 equity_curve는 비어 있음, 
+                'bars'는 처리한 캔들 수)
+        """
+        if engine not in ('array', 'sparse'):
+            raise ValueError(f"스트리밍 백테스팅은 array/sparse 엔진만 지원합니다: {engine}")
+        
+        if warmup is None:
+            # 변동성 계산(31개), 횡보/돌파 구간, 직전 캔들 참조에 필요한 캔들 수
+            warmup = max(64, self.sideways_lookback + 2, self.breakout_lookback + 3)
+        
+        tail = None             # 직전 청크의 마지막 warmup개 캔들
+        tail_indicators = None  # tail의 지표
+        offset = 0              # 현재 처리 구간 첫 캔들의 전체 시계열 기준 인덱스
+        bars = 0
+        emitted_trades = len(self.trades)
+        
+        for chunk in chunks:
+            if tail is not None:
+                # 이미 처리한 캔들과 겹치는 부분 제외
+                chunk = chunk[chunk.index > tail.index[-1]]
+            if len(chunk) == 0:
+                continue
+            
+            if tail is None:
+                window = chunk
+                indicators = self.compute_indicators(chunk)
+            else:
+                window = pd.concat([tail, chunk])
+                indicators = self._continue_indicators(window, tail_indicators, len(tail))
+            
+            # 처음 50일은 스킵 (EMA 안정화)
+            start = max(len(window) - len(chunk), 50 - offset)
+            self._run_array_kernel(window, indicators, sparse=(engine == 'sparse'), start=start, offset=offset)
+            bars += len(chunk)
+            
+            # 새로 기록된 결과 출력
+            if sink is not None:
+                if len(self.equity_curve) > 0:
+                    sink.write_equity(self.equity_curve.to_frame())
+                if len(self.trades) > emitted_trades:
+                    sink.write_trades(self.trades.to_frame(start=emitted_trades))
+            emitted_trades = len(self.trades)
+            self.equity_curve.clear()
+            
+            # 다음 청크에 이어 붙일 캔들
+            keep = min(warmup, len(window))
+            offset += len(window) - keep
+            tail = window.iloc[-keep:]
+            tail_indicators = indicators.iloc[-keep:]
+        
+        if sink is not None:
+            sink.close()
+        
+        results = self.calculate_results()
+        results['bars'] = bars
+        return results
+    
+    def _continue_indicators(self, window, tail_indicators, n_tail):
+        """
+        직전 청크 지표에 이어서 새 캔들의 지표 계산
+        
+        EMA는 마지막 EMA 값을 시작값으로 이어서 계산하므로 전체 시계열로 계산한 값과 같고, 
+        ATR은 앞에 붙은 직전 캔들을 포함해 다시 계산한다.
+        
+        Args:
+            window (pandas.DataFrame): 직전 캔들(n_tail개) + 새 청크
+            tail_indicators (pandas.DataFrame): 직전 캔들의 지표
+            n_tail (int): 직전 캔들 수
+            
+        Returns:
+            pandas.DataFrame: window와 같은 인덱스의 지표 (compute_indicators() 형식)
+        """
+        new_close = window['close'].to_numpy(dtype=np.float64)[n_tail:]
+        columns = {}
+        for period in (10, 20, 50):
+            name = f'ema{period}'
+            previous = tail_indicators[name].to_numpy(dtype=np.float64)
+            seeded = pd.DataFrame({'close': np.r_[previous[-1], new_close]})
+            columns[name] = np.r_[previous, self.calculate_ema(seeded, period).to_numpy(dtype=np.float64)[1:]]
+        
+        atr = self.calculate_atr(window).to_numpy(dtype=np.float64)
+        columns['atr'] = np.r_[tail_indicators['atr'].to_numpy(dtype=np.float64), atr[n_tail:]]
+        
+        return pd.DataFrame(columns, index=window.index)
+    
+    def _backtest_array(self, data, indicators, sparse=False):
+        """
+        NumPy 배열 기반 백테스팅 (_run_array_kernel 실행 후 결과 계산)
+        
+        Args:
+            data (pandas.DataFrame): OHLCV 데이터
+            indicators (pandas.DataFrame): data와 정렬된 지표 (ema10, ema20, ema50, atr)
+            sparse (bool): 진입 후보가 아닌 무포지션 캔들 건너뛰기 여부
+            
+        Returns:
+            dict: 백테스팅 결과
+        """
+        self._run_array_kernel(data, indicators, sparse=sparse)
+        return self.calculate_results()
+    
+    def _run_array_kernel(self, data, indicators, sparse=False, start=50, offset=0):
+        """
+        NumPy 배열 기반 백테스팅 커널
+        
+        backtest()와 동일한 손절/익절/진입 상태 머신을 실행하지만, 캔들마다 
+        data.iloc으로 Series를 만들거나 DataFrame을 다시 슬라이싱하지 않고 
+        한 번 추출한 연속 배열의 float 값과 precompute_signals(), precompute_regime()의 
+        배열만 참조한다.
+        
+        sparse 모드에서는 포지션이 없는 동안 다음 진입 후보 캔들로 바로 이동하고, 
+        건너뛴 구간의 자본금 곡선은 한 번에 기록한다.
+        
+        start 이전 캔들은 지표/신호 계산에만 쓰이고 거래는 start번째 캔들부터 실행한다. 
+        스트리밍 백테스팅에서는 data가 전체 시계열의 일부이며 offset은 data 첫 캔들의 
+        전체 시계열 기준 인덱스이다.
+        
+        Args:
+            data (pandas.DataFrame): OHLCV 데이터
+            indicators (pandas.DataFrame): data와 정렬된 지표 (ema10, ema20, ema50, atr)
+            sparse (bool): 진입 후보가 아닌 무포지션 캔들 건너뛰기 여부
+            start (int): 거래를 시작할 data 내 인덱스
+            offset (int): data 첫 캔들의 전체 시계열 기준 인덱스
+        """
+        # 필요한 컬럼을 연속 배열로 한 번만 추출
+        arrays = {
+            column: np.ascontiguousarray(data[column].to_numpy(dtype=np.float64))
+            for column in ('open', 'high', 'low', 'close')
+        }
+        arrays.update({
+            column: np.ascontiguousarray(indicators[column].to_numpy(dtype=np.float64))
+            for column in ('ema10', 'ema20', 'atr')
+        })
+        
+        # 캔들별 파라미터 스케줄과 스케줄에 등장하는 값에 대한 신호 배열
+        regime = self.precompute_regime(data, start=start, indicators=indicators, offset=offset)
+        signals = self.precompute_signals(
+            data,
+            sideways_lookback=self.sideways_lookback,
+            sideways_thresholds=np.unique(regime['sideways_threshold']).tolist(),
+            breakout_lookbacks=np.unique(regime['breakout_lookback']).tolist(),
+            indicators=indicators
+        )
+        entry_signals = self._select_entry_signals(signals, regime)
+        
+        # 루프에서는 NumPy 스칼라 대신 파이썬 값 사용
+        high = arrays['high'].tolist()
+        low = arrays['low'].tolist()
+        close = arrays['close'].tolist()
+        ema10_values = arrays['ema10'].tolist()
+        ema20_values = arrays['ema20'].tolist()
+        ema_alignment = signals['ema_alignment'].tolist()
+        adjustment_long = signals['adjustment_long'].tolist()
+        adjustment_short = signals['adjustment_short'].tolist()
+        sideways = entry_signals['sideways'].tolist()
+        breakout_signal = entry_signals['breakout'].tolist()
+        range_high = entry_signals['range_high'].tolist()
+        range_low = entry_signals['range_low'].tolist()
+        risk_percentage = regime['risk_percentage'].tolist()
+        entry_candidate = entry_signals['entry_candidate'].tolist()
+        candidate_indices = np.flatnonzero(entry_signals['entry_candidate'])
+        
+        # 타임스탬프는 기록기에 그대로 저장되는 int64 나노초로 사용
+        if isinstance(data.index, pd.DatetimeIndex):
+            timestamp_ns, unit = index_nanoseconds(data.index)
+            timestamps = timestamp_ns.tolist()
+            self.equity_curve.unit = self.equity_curve.unit or unit
+            self.trades.unit = self.trades.unit or unit
+        else:
+            timestamps = [ts if isinstance(ts, datetime) else datetime.fromtimestamp(ts / 1000) for ts in data.index]
+            timestamp_ns = None
+        
+        n = len(close)
+        self.equity_curve.reserve(max(0, n - start))
+        profiler = self._profiler
+        next_bar = start  # 처음 50일은 스킵 (EMA 안정화)
+        while next_bar < n:
+            i = next_bar
+            next_bar += 1
+            
+            # 포지션이 없고 진입 후보도 아니면 다음 진입 후보 캔들까지 건너뛰기
+            if sparse and self.position == 0 and not entry_candidate[i]:
+                k = np.searchsorted(candidate_indices, i)
+                skip_to = int(candidate_indices[k]) if k < len(candidate_indices) else n
+                self._fill_flat_equity(timestamps, timestamp_ns, close, i, skip_to)
+                next_bar = skip_to
+                continue
+            
+            timestamp = timestamps[i]
+            current_price = close[i]
+            prev_price = close[i-1]
+            
+            # 손절 확인
+            if self.check_stop_loss(current_price, timestamp):
+                continue
+            
+            # 익절 확인
+            if self.check_take_profit(current_price, timestamp, ema10_values[i], ema20_values[i], prev_price):
+                continue
+            
+            if self.position == 0:
+                if profiler is not None:
+                    entry_start = time.perf_counter()
+                
+                breakout = breakout_signal[i]
+                
+                # 롱 진입: 정배열 + 조정 구간 + 횡보 구간 + 상단 돌파
+                if breakout == 1 and ema_alignment[i] == 1 and adjustment_long[i] and sideways[i]:
+                    # 1차 손절가: 돌파 캔들의 저점, 2차 손절가: 횡보 구간의 하단
+                    self.risk_percentage = risk_percentage[i]
+                    stop_loss_price = min(low[i], low[i-1])
+                    self.enter_position(1, current_price, timestamp, stop_loss_price, range_low[i])
+                
+                # 숏 진입: 역배열 + 조정 구간 + 횡보 구간 + 하단 돌파
+                elif breakout == -1 and ema_alignment[i] == -1 and adjustment_short[i] and sideways[i]:
+                    # 1차 손절가: 돌파 캔들의 고점, 2차 손절가: 횡보 구간의 상단
+                    self.risk_percentage = risk_percentage[i]
+                    stop_loss_price = max(high[i], high[i-1])
+                    self.enter_position(-1, current_price, timestamp, stop_loss_price, range_high[i])
+                
+                if profiler is not None:
+                    profiler.add('entry_evaluation', time.perf_counter() - entry_start)
+            
+            # 자본금 업데이트
+            self.update_equity(current_price, timestamp)
+        
+        # 매 캔들 adjust_parameters_based_on_market을 호출했을 때와 같은 최종 상태로 맞춤
+        adjustment_indices = np.flatnonzero(regime['adjustment_bar'])
+        if len(adjustment_indices) > 0:
+            self.last_adjustment_time = int(adjustment_indices[-1]) + offset
+            self.market_volatility = float(regime['market_volatility'][-1])
+            self.risk_percentage = risk_percentage[-1]
+    
+    def _backtest_profiled(self, data, engine, indicators):
+        """
+        단계별 실행 시간을 측정하며 백테스팅 실행
+        
+        PROFILED_STAGES의 메서드를 시간 측정 래퍼로 바꿔 끼운 상태로 backtest()를 실행하고, 
+        진입 조건 평가 구간은 엔진 루프에서 직접 기록한다. 
+        중첩 호출(진입 조건 평가 안의 detect_sideways 등)은 각 단계에 모두 포함된다.
+        
+        Returns:
+            dict: 백테스팅 결과 + 'profile' (engine, total_seconds, stages)
+        """
+        profiler = StageProfiler()
+        profiler.instrument(self, self.PROFILED_STAGES)
+        self._profiler = profiler
+        start = time.perf_counter()
+        try:
+            results = self.backtest(data, engine=engine, indicators=indicators)
+        finally:
+            total_seconds = time.perf_counter() - start
+            self._profiler = None
+            profiler.restore()
+        
+        results['profile'] = {
+            'engine': engine,
+            'total_seconds': total_seconds,
+            'stages': profiler.report(total_seconds)
+        }
+        return results
+    
+    def _select_entry_signals(self, signals, regime):
+        """
+        캔들별 파라미터 스케줄에 맞춰 진입 신호 배열 선택
+        
+        Args:
+            signals (dict): precompute_signals() 결과
+            regime (dict): precompute_regime() 결과
+            
+        Returns:
+            dict: 캔들별 횡보 여부, 돌파 신호, 2차 손절가 범위, 진입 후보 여부
+        """
+        sideways = signals['sideways_range'] < regime['sideways_threshold']
+        
+        n = len(sideways)
+        breakout = np.zeros(n, dtype=np.int8)
+        range_high = np.full(n, np.nan)
+        range_low = np.full(n, np.nan)
+        for lookback, signal in signals['breakout'].items():
+            selected = regime['breakout_lookback'] == lookback
+            breakout[selected] = signal[selected]
+            range_high[selected] = signals['range_high'][lookback][selected]
+            range_low[selected] = signals['range_low'][lookback][selected]
+        
+        entry_candidate = sideways & (
+            ((breakout == 1) & (signals['ema_alignment'] == 1) & signals['adjustment_long']) |
+            ((breakout == -1) & (signals['ema_alignment'] == -1) & signals['adjustment_short'])
+        )
+        
+        return {
+            'sideways': sideways,
+            'breakout': breakout,
+            'range_high': range_high,
+            'range_low': range_low,
+            'entry_candidate': entry_candidate
+        }
+    
+    def _fill_flat_equity(self, timestamps, timestamp_ns, close, start, stop):
+        """
+        포지션이 없는 구간 [start, stop)의 자본금 곡선을 한 번에 기록
+        
+        포지션이 없으면 자본금이 변하지 않으므로 첫 캔들만 update_equity로 
+        계산하고 나머지 캔들은 같은 값을 배열 구간에 한 번에 채운다.
+        
+        Args:
+            timestamps (list): 캔들별 타임스탬프
+            timestamp_ns (numpy.ndarray): 캔들별 int64 나노초 타임스탬프 (None이면 timestamps에서 변환)
+            close (list): 캔들별 종가
+            start (int): 구간 시작 인덱스
+            stop (int): 구간 끝 인덱스 (미포함)
+        """
+        if start >= stop:
+            return
+        
+        self.update_equity(close[start], timestamps[start])
+        equity = self.equity_curve.equity[len(self.equity_curve) - 1]
+        
+        if timestamp_ns is None:
+            skipped = np.array([to_nanoseconds(ts) for ts in timestamps[start + 1:stop]], dtype=np.int64)
+        else:
+            skipped = timestamp_ns[start + 1:stop]
+        self.equity_curve.fill(skipped, equity, self.current_drawdown)
+    
     def calculate_results(self):
         """
         백테스팅 결과 계산
@@ -587,7 +1157,7 @@ class TrendFollowingStrategy:
         Returns:
             dict: 백테스팅 결과
         """
-        if not self.trades:
+        if len(self.trades) == 0:
             return {
                 'total_return': 0,
                 'total_trades': 0,
@@ -595,202 +1165,96 @@ class TrendFollowingStrategy:
                 'profit_factor': 0,
                 'max_drawdown': 0,
                 'final_capital': self.capital,
-                'equity_curve': pd.DataFrame(self.equity_curve),
-                'trades': pd.DataFrame(self.trades)
+                'equity_curve': self.equity_curve.to_frame(),
+                'trades': self.trades.to_frame()
             }
         
-        # 거래 기록 DataFrame으로 변환
-        trades_df = pd.DataFrame(self.trades)
-        
-        # 각 거래의 entry와 exit 매칭
-        entry_trades = trades_df[trades_df['type'] == 'entry'].reset_index(drop=True)
-        exit_trades = trades_df[trades_df['type'] == 'exit'].reset_index(drop=True)
+        # 구조화 배열에서 entry와 exit 구분
+        records = self.trades.view()
+        n_entries = int(np.count_nonzero(records['type'] == 0))
+        exit_pnl = records['pnl'][records['type'] == 1]
         
         # 결과가 더 적은 쪽에 맞춤
-        min_trades = min(len(entry_trades), len(exit_trades))
-        entry_trades = entry_trades.iloc[:min_trades]
-        exit_trades = exit_trades.iloc[:min_trades]
+        exit_pnl = exit_pnl[:min(n_entries, len(exit_pnl))]
         
         # 승리/패배 거래 구분
-        wins = exit_trades[exit_trades['pnl'] > 0]
-        losses = exit_trades[exit_trades['pnl'] <= 0]
+        win_pnl = exit_pnl[exit_pnl > 0]
+        loss_pnl = exit_pnl[exit_pnl <= 0]
         
         # 승률 계산
-        win_rate = len(wins) / len(exit_trades) if len(exit_trades) > 0 else 0
+        win_rate = len(win_pnl) / len(exit_pnl) if len(exit_pnl) > 0 else 0
         
         # 손익비 계산
-        total_profit = wins['pnl'].sum() if not wins.empty else 0
-        total_loss = abs(losses['pnl'].sum()) if not losses.empty else 0
+        total_profit = win_pnl.sum() if len(win_pnl) > 0 else 0
+        total_loss = abs(loss_pnl.sum()) if len(loss_pnl) > 0 else 0
         profit_factor = total_profit / total_loss if total_loss > 0 else float('inf')
         
         # 총 수익률
         total_return = (self.capital - self.initial_capital) / self.initial_capital
         
-        # 자본금 곡선 DataFrame으로 변환
-        equity_curve_df = pd.DataFrame(self.equity_curve)
-        
         return {
             'total_return': total_return,
-            'total_trades': len(exit_trades),
+            'total_trades': len(exit_pnl),
             'win_rate': win_rate,
             'profit_factor': profit_factor,
             'max_drawdown': self.max_drawdown,
             'final_capital': self.capital,
-            'equity_curve': equity_curve_df,
-            'trades': trades_df
+            'equity_curve': self.equity_curve.to_frame(),
+            'trades': self.trades.to_frame()
         }
     
-    def plot_results(self, results):
+    def plot_results(self, results, output=None, max_points=2000):
         """
-        백테스팅 결과 시각화
+        백테스팅 결과 시각화 (matplotlib은 이 메서드를 처음 호출할 때 불러옴)
         
         Args:
             results (dict): 백테스팅 결과
+            output (str): 그래프 저장 경로 (.png, .svg 등, None이면 화면 표시 / 화면이 없으면 backtest_results.png)
+            max_points (int): 그래프에 그릴 최대 점 개수 (None이면 전체)
         """
-        if results['equity_curve'].empty:
-            print("결과가 없습니다.")
-            return
-        
-        # 한글 폰트 설정
-        plt.rcParams['font.family'] = 'AppleGothic'  # MacOS용 기본 한글 폰트
-        plt.rcParams['axes.unicode_minus'] = False   # 마이너스 기호 깨짐 방지
-        
-        # 플롯 설정
-        plt.figure(figsize=(15, 10))
-        
-        # 자본금 곡선
-        plt.subplot(2, 1, 1)
-        plt.plot(results['equity_curve']['timestamp'], results['equity_curve']['equity'])
-        plt.title('자본금 곡선', fontsize=16)
-        plt.xlabel('시간')
-        plt.ylabel('자본금 (USDT)')
-        plt.grid(True)
-        
-        # Drawdown 곡선
-        plt.subplot(2, 1, 2)
-        plt.fill_between(results['equity_curve']['timestamp'], results['equity_curve']['drawdown'] * 100)
-        plt.title('Drawdown', fontsize=16)
-        plt.xlabel('시간')
-        plt.ylabel('Drawdown (%)')
-        plt.grid(True)
-        
-        plt.tight_layout()
-        plt.show()
-        
-        # 결과 통계 출력
-        print(f"총 수익률: {results['total_return'] * 100:.2f}%")
-        print(f"총 거래 횟수: {results['total_trades']}")
-        print(f"승률: {results['win_rate'] * 100:.2f}%")
-        print(f"손익비: {results['profit_factor']:.2f}")
-        print(f"최대 낙폭: {results['max_drawdown'] * 100:.2f}%")
-        print(f"최종 자본금: {results['final_capital']:.2f} USDT")
+        from result_plot import plot_results
+        plot_results(results, output=output, max_points=max_points)
     
-    def fetch_data(self, exchange_id='binance', symbol='BTC/USDT', timeframe='4h', since=None, until=None, limit=1000):
+    def fetch_data(self, exchange_id='binance', symbol='BTC/USDT', timeframe='4h', since=None, until=None, limit=1000,
+                   workers=4, max_requests=None):
         """
-        거래소에서 OHLCV 데이터 가져오기
+        거래소에서 OHLCV 데이터 가져오기 (ccxt는 이 메서드를 처음 호출할 때 불러옴)
         
         Args:
-            exchange_id (str): 거래소 ID (예: 'binance', 'bybit')
+            exchange_id (str): 거래소 ID (예: 'binance', 'bybit', 거래소 객체를 넘기면 그대로 사용)
             symbol (str): 심볼 (예: 'BTC/USDT')
             timeframe (str): 시간프레임 (예: '1h', '4h', '1d')
             since (int): 시작 타임스탬프 (밀리초)
             until (int): 종료 타임스탬프 (밀리초)
             limit (int): 각 요청당 가져올 캔들 개수
+            workers (int): 동시 요청 스레드 수
+            max_requests (int): 전체 요청 수 제한 (None이면 제한 없음)
             
         Returns:
             pandas.DataFrame: OHLCV 데이터
         """
-        # 거래소 인스턴스 생성
-        exchange_class = getattr(ccxt, exchange_id)
-        exchange = exchange_class({
-            'enableRateLimit': True,
-        })
-        
-        # 기본 시작 시간 설정 (없는 경우 현재 시간부터 limit*timeframe 이전)
-        if since is None:
-            timeframe_in_seconds = exchange.parse_timeframe(timeframe)
-            since = exchange.milliseconds() - (limit * timeframe_in_seconds * 1000)
-        
-        all_ohlcv = []
-        now = exchange.milliseconds() if until is None else until
-        
-        # API 제한을 고려해 여러 번 나눠서 데이터 가져오기
-        current_since = since
-        timeframe_in_seconds = exchange.parse_timeframe(timeframe)
-        
-        # 예상되는 총 캔들 수 계산
-        estimated_candles = (now - since) / (timeframe_in_seconds * 1000)
-        estimated_requests = min(30, max(5, int(estimated_candles / limit) + 1))  # 최소 5회, 최대 30회 요청
-        
-        print(f"지정된 기간: {datetime.fromtimestamp(since/1000)} ~ {datetime.fromtimestamp(now/1000)}")
-        print(f"예상 캔들 수: 약 {int(estimated_candles)}개")
-        print(f"요청 계획: 최대 {estimated_requests}회 API 요청 (각 요청당 최대 {limit}개 캔들)")
+        from market_data import fetch_ohlcv
+        return fetch_ohlcv(exchange_id, symbol, timeframe, since, until, limit, workers=workers, max_requests=max_requests)
+    
+    def fetch_data_chunks(self, exchange_id='binance', symbol='BTC/USDT', timeframe='4h', since=None, until=None, limit=1000,
+                          workers=4, max_requests=None, chunk_size=None):
+        """
+        거래소에서 OHLCV 데이터를 청크 단위로 가져오기 (backtest_stream()에 바로 전달 가능)
         
-        # 데이터를 여러 번 나눠서 가져오기 (최대 예상 요청 수 또는 현재 시간까지)
-        for i in range(estimated_requests):
-            if current_since >= now:
-                print(f"지정된 종료 시간에 도달했습니다. 데이터 수집 완료.")
-                break
-                
-            # 진행률 표시
-            progress = min(100, int((current_since - since) / (now - since) * 100)) if now > since else 0
-            print(f"데이터 요청 {i+1}/{estimated_requests} ({progress}% 진행): {datetime.fromtimestamp(current_since/1000).strftime('%Y-%m-%d %H:%M:%S')} 부터")
+        Args:
+            exchange_id (str): 거래소 ID (예: 'binance', 'bybit', 거래소 객체를 넘기면 그대로 사용)
+            symbol (str): 심볼 (예: 'BTC/USDT')
+            timeframe (str): 시간프레임 (예: '1h', '4h', '1d')
+            since (int): 시작 타임스탬프 (밀리초)
+            until (int): 종료 타임스탬프 (밀리초)
+            limit (int): 각 요청당 가져올 캔들 개수
+            workers (int): 동시 요청 스레드 수
+            max_requests (int): 전체 요청 수 제한 (None이면 제한 없음)
+            chunk_size (int): 청크당 최소 캔들 수 (None이면 요청 구간마다)
             
-            try:
-                # API 호출로 데이터 가져오기
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, current_since, limit)
-                
-                if len(ohlcv) == 0:
-                    print("더 이상 가져올 데이터가 없습니다.")
-                    break
-                
-                # 중복 제거를 위해 이미 가져온 타임스탬프 체크
-                if all_ohlcv and ohlcv[0][0] == all_ohlcv[-1][0]:
-                    ohlcv = ohlcv[1:]  # 첫 번째 캔들이 중복이면 제거
-                
-                all_ohlcv.extend(ohlcv)
-                print(f"  - {len(ohlcv)}개 캔들 추가 (누적: {len(all_ohlcv)}개)")
-                
-                # 다음 시작 시간 설정 (마지막 캔들 이후)
-                if ohlcv:
-                    current_since = ohlcv[-1][0] + timeframe_in_seconds * 1000
-                else:
-                    break
-                
-                # API 속도 제한 방지를 위한 대기
-                time.sleep(1.5)  # 좀 더 긴 대기 시간으로 조정
-                
-            except Exception as e:
-                print(f"데이터 가져오기 오류: {e}")
-                # 오류 발생 시 잠시 대기 후 재시도
-                time.sleep(5)
-                continue
-        
-        if not all_ohlcv:
-            raise Exception("데이터를 가져올 수 없습니다.")
-        
-        # DataFrame으로 변환
-        df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        df = df.drop_duplicates()  # 중복 제거
-        
-        # 지정된 기간으로 필터링
-        if since is not None:
-            since_dt = pd.to_datetime(since, unit='ms')
-            df = df[df.index >= since_dt]
-        
-        if until is not None:
-            until_dt = pd.to_datetime(until, unit='ms')
-            df = df[df.index <= until_dt]
-        
-        # 결과 요약
-        if not df.empty:
-            print(f"\n데이터 가져오기 완료:")
-            print(f"가져온 총 캔들 수: {len(df)}개")
-            print(f"기간: {df.index[0]} ~ {df.index[-1]}")
-            print(f"시간프레임: {timeframe}")
-        else:
-            print("가져온 데이터가 없습니다.")
-        
-        return df 
\ No newline at end of file
+        Returns:
+            market_data.OHLCVChunkStream: 시간순 OHLCV DataFrame 청크 반복자
+        """
+        from market_data import fetch_ohlcv_chunks
+        return fetch_ohlcv_chunks(exchange_id, symbol, timeframe, since, until, limit, workers=workers,
+                                  max_requests=max_requests, chunk_size=chunk_size)
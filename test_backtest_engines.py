@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import TrendFollowingStrategy
+
+# 거래가 발생하는 랜덤워크 시드 (롱/숏 진입, 1·2차 손절, 단계별 익절 포함)
+SEEDS = (5, 14, 23, 29)
+
+
+def random_walk(seed, n=1500, volatility=0.02, wick=0.2):
+    """4시간봉 랜덤워크 OHLCV 데이터"""
+    rng = np.random.default_rng(seed)
+    close = 20000.0 * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, wick * volatility, n)) * close
+    index = pd.date_range('2023-01-01', periods=n, freq='4h', name='timestamp')
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.uniform(1, 100, n)
+    }, index=index)
+
+
+def assert_same_results(expected, actual):
+    pd.testing.assert_frame_equal(expected['trades'], actual['trades'])
+    pd.testing.assert_frame_equal(expected['equity_curve'], actual['equity_curve'])
+    for key in ('total_return', 'total_trades', 'win_rate', 'profit_factor', 'max_drawdown', 'final_capital'):
+        assert expected[key] == actual[key], key
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('engine', ['array', 'sparse'])
+def test_engines_match_pandas(seed, engine):
+    """배열/스파스 엔진의 거래 기록과 자본금 곡선이 pandas 엔진과 같음"""
+    data = random_walk(seed)
+    expected = TrendFollowingStrategy().backtest(data, engine='pandas')
+    actual = TrendFollowingStrategy().backtest(data, engine=engine)
+    assert len(expected['trades']) > 0
+    assert_same_results(expected, actual)
+
+
+@pytest.mark.parametrize('engine', ['array', 'sparse'])
+def test_engines_match_pandas_with_millisecond_index(engine):
+    """timestamp 인덱스가 밀리초 정수여도 같은 결과"""
+    data = random_walk(SEEDS[0])
+    data.index = pd.Index(data.index.as_unit('ms').asi8, name='timestamp')
+    expected = TrendFollowingStrategy().backtest(data, engine='pandas')
+    actual = TrendFollowingStrategy().backtest(data, engine=engine)
+    assert len(expected['trades']) > 0
+    assert_same_results(expected, actual)
+
+
+def test_shared_indicators_match():
+    """미리 계산한 지표를 여러 엔진이 공유해도 같은 결과"""
+    data = random_walk(SEEDS[1])
+    strategy = TrendFollowingStrategy()
+    indicators = strategy.compute_indicators(data)
+    expected = strategy.backtest(data, engine='pandas', indicators=indicators)
+    for engine in ('array', 'sparse'):
+        assert_same_results(expected, TrendFollowingStrategy().backtest(data, engine=engine, indicators=indicators))
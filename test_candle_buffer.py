@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from candle_buffer import CandleBuffer
+from kline_parser import klines_to_frame
+from strategy import TrendFollowingStrategy
+
+HOUR = 3600 * 1000
+START = 1_672_531_200_000  # 2023-01-01 00:00 UTC
+
+
+def make_klines(count, start=START, step=HOUR, seed=0, skip=()):
+    """랜덤워크 가격의 REST kline 목록 (skip 위치의 캔들은 빠짐)"""
+    rng = np.random.default_rng(seed)
+    close = 20000.0 + np.cumsum(rng.normal(0, 50, count))
+    klines = []
+    for i in range(count):
+        if i in skip:
+            continue
+        timestamp = start + i * step
+        price = close[i]
+        klines.append([timestamp, str(price - 10), str(price + 20), str(price - 20), str(price), '10.0',
+                       timestamp + step - 1, '0', 0, '0', '0', '0'])
+    return klines
+
+
+def expected_frame(klines):
+    """kline 전체로 계산한 EMA (TrendFollowingStrategy.calculate_ema)"""
+    strategy = TrendFollowingStrategy()
+    df = klines_to_frame(klines)
+    for period in (10, 20, 50):
+        df[f"ema{period}"] = strategy.calculate_ema(df, period)
+    return df
+
+
+def test_seed_matches_calculate_ema():
+    """seed 후 EMA가 calculate_ema와 같음"""
+    klines = make_klines(80)
+    buffer = CandleBuffer('1h', capacity=100)
+    assert buffer.seed(klines)
+    pd.testing.assert_frame_equal(buffer.frame(), expected_frame(klines), check_freq=False)
+
+
+def test_ring_wraps_past_capacity_and_ema_continues():
+    """capacity를 넘겨도 최근 capacity개가 시간순이고, EMA는 전체 기록에 이어서 계산"""
+    klines = make_klines(250)
+    buffer = CandleBuffer('1h', capacity=100)
+    buffer.seed(klines[:100])
+    for kline in klines[100:]:
+        assert buffer.update(kline)
+    frame = buffer.frame()
+    assert buffer.count == 100 and len(frame) == 100
+    assert frame.index.is_monotonic_increasing
+    assert buffer.last_timestamp == klines[-1][0]
+    pd.testing.assert_frame_equal(frame, expected_frame(klines).tail(100), check_freq=False)
+
+
+def test_in_progress_candle_is_replaced():
+    """같은 시작 시각의 kline은 마지막 캔들과 EMA만 다시 계산"""
+    klines = make_klines(60)
+    buffer = CandleBuffer('1h', capacity=100)
+    buffer.seed(klines[:-1])
+    partial = list(klines[-1])
+    partial[4] = str(float(partial[4]) + 500)
+    assert buffer.update(partial)
+    assert buffer.update(klines[-1])
+    assert buffer.count == 60
+    pd.testing.assert_frame_equal(buffer.frame(), expected_frame(klines), check_freq=False)
+
+
+def test_late_kline_is_ignored():
+    """이미 지난 캔들의 늦은 갱신은 무시"""
+    klines = make_klines(30)
+    buffer = CandleBuffer('1h', capacity=100)
+    buffer.seed(klines)
+    before = buffer.frame()
+    stale = list(klines[10])
+    stale[4] = '1.0'
+    assert buffer.update(stale)
+    pd.testing.assert_frame_equal(buffer.frame(), before)
+
+
+def test_frame_limit_and_end_time():
+    """limit은 최근 캔들 수, end_time 이후에 시작한 캔들은 제외"""
+    klines = make_klines(150)
+    buffer = CandleBuffer('1h', capacity=100)
+    buffer.seed(klines)
+    expected = expected_frame(klines)
+    pd.testing.assert_frame_equal(buffer.frame(20), expected.tail(20), check_freq=False)
+    end_time = klines[-2][6]
+    pd.testing.assert_frame_equal(buffer.frame(20, end_time), expected.iloc[-21:-1], check_freq=False)
+    # 복사본이므로 바꿔도 버퍼는 그대로
+    frame = buffer.frame(5)
+    frame['close'] = 0.0
+    assert (buffer.frame(5)['close'] > 0).all()
+
+
+def test_update_after_gap_requests_reseed():
+    """스트림/tail 갱신에서 빈 구간이 생기면 False"""
+    klines = make_klines(40)
+    buffer = CandleBuffer('1h', capacity=100)
+    buffer.seed(klines[:30])
+    assert not buffer.update(klines[35])
+    assert buffer.last_timestamp == klines[29][0]
+
+
+def test_seed_with_gap_keeps_whole_window():
+    """seed kline 중간에 빈 구간이 있어도 끝까지 채우고 calculate_ema와 같은 EMA"""
+    klines = make_klines(100, skip={20})
+    buffer = CandleBuffer('1h', capacity=100)
+    assert buffer.seed(klines)
+    assert buffer.count == 99
+    assert buffer.last_timestamp == klines[-1][0]
+    pd.testing.assert_frame_equal(buffer.frame(), expected_frame(klines), check_freq=False)
+
+
+def test_refresh_with_gap_in_seed_does_not_stall():
+    """seed에 빈 구간이 있어도 다음 사이클부터는 tail개만 요청하고 최신 캔들까지 반영"""
+    klines = make_klines(130, skip={20})
+    requested = []
+    available = 100
+
+    def fetch(limit):
+        requested.append(limit)
+        return klines[:available][-limit:]
+
+    buffer = CandleBuffer('1h', capacity=100)
+    assert buffer.refresh(fetch) == 100
+    for _ in range(29):
+        available += 1
+        buffer.refresh(fetch)
+        assert buffer.last_timestamp == klines[available - 1][0]
+    assert requested == [100] + [2] * 29
+
+
+def test_refresh_reseeds_after_missed_candles():
+    """tail로 이어지지 않으면 capacity개로 다시 채움"""
+    klines = make_klines(150)
+    available = 100
+
+    def fetch(limit):
+        return klines[:available][-limit:]
+
+    buffer = CandleBuffer('1h', capacity=100)
+    buffer.refresh(fetch)
+    available = 150
+    assert buffer.refresh(fetch) == 102
+    pd.testing.assert_frame_equal(buffer.frame(), expected_frame(klines[50:]), check_freq=False)
+
+
+def test_refresh_without_klines_raises():
+    """채울 kline이 없으면 ValueError (트레이더는 오류로 기록하고 다음 사이클에 다시 시도)"""
+    buffer = CandleBuffer('1h', capacity=100)
+    with pytest.raises(ValueError):
+        buffer.refresh(lambda limit: [])
+    assert buffer.count == 0
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from candle_validation import validate_candles, repair_candles
+
+
+def make_candles(n=20, start='2023-01-01', freq='4h', unit='ns'):
+    """정상 4시간봉 OHLCV 데이터"""
+    close = 20000.0 + np.arange(n) * 10.0
+    index = pd.date_range(start, periods=n, freq=freq, name='timestamp').as_unit(unit)
+    return pd.DataFrame({
+        'open': close - 5.0,
+        'high': close + 20.0,
+        'low': close - 20.0,
+        'close': close,
+        'volume': np.full(n, 10.0)
+    }, index=index)
+
+
+def test_clean_candles_pass():
+    """정상 데이터는 그대로 통과"""
+    data = make_candles()
+    report = validate_candles(data, '4h')
+    assert report.ok
+    repaired, _ = repair_candles(data, '4h')
+    assert repaired is data
+
+
+def test_gap_is_reported_and_filled():
+    """누락 캔들은 직전 종가의 거래량 0 캔들로 채움"""
+    data = make_candles().drop(make_candles().index[[5, 6, 7]])
+    report = validate_candles(data, '4h')
+    assert list(report.gap_positions) == [4]
+    assert list(report.gap_sizes) == [3]
+    assert report.missing_candles == 3
+
+    repaired, _ = repair_candles(data, '4h')
+    assert len(repaired) == 20
+    pd.testing.assert_index_equal(repaired.index, make_candles().index, check_exact=True)
+    filled = repaired.iloc[5:8]
+    assert (filled[['open', 'high', 'low', 'close']] == data['close'].iloc[4]).all().all()
+    assert (filled['volume'] == 0).all()
+    assert validate_candles(repaired, '4h').ok
+
+
+def test_gap_kept_without_fill():
+    """fill_gaps=False면 누락 구간은 그대로 둠"""
+    data = make_candles().drop(make_candles().index[[5]])
+    repaired, report = repair_candles(data, '4h', fill_gaps=False)
+    assert report.missing_candles == 1
+    assert len(repaired) == 19
+
+
+def test_duplicates_keep_last_row():
+    """같은 타임스탬프는 마지막 행만 유지"""
+    data = make_candles(10)
+    duplicate = data.iloc[[3]].copy()
+    duplicate['close'] = 20031.0
+    data = pd.concat([data.iloc[:4], duplicate, data.iloc[4:]])
+    report = validate_candles(data, '4h')
+    assert list(report.duplicates) == [4]
+    assert len(report.gap_positions) == 0
+
+    repaired, _ = repair_candles(data, '4h')
+    assert len(repaired) == 10 and repaired.index.is_unique
+    assert repaired['close'].iloc[3] == 20031.0
+
+
+def test_out_of_order_rows_are_sorted():
+    """순서가 뒤바뀐 행은 정렬 (뒤바뀜만 있고 누락/중복은 없음)"""
+    data = make_candles(10)
+    shuffled = data.iloc[[0, 1, 2, 4, 3, 5, 6, 7, 8, 9]]
+    report = validate_candles(shuffled, '4h')
+    assert list(report.out_of_order) == [4]
+    assert len(report.duplicates) == 0 and len(report.gap_positions) == 0
+
+    repaired, _ = repair_candles(shuffled, '4h')
+    pd.testing.assert_frame_equal(repaired, data, check_freq=False)
+
+
+def test_out_of_order_duplicate_and_gap_together():
+    """정렬이 필요한 데이터에서도 중복/누락 위치를 원래 행 기준으로 보고"""
+    data = make_candles(10)
+    mixed = data.iloc[[0, 1, 3, 2, 2, 6, 7, 8, 9]]
+    report = validate_candles(mixed, '4h')
+    assert list(report.out_of_order) == [3]
+    assert list(report.duplicates) == [4]
+    assert report.missing_candles == 2
+
+    repaired, _ = repair_candles(mixed, '4h')
+    assert len(repaired) == 10
+    assert validate_candles(repaired, '4h').ok
+
+
+@pytest.mark.parametrize('unit', ['s', 'ms', 'us'])
+def test_non_nanosecond_index(unit):
+    """초/밀리초/마이크로초 단위 인덱스도 같은 결과이고 채운 뒤 단위를 유지"""
+    expected = make_candles()
+    data = expected.drop(expected.index[[5, 6]])
+    data.index = data.index.as_unit(unit)
+    report = validate_candles(data, '4h')
+    assert list(report.gap_positions) == [4] and report.missing_candles == 2
+    # 시간프레임 추정도 단위와 관계없이 나노초
+    assert validate_candles(data).timeframe_ns == 4 * 3600 * 1_000_000_000
+
+    repaired, _ = repair_candles(data, '4h')
+    assert repaired.index.unit == unit
+    assert len(repaired) == 20
+    assert list(repaired.index.as_unit('ns')) == list(expected.index)
+
+
+def test_misaligned_candle_is_dropped_when_filling():
+    """시간프레임 간격에 맞지 않는 캔들은 채울 때 제거"""
+    data = make_candles(10)
+    shifted = data.index.to_list()
+    shifted[5] = shifted[5] + pd.Timedelta(hours=1)
+    data.index = pd.DatetimeIndex(shifted, name='timestamp')
+    report = validate_candles(data, '4h')
+    assert len(report.misaligned) > 0
+
+    repaired, _ = repair_candles(data, '4h')
+    assert len(repaired) == 10
+    assert repaired['volume'].iloc[5] == 0
+    assert validate_candles(repaired, '4h').ok
+
+
+def test_invalid_prices_are_removed_and_refilled():
+    """NaN/0 이하 가격 행은 제거하고 그 자리는 직전 종가로 채움, 고가/저가 범위 보정"""
+    data = make_candles(10)
+    data.loc[data.index[2], 'close'] = np.nan
+    data.loc[data.index[6], 'high'] = data['low'].iloc[6] - 1.0
+    report = validate_candles(data, '4h')
+    assert list(report.invalid_values) == [2]
+    assert list(report.high_low) == [6]
+
+    repaired, _ = repair_candles(data, '4h')
+    assert len(repaired) == 10
+    assert repaired['close'].iloc[2] == data['close'].iloc[1]
+    assert repaired['volume'].iloc[2] == 0
+    assert validate_candles(repaired, '4h').ok
+
+
+def test_all_invalid_prices_return_empty_frame():
+    """모든 행의 가격이 잘못되면 빈 DataFrame과 검사 결과를 돌려줌"""
+    data = make_candles(10)
+    data['close'] = np.nan
+    repaired, report = repair_candles(data, '4h')
+    assert repaired.empty
+    assert len(report.invalid_values) == 10
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import re
+import socket
+import threading
+import time
+
+import pytest
+
+from kline_stream import KlineStream, LocalKlineServer
+
+HOUR = 3600 * 1000
+START = 1_672_531_200_000  # 2023-01-01 00:00 UTC
+
+
+def make_klines(count):
+    klines = []
+    for i in range(count):
+        timestamp = START + i * HOUR
+        price = 20000.0 + i * 10
+        klines.append([timestamp, str(price), str(price + 20), str(price - 20), str(price + 5), '10.0',
+                       timestamp + HOUR - 1, '0', 0, '0', '0', '0'])
+    return klines
+
+
+@pytest.fixture
+def server_factory():
+    servers = []
+
+    def start(klines, **kwargs):
+        kwargs.setdefault('tick', 0.002)
+        server = LocalKlineServer(klines, interval='1h', **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def run_until_closed(stream, count, events, on_close=None, on_update=None):
+    """count개 마감까지 구독하며 (종류, 값) 이벤트를 기록"""
+
+    def handle_close(kline):
+        events.append(('close', kline))
+        if on_close:
+            on_close(kline)
+        if stream.closed_candles >= count:
+            stream.stop()
+
+    def handle_update(kline):
+        events.append(('update', kline))
+        if on_update:
+            on_update(kline)
+
+    def handle_connect(connections):
+        events.append(('connect', connections))
+
+    stream.run(handle_close, on_update=handle_update, on_connect=handle_connect)
+
+
+def test_closed_klines_are_dispatched_in_order(server_factory):
+    """마감 이벤트는 on_close로 REST kline 형식 그대로, 진행 중 갱신은 on_update로"""
+    klines = make_klines(5)
+    server = server_factory(klines, updates=2)
+    stream = KlineStream('BTCUSDT', '1h', server.url, reconnect_delay=0.05)
+    events = []
+    run_until_closed(stream, 5, events)
+
+    closes = [value for kind, value in events if kind == 'close']
+    updates = [value for kind, value in events if kind == 'update']
+    assert closes == klines
+    assert len(updates) == 10
+    assert [update[0] for update in updates[:2]] == [klines[0][0]] * 2
+    assert stream.connections == 1 and stream.closed_candles == 5
+
+
+def test_reconnect_calls_on_connect_and_resumes(server_factory):
+    """연결이 끊기면 다시 연결해 on_connect를 호출한 뒤 이어서 마감 이벤트를 받음"""
+    klines = make_klines(6)
+    server = server_factory(klines, updates=1, disconnect_after=2)
+    stream = KlineStream('BTCUSDT', '1h', server.url, reconnect_delay=0.05)
+    events = []
+    run_until_closed(stream, 6, events)
+
+    kinds = [(kind, value if kind == 'connect' else value[0]) for kind, value in events if kind != 'update']
+    assert kinds == [('connect', 1), ('close', klines[0][0]), ('close', klines[1][0]),
+                     ('connect', 2)] + [('close', kline[0]) for kline in klines[2:]]
+    assert stream.connections == 2 and server.connections == 2
+
+
+def test_reconnect_backs_off_exponentially(caplog):
+    """연결할 수 없으면 재연결 대기를 두 배씩 늘려 최대값에서 멈춤"""
+    with socket.socket() as unused:
+        unused.bind(('127.0.0.1', 0))
+        port = unused.getsockname()[1]
+    stream = KlineStream('BTCUSDT', '1h', f"ws://127.0.0.1:{port}/ws", reconnect_delay=0.01, max_reconnect_delay=0.04)
+    thread = threading.Thread(target=stream.run, args=(lambda kline: None,))
+    with caplog.at_level(logging.WARNING, logger='kline_stream'):
+        thread.start()
+        time.sleep(0.5)
+        stream.stop()
+        thread.join(timeout=5)
+    assert not thread.is_alive()
+    delays = [float(match) for match in re.findall(r"([\d.]+)초 후 재연결", caplog.text)]
+    assert delays[:4] == [0.01, 0.02, 0.04, 0.04]
+    assert stream.connections == 0
+
+
+def test_callback_errors_do_not_stop_stream(server_factory):
+    """콜백에서 오류가 나도 기록만 하고 다음 이벤트를 계속 처리"""
+    klines = make_klines(4)
+    server = server_factory(klines, updates=1)
+    stream = KlineStream('BTCUSDT', '1h', server.url, reconnect_delay=0.05)
+    events = []
+
+    def failing_close(kline):
+        if kline[0] == klines[0][0]:
+            raise RuntimeError("strategy failed")
+
+    def failing_update(kline):
+        raise ValueError("buffer failed")
+
+    run_until_closed(stream, 4, events, on_close=failing_close, on_update=failing_update)
+    assert [value for kind, value in events if kind == 'close'] == klines
+    assert stream.callback_errors == 5
+    assert stream.connections == 1
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+import pytest
+
+from market_data import parse_timeframe, download_ohlcv, OHLCVChunkStream, RequestBudget, NoDataError
+from candle_store import CandleStore
+
+HOUR = 3600 * 1000
+START = 1_600_000_000_000 // HOUR * HOUR
+
+
+class StubExchange:
+    """
+    네트워크 없이 다운로더를 확인하기 위한 로컬 거래소 대역
+
+    ccxt 거래소 중 다운로더가 사용하는 부분(fetch_ohlcv, parse_timeframe, milliseconds, rateLimit)만 흉내 낸다.
+    캔들 값은 타임스탬프로 결정되므로 같은 구간을 여러 번 요청해도 같은 데이터가 나온다.
+    """
+
+    def __init__(self, start, end, max_limit=1000, latency=0.0, missing=(), fail_every=0):
+        """
+        Args:
+            start (int): 첫 캔들 타임스탬프 (밀리초)
+            end (int): 마지막 캔들 이후 타임스탬프 (밀리초, 이 시각 이후 캔들 없음)
+            max_limit (int): 요청당 최대 반환 캔들 수 (실제 거래소처럼 limit보다 작을 수 있음)
+            latency (float): 요청당 지연 시간 (초)
+            missing (iterable): 데이터가 없는 캔들 타임스탬프 (거래소 점검 구간 등)
+            fail_every (int): n번째 요청마다 오류 발생 (0이면 오류 없음)
+        """
+        self.start = start
+        self.end = end
+        self.max_limit = max_limit
+        self.latency = latency
+        self.missing = set(missing)
+        self.fail_every = fail_every
+        self.rateLimit = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def parse_timeframe(self, timeframe):
+        return parse_timeframe(timeframe)
+
+    def milliseconds(self):
+        return self.end
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        with self._lock:
+            self.requests += 1
+            count = self.requests
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and count % self.fail_every == 0:
+            raise ConnectionError(f"stub request {count} failed")
+
+        step = self.parse_timeframe(timeframe) * 1000
+        since = self.start if since is None else max(since, self.start)
+        first = self.start + -(-(since - self.start) // step) * step
+        limit = min(limit or self.max_limit, self.max_limit)
+
+        rows = []
+        timestamp = first
+        while timestamp < self.end and len(rows) < limit:
+            if timestamp not in self.missing:
+                price = 20000.0 + (timestamp // step) % 1000
+                rows.append([timestamp, price, price + 5.0, price - 5.0, price + 1.0, 10.0])
+            timestamp += step
+        return rows
+
+
+
+
+def _download(exchange, candles, **kwargs):
+    kwargs.setdefault('verbose', False)
+    return download_ohlcv(exchange, 'BTC/USDT', '1h', START, START + candles * HOUR - 1, limit=100, **kwargs)
+
+
+def test_download_complete_and_ordered():
+    """여러 스레드로 받아도 모든 캔들이 시간순으로 한 번씩"""
+    exchange = StubExchange(START, START + 1000 * HOUR)
+    df = _download(exchange, 1000, workers=4)
+    assert len(df) == 1000
+    assert df.index.is_monotonic_increasing and df.index.is_unique
+    assert df.attrs['incomplete'] == []
+    assert exchange.requests == 10
+
+
+def test_short_responses_continue_within_window():
+    """거래소가 limit보다 적게 돌려주면 같은 구간을 이어서 요청"""
+    exchange = StubExchange(START, START + 500 * HOUR, max_limit=30)
+    df = _download(exchange, 500, workers=2)
+    assert len(df) == 500
+    assert df.attrs['incomplete'] == []
+
+
+def test_missing_candles_are_skipped():
+    """거래소에 없는 캔들은 건너뛰고 구간은 끝까지 가져온 것으로 처리"""
+    missing = [START + i * HOUR for i in range(150, 160)]
+    exchange = StubExchange(START, START + 300 * HOUR, missing=missing)
+    df = _download(exchange, 300)
+    assert len(df) == 290
+    assert df.attrs['incomplete'] == []
+
+
+def test_request_budget_marks_incomplete_windows():
+    """요청 수 제한을 넘으면 남은 구간을 incomplete로 기록"""
+    exchange = StubExchange(START, START + 1000 * HOUR)
+    df = _download(exchange, 1000, workers=1, max_requests=4)
+    assert exchange.requests == 4
+    assert len(df) == 400
+    assert len(df.attrs['incomplete']) == 6
+    assert df.attrs['incomplete'][0] == (START + 400 * HOUR, START + 500 * HOUR)
+
+
+def test_failed_requests_are_retried():
+    """일시적인 오류는 재시도해서 모두 가져옴"""
+    exchange = StubExchange(START, START + 300 * HOUR, fail_every=2)
+    df = _download(exchange, 300, workers=1, retries=1)
+    assert len(df) == 300
+    assert df.attrs['incomplete'] == []
+    assert exchange.requests == 5
+
+
+def test_retries_exhausted_raise_no_data_with_incomplete():
+    """모든 요청이 실패하면 NoDataError에 끝까지 못 가져온 구간을 담음"""
+    exchange = StubExchange(START, START + 200 * HOUR, fail_every=1)
+    with pytest.raises(NoDataError) as error:
+        _download(exchange, 200, retries=0)
+    assert len(error.value.incomplete) == 2
+
+
+def test_budget_spaces_requests():
+    """min_interval 간격으로 요청 시작 (여러 스레드 공유)"""
+    budget = RequestBudget(max_requests=5, min_interval=0.02)
+    times = []
+
+    def worker():
+        while budget.acquire():
+            times.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert budget.used == 5 and len(times) == 5
+    # 4번의 간격 (스레드 전환 지연이 있으므로 전체 길이로 확인)
+    assert max(times) - min(times) >= 4 * 0.02 * 0.9
+
+
+def test_chunk_stream_yields_ordered_chunks():
+    """청크 스트림은 시간순으로 겹치지 않는 청크를 내보냄"""
+    exchange = StubExchange(START, START + 1000 * HOUR, latency=0.001)
+    stream = OHLCVChunkStream(exchange, 'BTC/USDT', '1h', START, START + 1000 * HOUR - 1, limit=100,
+                              workers=4, chunk_size=250, verbose=False)
+    chunks = list(stream)
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous.index[-1] < chunk.index[0]
+    assert stream.candles == 1000 and stream.incomplete == []
+
+
+def test_candle_store_gap_without_exchange_data(tmp_path):
+    """상장 전 구간처럼 거래소에 데이터가 없는 구간은 오류 없이 보유 구간으로 기록"""
+    exchange = StubExchange(START + 100 * HOUR, START + 300 * HOUR)
+    store = CandleStore(str(tmp_path), 'stub', 'BTC/USDT', '1h')
+
+    def fetch(since, until):
+        return download_ohlcv(exchange, 'BTC/USDT', '1h', since, until, limit=100, verbose=False)
+
+    assert len(store.get(START + 100 * HOUR, START + 299 * HOUR, fetch)) == 200
+    assert len(store.get(START, START + 299 * HOUR, fetch)) == 200
+    requests = exchange.requests
+    assert len(store.get(START, START + 299 * HOUR, fetch)) == 200
+    assert exchange.requests == requests
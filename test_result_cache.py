@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import importlib
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+from result_cache import BacktestResultCache, engine_source_files, fingerprint_data
+from strategy import TrendFollowingStrategy
+from test_backtest_engines import random_walk, assert_same_results
+
+
+@pytest.fixture(scope='module')
+def data():
+    return random_walk(5)
+
+
+def cache_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith('.pkl'))
+
+
+def spy_backtest(strategy):
+    """캐시가 실제로 백테스트를 실행한 횟수를 세도록 backtest를 감쌈"""
+    calls = []
+    backtest = strategy.backtest
+
+    def wrapped(*args, **kwargs):
+        calls.append(kwargs.get('engine'))
+        return backtest(*args, **kwargs)
+
+    strategy.backtest = wrapped
+    return calls
+
+
+def test_engine_sources_include_records_module():
+    """코드 버전에는 전략 모듈과 엔진이 불러오는 backtest_records 소스가 포함됨"""
+    names = [os.path.basename(path) for path in engine_source_files(TrendFollowingStrategy)]
+    assert 'strategy.py' in names and 'backtest_records.py' in names
+    assert 'pandas' not in ''.join(names)
+
+
+def test_hit_returns_same_result_and_restores_state(tmp_path, data):
+    """캐시 적중 결과와 전략 상태가 새로 실행한 것과 같음"""
+    cache = BacktestResultCache(str(tmp_path))
+    fresh = TrendFollowingStrategy()
+    expected = cache.run(fresh, data, engine='sparse')
+    assert len(cache_files(cache)) == 1
+
+    cached = TrendFollowingStrategy()
+    calls = spy_backtest(cached)
+    actual = cache.run(cached, data, engine='sparse')
+    assert calls == []
+    assert_same_results(expected, actual)
+    assert_same_results(TrendFollowingStrategy().backtest(data, engine='pandas'), actual)
+    for name in ('capital', 'position', 'max_drawdown', 'peak_capital', 'last_adjustment_time'):
+        assert getattr(cached, name) == getattr(fresh, name), name
+    pd.testing.assert_frame_equal(cached.trades.to_frame(), fresh.trades.to_frame())
+
+
+def test_parameter_change_misses(tmp_path, data):
+    """전략 파라미터가 다르면 캐시를 쓰지 않고 다시 실행"""
+    cache = BacktestResultCache(str(tmp_path))
+    cache.run(TrendFollowingStrategy(), data, engine='sparse')
+
+    strategy = TrendFollowingStrategy(risk_percentage=0.02)
+    calls = spy_backtest(strategy)
+    results = cache.run(strategy, data, engine='sparse')
+    assert calls == ['sparse']
+    assert len(cache_files(cache)) == 2
+    assert_same_results(TrendFollowingStrategy(risk_percentage=0.02).backtest(data, engine='sparse'), results)
+
+
+def test_data_change_misses(tmp_path, data):
+    """캔들 데이터가 다르면 지문이 달라 캐시를 쓰지 않음"""
+    changed = data.copy()
+    changed.iloc[-1, changed.columns.get_loc('close')] += 1.0
+    assert fingerprint_data(changed) != fingerprint_data(data)
+
+    cache = BacktestResultCache(str(tmp_path))
+    cache.run(TrendFollowingStrategy(), data, engine='sparse')
+    strategy = TrendFollowingStrategy()
+    calls = spy_backtest(strategy)
+    cache.run(strategy, changed, engine='sparse')
+    assert calls == ['sparse']
+
+
+def test_used_strategy_bypasses_cache(tmp_path, data):
+    """이미 실행한 전략은 상태가 남아 있으므로 캐시를 거치지 않음"""
+    cache = BacktestResultCache(str(tmp_path))
+    strategy = TrendFollowingStrategy()
+    strategy.backtest(data, engine='sparse')
+    calls = spy_backtest(strategy)
+    cache.run(strategy, data, engine='sparse')
+    assert calls == ['sparse']
+    assert cache_files(cache) == []
+
+
+def test_engine_dependency_change_misses(tmp_path, monkeypatch, data):
+    """전략 모듈이 불러오는 로컬 모듈 소스가 바뀌면 코드 버전이 달라져 캐시를 쓰지 않음"""
+    package = tmp_path / 'engine'
+    package.mkdir()
+    constants = package / 'engine_constants.py'
+    constants.write_text("SCALE = 1.0\n")
+    (package / 'engine_helper.py').write_text("from engine_constants import SCALE\n")
+    (package / 'cached_strategy.py').write_text(
+        "from strategy import TrendFollowingStrategy\n"
+        "from engine_helper import SCALE\n\n\n"
+        "class CachedStrategy(TrendFollowingStrategy):\n"
+        "    pass\n"
+    )
+    monkeypatch.syspath_prepend(str(package))
+    for name in ('cached_strategy', 'engine_helper', 'engine_constants'):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    CachedStrategy = importlib.import_module('cached_strategy').CachedStrategy
+
+    names = [os.path.basename(path) for path in engine_source_files(CachedStrategy)]
+    assert names == ['cached_strategy.py', 'engine_constants.py', 'engine_helper.py']
+
+    cache_dir = str(tmp_path / 'cache')
+    cache = BacktestResultCache(cache_dir)
+    version = cache.code_version(CachedStrategy())
+    cache.run(CachedStrategy(), data, engine='sparse')
+
+    # 같은 코드면 적중
+    strategy = CachedStrategy()
+    calls = spy_backtest(strategy)
+    BacktestResultCache(cache_dir).run(strategy, data, engine='sparse')
+    assert calls == []
+
+    # 간접적으로 불러오는 모듈만 바뀌어도 새 코드 버전 (캐시 객체는 버전을 한 번만 계산하므로 새로 생성)
+    constants.write_text("SCALE = 2.0\n")
+    changed_cache = BacktestResultCache(cache_dir)
+    assert changed_cache.code_version(CachedStrategy()) != version
+    strategy = CachedStrategy()
+    calls = spy_backtest(strategy)
+    changed_cache.run(strategy, data, engine='sparse')
+    assert calls == ['sparse']
+    assert len(cache_files(changed_cache)) == 2